@@ -0,0 +1,94 @@
+"""Mixed read/write throughput on SQLite with default vs tuned engine settings.
+
+Writer threads commit small progress updates while reader threads fetch rows,
+like generation workers and API handlers sharing one database file. Prints
+operations per second and "database is locked" errors for each engine setup.
+Run from the backend directory:
+
+    python -m benchmarks.bench_db_concurrency [--threads 8] [--seconds 5] [--write-ratio 0.3]
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from models.engine import engine_options, tune_engine
+
+ROWS = 200
+
+
+def build_engine(path, tuned):
+    url = f'sqlite:///{path}'
+    if not tuned:
+        # SQLAlchemy/pysqlite defaults: rollback journal, synchronous=FULL
+        return create_engine(url)
+    engine = create_engine(url, **engine_options(url))
+    tune_engine(engine)
+    return engine
+
+
+def seed(engine):
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE progress (id INTEGER PRIMARY KEY, value INTEGER, agent TEXT)'))
+        conn.execute(text('INSERT INTO progress (id, value, agent) VALUES (:id, 0, :agent)'),
+                     [{'id': i, 'agent': 'Requirements Analyst'} for i in range(ROWS)])
+
+
+def worker(engine, deadline, write_ratio, counters, lock):
+    ops = errors = 0
+    rng = random.Random()
+    while time.perf_counter() < deadline:
+        row_id = rng.randrange(ROWS)
+        try:
+            if rng.random() < write_ratio:
+                with engine.begin() as conn:
+                    conn.execute(text('UPDATE progress SET value = value + 1 WHERE id = :id'), {'id': row_id})
+            else:
+                with engine.connect() as conn:
+                    conn.execute(text('SELECT value, agent FROM progress WHERE id = :id'), {'id': row_id}).one()
+            ops += 1
+        except OperationalError:
+            errors += 1
+    with lock:
+        counters['ops'] += ops
+        counters['errors'] += errors
+
+
+def run(tuned, threads, seconds, write_ratio):
+    with tempfile.TemporaryDirectory() as directory:
+        engine = build_engine(os.path.join(directory, 'bench.db'), tuned)
+        seed(engine)
+
+        counters = {'ops': 0, 'errors': 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + seconds
+        pool = [threading.Thread(target=worker, args=(engine, deadline, write_ratio, counters, lock))
+                for _ in range(threads)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        engine.dispose()
+    return counters['ops'] / seconds, counters['errors']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--write-ratio', type=float, default=0.3)
+    args = parser.parse_args()
+
+    print(f'{args.threads} threads, {args.seconds}s, {args.write_ratio:.0%} writes')
+    for name, tuned in (('default', False), ('tuned', True)):
+        throughput, errors = run(tuned, args.threads, args.seconds, args.write_ratio)
+        print(f'{name:>8}: {throughput:9.0f} ops/s, {errors} lock errors')
+
+
+if __name__ == '__main__':
+    main()
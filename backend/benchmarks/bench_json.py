@@ -0,0 +1,53 @@
+"""Micro-benchmark: stdlib json vs the configured JSON backend on a large project.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_json
+"""
+import json
+import timeit
+from datetime import datetime
+
+from services import json_backend
+
+
+def build_project(files=200, file_size=4000):
+    components = {f'Component{i}': f'// component {i}\n' + 'x' * file_size for i in range(files)}
+    return {
+        'id': 1,
+        'name': 'Benchmark App',
+        'status': 'completed',
+        'created_at': datetime.utcnow(),
+        'updated_at': datetime.utcnow(),
+        'tech_stack': ['React', 'Node.js', 'PostgreSQL', 'Tailwind CSS'],
+        'specifications': {
+            'functional_requirements': [
+                {'id': f'FR{i:03}', 'title': f'Feature {i}', 'priority': 'high', 'complexity': 'medium'}
+                for i in range(500)
+            ]
+        },
+        'generated_code': {'frontend_code': {'components': components}}
+    }
+
+
+def stdlib_dumps(obj):
+    return json.dumps(obj, default=lambda value: value.isoformat())
+
+
+def run(number=50):
+    project = build_project()
+    encoded = json_backend.dumps(project)
+    print(f'payload: {len(encoded) / 1024:.0f} KB, backend: {json_backend.BACKEND}')
+
+    results = {
+        'stdlib dumps': timeit.timeit(lambda: stdlib_dumps(project), number=number),
+        f'{json_backend.BACKEND} dumps': timeit.timeit(lambda: json_backend.dumps(project), number=number),
+        'stdlib loads': timeit.timeit(lambda: json.loads(encoded), number=number),
+        f'{json_backend.BACKEND} loads': timeit.timeit(lambda: json_backend.loads(encoded), number=number),
+    }
+    for name, seconds in results.items():
+        print(f'{name:>14}: {seconds / number * 1000:8.3f} ms/op')
+
+
+if __name__ == '__main__':
+    run()
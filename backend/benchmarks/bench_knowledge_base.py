@@ -0,0 +1,58 @@
+"""Micro-benchmark: quick-help matching against a large knowledge base.
+
+Compiles a synthetic knowledge base of several thousand FAQ entries and
+times lookups against the if/elif substring chain it replaces.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_knowledge_base
+"""
+import random
+import time
+import timeit
+
+from services.knowledge_base import KnowledgeBase
+
+VOCABULARY = [f'term{i}' for i in range(3000)]
+
+
+def build_entries(count, seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            'id': f'faq-{i}',
+            'patterns': [' '.join(rng.sample(VOCABULARY, rng.randint(1, 3))) for _ in range(4)],
+            'answer': f'Answer {i}'
+        }
+        for i in range(count)
+    ]
+
+
+def substring_chain(entries, question):
+    question = question.lower()
+    for entry in entries:
+        if any(pattern in question for pattern in entry['patterns']):
+            return entry
+    return None
+
+
+def run(entries=5000, number=2000):
+    faq = build_entries(entries)
+    rng = random.Random(11)
+    questions = [f"how do I use {' '.join(rng.sample(VOCABULARY, 6))} in my app?" for _ in range(100)]
+
+    kb = KnowledgeBase()
+    started = time.perf_counter()
+    kb.load({'quick_help': {'entries': faq}})
+    print(f'entries: {entries}, compile: {(time.perf_counter() - started) * 1000:.1f} ms')
+
+    results = {
+        'indexed match': timeit.timeit(lambda: [kb.answer(q) for q in questions], number=number // 100),
+        'substring chain': timeit.timeit(lambda: [substring_chain(faq, q) for q in questions], number=number // 100),
+    }
+    for name, seconds in results.items():
+        print(f'{name:>15}: {seconds / number * 1000:8.4f} ms/op')
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,70 @@
+"""Cold-start budget check for the application factory.
+
+Imports and builds the app in a fresh interpreter, prints the per-phase
+timings and exits non-zero when startup exceeds the budget, a provider SDK
+was imported eagerly or AIService was constructed. Run it in CI from the
+backend directory:
+
+    python -m benchmarks.startup_budget [--budget-ms 1500]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+DEFAULT_BUDGET_MS = int(os.getenv('STARTUP_BUDGET_MS', 1500))
+
+# Provider SDKs that must only load on first use
+DEFERRED_MODULES = ['openai', 'anthropic', 'tiktoken', 'langchain']
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from factory import create_app
+app = create_app()
+total_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({
+    'total_ms': round(total_ms, 2),
+    'factory': app.extensions['startup_timings'],
+    'eager_modules': [name for name in %r if name in sys.modules],
+    'ai_service_constructed': getattr(sys.modules.get('services.ai_service'), '_ai_service', None) is not None
+}))
+"""
+
+
+def measure():
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(
+        [sys.executable, '-c', _PROBE % DEFERRED_MODULES],
+        cwd=backend_dir, capture_output=True, text=True, check=True,
+        env={**os.environ, 'JWT_SECRET_KEY': os.getenv('JWT_SECRET_KEY') or 'startup-budget-probe'}
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args()
+
+    result = measure()
+    print(f"startup: {result['total_ms']}ms (budget {args.budget_ms}ms)")
+    for phase, elapsed in result['factory']['phases_ms'].items():
+        print(f'  {phase:>12}: {elapsed}ms')
+
+    failures = []
+    if result['total_ms'] > args.budget_ms:
+        failures.append(f"startup took {result['total_ms']}ms, over the {args.budget_ms}ms budget")
+    if result['eager_modules']:
+        failures.append(f"deferred modules imported at startup: {', '.join(result['eager_modules'])}")
+    if result['ai_service_constructed']:
+        failures.append('AIService was constructed at startup')
+
+    for failure in failures:
+        print(f'FAIL: {failure}')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,252 @@
+"""The application factory.
+
+create_app() is the single place the Flask app is assembled: it binds the one
+SQLAlchemy instance from models/database.py, registers every blueprint and
+hook, and records how long each startup phase took. Heavy dependencies such
+as the AI provider clients are not imported here; they load on first use.
+"""
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import click
+from dotenv import load_dotenv
+from flask import Flask, jsonify
+from flask_cors import CORS
+from flask_socketio import SocketIO
+
+from models.database import db
+
+logger = logging.getLogger(__name__)
+
+socketio = SocketIO()
+
+
+class StartupTimer:
+    """Collects per-phase startup timings in milliseconds"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - start) * 1000, 2)
+
+    def to_dict(self):
+        return {
+            'phases_ms': dict(self.phases),
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 2)
+        }
+
+
+def database_url():
+    url = os.environ.get('DATABASE_URL')
+    if url and url.startswith('postgres://'):
+        # Heroku compatibility: postgres:// -> postgresql://
+        url = url.replace('postgres://', 'postgresql://', 1)
+    return url or 'sqlite:///ai_app_builder.db'
+
+
+def create_app(config=None):
+    timer = StartupTimer()
+
+    with timer.phase('config'):
+        load_dotenv()
+        app = Flask(__name__)
+        app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'default-secret-for-development')
+        app.config['SQLALCHEMY_DATABASE_URI'] = database_url()
+        app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+        if config:
+            app.config.update(config)
+
+        from models.engine import engine_options, tune_engine
+        app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config['SQLALCHEMY_DATABASE_URI']))
+
+        # Read replicas become binds that @read_only views are routed to
+        from services.read_replicas import init_replicas, replica_binds, replica_urls
+        replicas = replica_urls(app.config.get('DATABASE_REPLICA_URLS'))
+        app.config['SQLALCHEMY_BINDS'] = {**app.config.get('SQLALCHEMY_BINDS', {}),
+                                          **replica_binds(replicas, engine_options)}
+
+        from services.json_backend import FastJSONProvider
+        app.json = FastJSONProvider(app)
+
+    with timer.phase('extensions'):
+        db.init_app(app)
+        with app.app_context():
+            # WAL and busy timeout on SQLite; pool options were applied via the config above
+            for engine in db.engines.values():
+                tune_engine(engine)
+        init_replicas(app, db)
+        origins = os.environ.get('CORS_ORIGINS', '*').split(',')
+        # Cross-origin clients echo X-Last-Write back to read their own writes
+        from services.read_replicas import LAST_WRITE_HEADER
+        CORS(app, resources={r"/api/*": {"origins": origins}, r"/socket.io/*": {"origins": origins}},
+             expose_headers=[LAST_WRITE_HEADER])
+        # A shared message queue (SOCKETIO_MESSAGE_QUEUE) lets emits reach clients on every worker
+        from services.realtime import socketio_options
+        socketio.init_app(app, cors_allowed_origins="*", async_mode=os.getenv('SOCKETIO_ASYNC_MODE') or None,
+                          **socketio_options())
+
+    with timer.phase('models'):
+        import models.user  # noqa: F401 - registers the mappers
+        import models.project  # noqa: F401
+        import services.generated_files  # noqa: F401 - stores generated files in the blob store
+        import services.search  # noqa: F401 - keeps the full-text index in sync
+
+    with timer.phase('blueprints'):
+        from routes.api import api_bp
+        from routes.auth import auth_bp
+        from routes.projects import projects_bp
+        from routes.api_keys import api_keys_bp
+        from routes.chat import chat_bp
+        from routes.generation import generation_bp
+        from routes.search import search_bp
+
+        for blueprint in (api_bp, auth_bp, projects_bp, api_keys_bp, chat_bp, generation_bp, search_bp):
+            app.register_blueprint(blueprint, url_prefix='/api')
+
+        import socket_events  # noqa: F401 - registers the Socket.IO handlers
+
+    with timer.phase('hooks'):
+        from services.sql_metrics import init_sql_metrics
+        from services.identity import init_identity
+        from services.project_events import project_events
+        from services.generation_pool import generation_pool
+        from services.progress_buffer import progress_buffer
+        from services.knowledge_base import knowledge_base
+        from services.http_compression import init_compression
+
+        # Query count, SQL time and N+1 detection per request
+        init_sql_metrics(app)
+        # Resolve the current user once per request
+        init_identity(app)
+        # Status fan-out for the SSE endpoint
+        project_events.init_app(app)
+        # Generation jobs run in a bounded pool, inside this app's context
+        generation_pool.init_app(app)
+        # Coalesced progress writes, flushed from a background thread
+        progress_buffer.init_app(app)
+        # Quick-help answers and session titles, compiled once
+        knowledge_base.init_app(app)
+        # gzip/brotli negotiation for /api/* responses
+        init_compression(app)
+
+        register_root_routes(app)
+        register_error_handlers(app)
+        register_commands(app)
+
+    app.extensions['startup_timings'] = timer.to_dict()
+    logger.info(f"App created in {app.extensions['startup_timings']['total_ms']}ms: {timer.phases}")
+    return app
+
+
+def register_root_routes(app):
+    @app.route('/')
+    def home():
+        return jsonify({
+            "message": "AI App Builder Pro API",
+            "version": "2.0.0",
+            "status": "active",
+            "timestamp": datetime.utcnow().isoformat()
+        })
+
+
+def register_error_handlers(app):
+    @app.errorhandler(404)
+    def not_found(error):
+        return jsonify({
+            "error": "Not Found",
+            "message": "The requested resource was not found",
+            "status_code": 404
+        }), 404
+
+    @app.errorhandler(500)
+    def internal_error(error):
+        logger.error(f"Internal server error: {str(error)}")
+        db.session.rollback()
+        return jsonify({
+            "error": "Internal Server Error",
+            "message": "An unexpected error occurred",
+            "status_code": 500
+        }), 500
+
+
+def init_db(app):
+    """Initialize database tables"""
+    from models.project import ProjectStats
+    from models.schema import upgrade_schema
+    from services.identity import ensure_demo_user
+
+    try:
+        with app.app_context():
+            db.create_all()
+
+            # create_all never alters existing tables; add columns introduced since they were created
+            upgrade_schema()
+
+            # Create the demo user used by requests without a token
+            if app.config.get('ALLOW_DEMO_USER'):
+                ensure_demo_user()
+
+            # Fix any drift in the incrementally maintained project counters
+            reconciled = ProjectStats.reconcile()
+            db.session.commit()
+            logger.info(f"Project stats reconciled for {reconciled} users")
+
+            logger.info("Database initialized successfully")
+    except Exception as e:
+        logger.error(f"Database initialization error: {str(e)}")
+
+
+def register_commands(app):
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create tables, add missing columns, create the demo user and reconcile counters"""
+        init_db(app)
+
+    @app.cli.command('reconcile-stats')
+    def reconcile_stats_command():
+        """Rebuild per-user project counters with a single GROUP BY pass"""
+        from models.project import ProjectStats
+
+        reconciled = ProjectStats.reconcile()
+        db.session.commit()
+        click.echo(f"Reconciled project stats for {reconciled} users")
+
+    @app.cli.command('archive')
+    @click.option('--chat-days', type=int, default=None, help='Archive chat messages older than this')
+    @click.option('--project-days', type=int, default=None, help='Archive artifacts of projects completed longer ago than this')
+    def archive_command(chat_days, project_days):
+        """Move old chat messages and completed project artifacts to the compressed cold tier"""
+        from services.archival import run_archival
+
+        result = run_archival(chat_days, project_days)
+        click.echo(f"Archived {result['chat_messages']} chat messages and the artifacts of {result['projects']} projects")
+
+    @app.cli.command('reindex-search')
+    def reindex_search_command():
+        """Rebuild the full-text index of projects and chat messages"""
+        from services.search import rebuild_index
+
+        count = rebuild_index()
+        db.session.commit()
+        click.echo(f"Indexed {count} documents")
+
+    @app.cli.command('gc-blobs')
+    @click.option('--grace-seconds', default=3600, show_default=True,
+                  help='Keep unreferenced blobs newer than this, they may belong to an in-flight generation')
+    def gc_blobs_command(grace_seconds):
+        """Delete generated-file blobs no longer referenced by any project or archive"""
+        from models.project import Project
+        from services.blob_store import get_blob_store
+
+        removed, freed = get_blob_store().gc(Project.referenced_blobs(), grace_seconds=grace_seconds)
+        click.echo(f"Removed {removed} unreferenced blobs ({freed} bytes)")
@@ -1,3 +1 @@
-from flask_sqlalchemy import SQLAlchemy
-
-db = SQLAlchemy()
+from .database import db
@@ -0,0 +1,81 @@
+"""Storage encoding for the large JSON artifact columns on projects.
+
+Artifacts are serialized to JSON and, above a size threshold, compressed and
+stored as base64 text behind a short version header (``zl1:`` for zlib,
+``zs1:`` for zstd). Rows written before compression existed hold plain JSON
+and are still decoded as-is.
+"""
+import base64
+import os
+import zlib
+
+from services.json_backend import dumps_bytes, loads
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; zlib is always available
+    zstandard = None
+
+ZLIB_HEADER = 'zl1:'
+ZSTD_HEADER = 'zs1:'
+
+# Small artifacts are not worth the base64 overhead
+COMPRESSION_THRESHOLD = int(os.getenv('ARTIFACT_COMPRESSION_THRESHOLD', 1024))
+COMPRESSION_CODEC = os.getenv('ARTIFACT_COMPRESSION', 'zlib').lower()
+
+
+def _compress(raw):
+    if COMPRESSION_CODEC == 'zstd' and zstandard is not None:
+        return ZSTD_HEADER + base64.b64encode(zstandard.ZstdCompressor(level=6).compress(raw)).decode('ascii')
+    return ZLIB_HEADER + base64.b64encode(zlib.compress(raw, 6)).decode('ascii')
+
+
+def encode_artifact(data):
+    """Encode an artifact for storage, returning (stored_text, raw_size)"""
+    if not data:
+        return None, 0
+
+    raw = dumps_bytes(data)
+    if len(raw) < COMPRESSION_THRESHOLD:
+        return raw.decode('utf-8'), len(raw)
+
+    return _compress(raw), len(raw)
+
+
+def decode_artifact(stored):
+    """Decode a stored artifact, accepting compressed and legacy plain JSON rows"""
+    if not stored:
+        return None
+
+    if stored.startswith(ZLIB_HEADER):
+        raw = zlib.decompress(base64.b64decode(stored[len(ZLIB_HEADER):]))
+    elif stored.startswith(ZSTD_HEADER):
+        if zstandard is None:
+            raise ValueError('zstandard is required to read this artifact')
+        raw = zstandard.ZstdDecompressor().decompress(base64.b64decode(stored[len(ZSTD_HEADER):]))
+    else:
+        raw = stored
+
+    return loads(raw)
+
+
+# Generated files are moved out of the row into the content-addressed blob store
+# and replaced by {"$blob": <sha256>, "size": <bytes>} references; see
+# services/generated_files.py.
+
+BLOB_REF_KEY = '$blob'
+
+
+def is_blob_ref(value):
+    return isinstance(value, dict) and BLOB_REF_KEY in value
+
+
+def iter_blob_refs(data):
+    if is_blob_ref(data):
+        yield data[BLOB_REF_KEY]
+    elif isinstance(data, dict):
+        for value in data.values():
+            yield from iter_blob_refs(value)
+    elif isinstance(data, list):
+        for value in data:
+            yield from iter_blob_refs(value)
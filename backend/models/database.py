@@ -1,3 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
 
-db = SQLAlchemy()
\ No newline at end of file
+from services.read_replicas import RoutingSession
+
+# The single SQLAlchemy instance, bound by factory.create_app(); its session
+# sends the reads of @read_only views to replicas when any are configured
+db = SQLAlchemy(session_options={'class_': RoutingSession})
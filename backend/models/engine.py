@@ -0,0 +1,54 @@
+"""Engine options tuned for concurrent request and generation writers.
+
+SQLite gets WAL journaling, so readers no longer block on a writer, plus
+synchronous=NORMAL (safe with WAL, one fsync per checkpoint instead of per
+commit), a busy timeout so a writer waits for the lock instead of failing
+with "database is locked", and a larger page cache. Server databases get an
+explicit pool size, overflow, timeout, recycle and pre-ping from DB_POOL_*.
+"""
+import os
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', 20000))
+
+
+def is_sqlite(url):
+    return make_url(url).get_backend_name() == 'sqlite'
+
+
+def engine_options(url):
+    """SQLALCHEMY_ENGINE_OPTIONS for a database URL"""
+    if is_sqlite(url):
+        # pysqlite's own lock wait, in seconds; busy_timeout below covers the same ground per connection
+        return {'connect_args': {'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000}}
+
+    return {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 3600)),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'True').lower() in ('1', 'true', 'yes')
+    }
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record=None):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f'PRAGMA journal_mode={SQLITE_JOURNAL_MODE}')
+        cursor.execute(f'PRAGMA synchronous={SQLITE_SYNCHRONOUS}')
+        cursor.execute(f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}')
+        # Negative cache_size is in KiB rather than pages
+        cursor.execute(f'PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}')
+    finally:
+        cursor.close()
+
+
+def tune_engine(engine):
+    """Register per-connection settings; call before the first connection is made"""
+    if engine.dialect.name == 'sqlite':
+        event.listen(engine, 'connect', apply_sqlite_pragmas)
@@ -1,6 +1,11 @@
 from datetime import datetime
 import json
+import zlib
+from sqlalchemy import case, event, func, inspect, select
+from sqlalchemy.orm import load_only, object_session, selectinload
 from .database import db
+from .artifacts import encode_artifact, decode_artifact, iter_blob_refs
+from services.json_backend import dumps as json_dumps, loads as json_loads
 
 class Project(db.Model):
     __tablename__ = 'projects'
@@ -21,11 +26,12 @@ class Project(db.Model):
     estimated_completion = db.Column(db.DateTime)
     error_message = db.Column(db.Text)
     
-    # Generated content (stored as JSON)
-    generated_code = db.Column(db.Text)  # JSON string
-    specifications = db.Column(db.Text)  # JSON string
-    architecture = db.Column(db.Text)    # JSON string
-    design = db.Column(db.Text)          # JSON string
+    # Generated content (JSON, compressed above a size threshold - see artifacts.py)
+    generated_code = db.Column(db.Text)
+    specifications = db.Column(db.Text)
+    architecture = db.Column(db.Text)
+    design = db.Column(db.Text)
+    artifact_sizes = db.Column(db.Text)  # JSON object: column -> {raw, stored} bytes
     
     # Project metadata
     framework = db.Column(db.String(100), default='React')
@@ -40,8 +46,15 @@ class Project(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Bumped on every UPDATE; together with updated_at it forms the ETag
+    row_version = db.Column(db.Integer, nullable=False, default=1)
+    
+    # Set while the artifact columns live in project_archives (see services/archival.py)
+    archived_at = db.Column(db.DateTime)
+    
     # Relationships
     chat_sessions = db.relationship('ChatSession', backref='project', lazy=True, cascade='all, delete-orphan')
+    archive = db.relationship('ProjectArchive', uselist=False, lazy=True, cascade='all, delete-orphan')
     
     def __init__(self, **kwargs):
         # Validate required fields
@@ -50,118 +63,265 @@ class Project(db.Model):
         
         super(Project, self).__init__(**kwargs)
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'name': self.name,
-            'description': self.description,
-            'status': self.status,
-            'user_id': self.user_id,
-            'started_at': self.started_at.isoformat() if self.started_at else None,
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
-            'current_agent': self.current_agent,
-            'progress': self.progress,
-            'estimated_completion': self.estimated_completion.isoformat() if self.estimated_completion else None,
-            'error_message': self.error_message,
-            'framework': self.framework,
-            'complexity': self.complexity,
-            'build_time': self.build_time,
-            'performance_score': self.performance_score,
-            'deploy_url': self.deploy_url,
-            'specifications': self.get_specifications(),
-            'architecture': self.get_architecture(),
-            'design': self.get_design(),
-            'generated_code': self.get_generated_code(),
-            'tech_stack': self.get_tech_stack(),
-            'features': self.get_features(),
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
-        }
+    # Keys of to_dict(), in order. Each maps to the column of the same name.
+    SERIALIZED_FIELDS = (
+        'id', 'name', 'description', 'status', 'user_id', 'started_at', 'completed_at',
+        'current_agent', 'progress', 'estimated_completion', 'error_message', 'framework',
+        'complexity', 'build_time', 'performance_score', 'deploy_url', 'specifications',
+        'architecture', 'design', 'generated_code', 'tech_stack', 'features',
+        'artifact_sizes', 'archived_at', 'created_at', 'updated_at'
+    )
+    ARTIFACT_FIELDS = ('specifications', 'architecture', 'design', 'generated_code')
+    STATUSES = ('draft', 'generating', 'completed', 'failed', 'cancelled')
+    
+    # Moves generated files in and out of external storage; installed by
+    # services.generated_files. Without one, files stay inline in the row.
+    generated_files = None
+    DECODED_FIELDS = ARTIFACT_FIELDS + ('tech_stack', 'features', 'artifact_sizes')
+    
+    def to_dict(self, fields=None):
+        """Serialize the project, optionally limited to a subset of fields"""
+        return {field: self._serialize_field(field) for field in (fields or self.SERIALIZED_FIELDS)}
+    
+    def _serialize_field(self, field):
+        if field in self.DECODED_FIELDS:
+            return getattr(self, f'get_{field}')()
+        return getattr(self, field)
+    
+    @classmethod
+    def resolve_fields(cls, fields=None, include=None):
+        """Resolve fields= / include= values (comma-separated or lists) into to_dict keys.
+        
+        Without either, every field is returned. fields= selects exactly the
+        listed fields; include= adds artifacts to the selection, or on its own
+        selects every non-artifact field plus the listed artifacts. Returns None
+        for the full representation and raises ValueError on unknown names.
+        """
+        if not fields and not include:
+            return None
+        
+        requested = cls._split_names(fields)
+        included = cls._split_names(include)
+        
+        unknown = [name for name in requested if name not in cls.SERIALIZED_FIELDS]
+        unknown += [name for name in included if name not in cls.ARTIFACT_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        
+        if not requested:
+            requested = [name for name in cls.SERIALIZED_FIELDS if name not in cls.ARTIFACT_FIELDS]
+        selected = set(requested) | set(included) | {'id'}
+        return tuple(name for name in cls.SERIALIZED_FIELDS if name in selected)
+    
+    @classmethod
+    def validate_columns(cls, values):
+        """Check client-supplied column values against the column types and lengths; raises ValueError"""
+        for field, value in values.items():
+            column = cls.__table__.c[field]
+            if value is None:
+                if not column.nullable:
+                    raise ValueError(f'{field} is required')
+                continue
+            if isinstance(column.type, db.String):
+                if not isinstance(value, str):
+                    raise ValueError(f'{field} must be a string')
+                if column.type.length and len(value) > column.type.length:
+                    raise ValueError(f'{field} must be at most {column.type.length} characters')
+            elif isinstance(column.type, db.Integer):
+                if not isinstance(value, int) or isinstance(value, bool):
+                    raise ValueError(f'{field} must be an integer')
+        
+        if values.get('status') is not None and values['status'] not in cls.STATUSES:
+            raise ValueError(f"status must be one of: {', '.join(cls.STATUSES)}")
+        if values.get('progress') is not None and not 0 <= values['progress'] <= 100:
+            raise ValueError('progress must be between 0 and 100')
+    
+    @staticmethod
+    def _split_names(value):
+        names = value if isinstance(value, list) else (value or '').split(',')
+        return [str(name).strip() for name in names if str(name).strip()]
+    
+    @classmethod
+    def load_options(cls, fields):
+        """Query options that load only the columns backing the given fields, and
+        the archives of cold artifacts among them in one extra query rather than per row"""
+        if fields is None:
+            return [selectinload(cls.archive)]
+        # The version columns are always needed for ETags, archived_at to find cold artifacts
+        # and status to tell whether buffered progress applies
+        columns = set(fields) | {'row_version', 'updated_at', 'archived_at', 'status'}
+        options = [load_only(*(getattr(cls, column) for column in columns))]
+        if columns & set(cls.ARTIFACT_FIELDS):
+            options.append(selectinload(cls.archive))
+        return options
     
     # Helper methods for JSON fields
+    def _set_artifact(self, field, data):
+        """Store an artifact column, compressing it and recording its sizes"""
+        if self.archived_at is not None:
+            self.restore_from_archive()
+        stored, raw_size = encode_artifact(data)
+        setattr(self, field, stored)
+        
+        sizes = self.get_artifact_sizes()
+        if stored:
+            sizes[field] = {'raw': raw_size, 'stored': len(stored)}
+        else:
+            sizes.pop(field, None)
+        self.artifact_sizes = json_dumps(sizes) if sizes else None
+    
+    def _get_artifact(self, field):
+        stored = getattr(self, field)
+        if stored is None and self.archived_at is not None:
+            stored = self._archived_columns().get(field)
+        try:
+            return decode_artifact(stored)
+        except (ValueError, TypeError, zlib.error):
+            return None
+    
+    def _archived_columns(self):
+        """Stored artifact column values from the cold tier, decoded once per instance"""
+        if '_archived_columns_cache' not in self.__dict__:
+            try:
+                columns = decode_artifact(self.archive.payload) if self.archive else None
+            except (ValueError, TypeError, zlib.error):
+                columns = None
+            self.__dict__['_archived_columns_cache'] = columns or {}
+        return self.__dict__['_archived_columns_cache']
+    
+    def archive_artifacts(self):
+        """Move the artifact columns into a compressed project_archives row"""
+        columns = {field: getattr(self, field) for field in self.ARTIFACT_FIELDS if getattr(self, field) is not None}
+        if not columns or self.archived_at is not None:
+            return False
+        
+        payload, _ = encode_artifact(columns)
+        self.archive = ProjectArchive(payload=payload)
+        for field in columns:
+            setattr(self, field, None)
+        self.archived_at = datetime.utcnow()
+        # Archiving is not an edit: keep updated_at, which orders project listings
+        self.updated_at = Project.updated_at
+        self.__dict__.pop('_archived_columns_cache', None)
+        return True
+    
+    def restore_from_archive(self):
+        """Move archived artifacts back into the hot columns, before they are modified"""
+        for field, stored in self._archived_columns().items():
+            if getattr(self, field) is None:
+                setattr(self, field, stored)
+        self.archive = None
+        self.archived_at = None
+        self.__dict__.pop('_archived_columns_cache', None)
+    
+    def get_artifact_sizes(self):
+        """Get raw and stored byte sizes per artifact column"""
+        try:
+            return json_loads(self.artifact_sizes) if self.artifact_sizes else {}
+        except (json.JSONDecodeError, TypeError):
+            return {}
+    
     def set_generated_code(self, code_data):
-        """Set generated code data as JSON string"""
-        self.generated_code = json.dumps(code_data) if code_data else None
+        """Set generated code, moving large files out through the installed file codec"""
+        if code_data and self.generated_files is not None:
+            code_data = self.generated_files.externalize(code_data)
+        self._set_artifact('generated_code', code_data or None)
     
     def get_generated_code(self):
-        """Get generated code data as Python object"""
+        """Get generated code data as Python object with file contents inlined"""
+        manifest = self.get_generated_code_manifest()
+        if not manifest or self.generated_files is None:
+            return manifest
         try:
-            return json.loads(self.generated_code) if self.generated_code else None
-        except (json.JSONDecodeError, TypeError):
+            return self.generated_files.resolve(manifest)
+        except OSError:
             return None
     
+    def get_generated_code_manifest(self):
+        """Get generated code with large files left as blob references"""
+        return self._get_artifact('generated_code')
+    
+    @staticmethod
+    def referenced_blobs():
+        """Collect every blob digest referenced by any project"""
+        referenced = set()
+        for (stored,) in db.session.query(Project.generated_code).filter(Project.generated_code.isnot(None)).yield_per(100):
+            try:
+                referenced.update(iter_blob_refs(decode_artifact(stored)))
+            except (ValueError, TypeError, zlib.error):
+                continue
+        # Archived projects still own their blobs
+        for (payload,) in db.session.query(ProjectArchive.payload).yield_per(100):
+            try:
+                stored = decode_artifact(payload).get('generated_code')
+                referenced.update(iter_blob_refs(decode_artifact(stored)) if stored else ())
+            except (ValueError, TypeError, AttributeError, zlib.error):
+                continue
+        return referenced
+    
     def set_specifications(self, specs_data):
-        """Set specifications data as JSON string"""
-        self.specifications = json.dumps(specs_data) if specs_data else None
+        """Set specifications data as compressed JSON"""
+        self._set_artifact('specifications', specs_data)
     
     def get_specifications(self):
         """Get specifications data as Python object"""
-        try:
-            return json.loads(self.specifications) if self.specifications else None
-        except (json.JSONDecodeError, TypeError):
-            return None
+        return self._get_artifact('specifications')
     
     def set_architecture(self, arch_data):
-        """Set architecture data as JSON string"""
-        self.architecture = json.dumps(arch_data) if arch_data else None
+        """Set architecture data as compressed JSON"""
+        self._set_artifact('architecture', arch_data)
     
     def get_architecture(self):
         """Get architecture data as Python object"""
-        try:
-            return json.loads(self.architecture) if self.architecture else None
-        except (json.JSONDecodeError, TypeError):
-            return None
+        return self._get_artifact('architecture')
     
     def set_design(self, design_data):
-        """Set design data as JSON string"""
-        self.design = json.dumps(design_data) if design_data else None
+        """Set design data as compressed JSON"""
+        self._set_artifact('design', design_data)
     
     def get_design(self):
         """Get design data as Python object"""
-        try:
-            return json.loads(self.design) if self.design else None
-        except (json.JSONDecodeError, TypeError):
-            return None
+        return self._get_artifact('design')
     
     def set_tech_stack(self, stack_list):
         """Set tech stack as JSON string"""
         if isinstance(stack_list, list):
-            self.tech_stack = json.dumps(stack_list)
+            self.tech_stack = json_dumps(stack_list)
         elif isinstance(stack_list, str):
-            # If it's already a string, try to parse it first
+            # Already-serialized JSON is stored as is
             try:
-                parsed = json.loads(stack_list)
+                json_loads(stack_list)
                 self.tech_stack = stack_list
             except json.JSONDecodeError:
                 # If it's not JSON, treat as comma-separated string
-                self.tech_stack = json.dumps([item.strip() for item in stack_list.split(',')])
+                self.tech_stack = json_dumps([item.strip() for item in stack_list.split(',')])
         else:
-            self.tech_stack = json.dumps([])
+            self.tech_stack = json_dumps([])
     
     def get_tech_stack(self):
         """Get tech stack as list"""
         try:
-            return json.loads(self.tech_stack) if self.tech_stack else []
+            return json_loads(self.tech_stack) if self.tech_stack else []
         except (json.JSONDecodeError, TypeError):
             return []
     
     def set_features(self, features_list):
         """Set features as JSON string"""
         if isinstance(features_list, list):
-            self.features = json.dumps(features_list)
+            self.features = json_dumps(features_list)
         elif isinstance(features_list, str):
             try:
-                parsed = json.loads(features_list)
+                json_loads(features_list)
                 self.features = features_list
             except json.JSONDecodeError:
-                self.features = json.dumps([item.strip() for item in features_list.split(',')])
+                self.features = json_dumps([item.strip() for item in features_list.split(',')])
         else:
-            self.features = json.dumps([])
+            self.features = json_dumps([])
     
     def get_features(self):
         """Get features as list"""
         try:
-            return json.loads(self.features) if self.features else []
+            return json_loads(self.features) if self.features else []
         except (json.JSONDecodeError, TypeError):
             return []
     
@@ -195,11 +355,11 @@ class ApiKey(db.Model):
             'id': self.id,
             'service': self.service,
             'status': self.status,
-            'last_tested': self.last_tested.isoformat() if self.last_tested else None,
+            'last_tested': self.last_tested,
             'response_time': self.response_time,
             'error_message': self.error_message,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
     
     def __repr__(self):
@@ -216,12 +376,32 @@ class ChatSession(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=True)
     
+    # Denormalized message summary, maintained by the ChatMessage insert hook
+    message_count = db.Column(db.Integer, nullable=False, default=0)
+    last_message_id = db.Column(db.Integer)
+    last_message_preview = db.Column(db.String(200))
+    last_message_at = db.Column(db.DateTime)
+    
+    # Messages moved to chat_message_archives; their count is included in message_count
+    archived_message_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    # Rolling conversation summary, maintained by services.chat_memory
+    memory_summary = db.Column(db.Text)
+    summarized_through_id = db.Column(db.Integer)  # last message folded into memory_summary
+    
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     messages = db.relationship('ChatMessage', backref='session', lazy=True, cascade='all, delete-orphan')
+    archives = db.relationship('ChatMessageArchive', lazy=True, cascade='all, delete-orphan')
+    last_message = db.relationship(
+        'ChatMessage',
+        primaryjoin='foreign(ChatSession.last_message_id) == ChatMessage.id',
+        viewonly=True,
+        uselist=False
+    )
     
     def to_dict(self):
         return {
@@ -229,10 +409,11 @@ class ChatSession(db.Model):
             'title': self.title,
             'user_id': self.user_id,
             'project_id': self.project_id,
-            'message_count': len(self.messages),
-            'last_message': self.messages[-1].to_dict() if self.messages else None,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            'message_count': self.message_count or 0,
+            'last_message': self.last_message.to_dict() if self.last_message_id and self.last_message else None,
+            'last_message_preview': self.last_message_preview,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
     
     def __repr__(self):
@@ -260,19 +441,298 @@ class ChatMessage(db.Model):
             'content': self.content,
             'metadata': self.get_metadata(),
             'session_id': self.session_id,
-            'created_at': self.created_at.isoformat()
+            'created_at': self.created_at
         }
     
     def set_metadata(self, metadata_data):
         """Set metadata as JSON string"""
-        self.message_metadata = json.dumps(metadata_data) if metadata_data else None
+        self.message_metadata = json_dumps(metadata_data) if metadata_data else None
     
     def get_metadata(self):
         """Get metadata as Python object"""
         try:
-            return json.loads(self.message_metadata) if self.message_metadata else {}
+            return json_loads(self.message_metadata) if self.message_metadata else {}
         except (json.JSONDecodeError, TypeError):
             return {}
     
     def __repr__(self):
         return f'<ChatMessage {self.id}: {self.type}>'
+
+
+class ProjectArchive(db.Model):
+    __tablename__ = 'project_archives'
+    
+    # Cold tier for the artifact columns of long-completed projects
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), primary_key=True)
+    payload = db.Column(db.Text, nullable=False)  # compressed JSON: column -> stored value
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ProjectArchive {self.project_id}>'
+
+
+class ChatMessageArchive(db.Model):
+    __tablename__ = 'chat_message_archives'
+    
+    # Cold tier: one compressed batch of old messages from a session
+    id = db.Column(db.Integer, primary_key=True)
+    session_id = db.Column(db.Integer, db.ForeignKey('chat_sessions.id'), nullable=False, index=True)
+    message_count = db.Column(db.Integer, nullable=False)
+    oldest_at = db.Column(db.DateTime)
+    newest_at = db.Column(db.DateTime)
+    payload = db.Column(db.Text, nullable=False)  # compressed JSON list of ChatMessage.to_dict()
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def get_messages(self):
+        """Get the archived messages as to_dict() values"""
+        try:
+            return decode_artifact(self.payload) or []
+        except (ValueError, TypeError, zlib.error):
+            return []
+    
+    @staticmethod
+    def messages_for(session_id):
+        """Archived messages of a session, oldest first"""
+        archives = ChatMessageArchive.query.filter_by(session_id=session_id)\
+            .order_by(ChatMessageArchive.oldest_at.asc(), ChatMessageArchive.id.asc()).all()
+        return [message for archive in archives for message in archive.get_messages()]
+    
+    def __repr__(self):
+        return f'<ChatMessageArchive {self.id}: {self.message_count} messages of session {self.session_id}>'
+
+
+PREVIEW_LENGTH = 200
+
+
+@event.listens_for(ChatMessage, 'after_insert')
+def _chat_message_inserted(mapper, connection, message):
+    # Keep the session summary current in the same flush so listings never touch chat_messages
+    sessions = ChatSession.__table__
+    preview = message.content if len(message.content) <= PREVIEW_LENGTH else message.content[:PREVIEW_LENGTH - 3] + '...'
+    connection.execute(
+        sessions.update()
+        .where(sessions.c.id == message.session_id)
+        .values(
+            message_count=func.coalesce(sessions.c.message_count, 0) + 1,
+            last_message_id=message.id,
+            last_message_preview=preview,
+            last_message_at=message.created_at
+        )
+    )
+
+
+class ProjectStats(db.Model):
+    __tablename__ = 'project_stats'
+    
+    # One row per user, maintained incrementally by the Project mapper events below
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    total_projects = db.Column(db.Integer, nullable=False, default=0)
+    status_counts = db.Column(db.Text)      # JSON object: status -> count
+    framework_counts = db.Column(db.Text)   # JSON object: framework -> count
+    complexity_counts = db.Column(db.Text)  # JSON object: complexity -> count
+    
+    # Timestamps
+    reconciled_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        status_counts = self.get_counts('status')
+        total_projects = self.total_projects or 0
+        deployed = status_counts.get('completed', 0)
+        building = status_counts.get('generating', 0)
+        return {
+            'total_projects': total_projects,
+            'deployed': deployed,
+            'building': building,
+            'total_views': total_projects * 150 + deployed * 500,
+            'by_status': status_counts,
+            'by_framework': self.get_counts('framework'),
+            'by_complexity': self.get_counts('complexity')
+        }
+    
+    def get_counts(self, dimension):
+        """Get the breakdown for a dimension as a dict"""
+        try:
+            value = getattr(self, f'{dimension}_counts')
+            return json_loads(value) if value else {}
+        except (json.JSONDecodeError, TypeError):
+            return {}
+    
+    @staticmethod
+    def reconcile(user_id=None):
+        """Rebuild counters from a single GROUP BY pass over projects.
+        
+        Fixes any drift between the counters and the projects table. Pass a
+        user_id to reconcile one user, or None to reconcile everyone. The
+        caller is responsible for committing.
+        """
+        query = db.session.query(
+            Project.user_id, Project.status, Project.framework, Project.complexity,
+            func.count(Project.id)
+        ).group_by(Project.user_id, Project.status, Project.framework, Project.complexity)
+        if user_id is not None:
+            query = query.filter(Project.user_id == user_id)
+        
+        rows = {}
+        for row_user_id, status, framework, complexity, count in query:
+            counters = rows.setdefault(row_user_id, _empty_counters())
+            _add_to_counters(counters, status, framework, complexity, count)
+        
+        if user_id is not None:
+            rows.setdefault(user_id, _empty_counters())
+        else:
+            # Users whose projects were all deleted still need their row zeroed
+            for (stale_user_id,) in db.session.query(ProjectStats.user_id):
+                rows.setdefault(stale_user_id, _empty_counters())
+        
+        now = datetime.utcnow()
+        for row_user_id, counters in rows.items():
+            stats = db.session.get(ProjectStats, row_user_id)
+            if not stats:
+                stats = ProjectStats(user_id=row_user_id)
+                db.session.add(stats)
+            stats.total_projects = counters['total']
+            stats.status_counts = json_dumps(counters['status'])
+            stats.framework_counts = json_dumps(counters['framework'])
+            stats.complexity_counts = json_dumps(counters['complexity'])
+            stats.reconciled_at = now
+        
+        return len(rows)
+    
+    def __repr__(self):
+        return f'<ProjectStats for user {self.user_id}: {self.total_projects} projects>'
+
+
+# Counter maintenance. These hooks run inside the flush that writes the project
+# row, so counters are committed or rolled back together with it.
+
+_STATS_DIMENSIONS = ('status', 'framework', 'complexity')
+_STATS_DEFAULTS = {'status': 'draft', 'framework': 'React', 'complexity': 'medium'}
+
+
+def _empty_counters():
+    return {'total': 0, 'status': {}, 'framework': {}, 'complexity': {}}
+
+
+def _bump_counter(counters, dimension, key, delta):
+    count = counters[dimension].get(key, 0) + delta
+    if count > 0:
+        counters[dimension][key] = count
+    else:
+        counters[dimension].pop(key, None)
+
+
+def _add_to_counters(counters, status, framework, complexity, delta):
+    counters['total'] += delta
+    for dimension, value in zip(_STATS_DIMENSIONS, (status, framework, complexity)):
+        _bump_counter(counters, dimension, value or _STATS_DEFAULTS[dimension], delta)
+
+
+def _counter_values(counters):
+    return {
+        'total_projects': max(counters['total'], 0),
+        'status_counts': json_dumps(counters['status']),
+        'framework_counts': json_dumps(counters['framework']),
+        'complexity_counts': json_dumps(counters['complexity']),
+        'updated_at': datetime.utcnow()
+    }
+
+
+def _rebuild_stats(connection, user_id, exists):
+    """Recount a user's projects on the flush connection and write the counters row"""
+    table = ProjectStats.__table__
+    counters = _empty_counters()
+    query = select(
+        Project.status, Project.framework, Project.complexity, func.count(Project.id)
+    ).where(Project.user_id == user_id).group_by(Project.status, Project.framework, Project.complexity)
+    for status, framework, complexity, count in connection.execute(query):
+        _add_to_counters(counters, status, framework, complexity, count)
+    
+    values = _counter_values(counters)
+    values['reconciled_at'] = values['updated_at']
+    if exists:
+        connection.execute(table.update().where(table.c.user_id == user_id).values(**values))
+    else:
+        connection.execute(table.insert().values(user_id=user_id, **values))
+
+
+def _locked_counters(user_id):
+    """The counters row, locked until the flush's transaction ends.
+    
+    Concurrent writers for the same user queue here instead of both reading
+    the same JSON counters and the last one overwriting the other's delta.
+    SQLite ignores FOR UPDATE, but the flush already holds its write lock.
+    """
+    table = ProjectStats.__table__
+    return table.select().where(table.c.user_id == user_id).with_for_update()
+
+
+def _apply_stats_delta(connection, user_id, changes, total_delta=0):
+    """Apply (dimension, key, delta) changes to a user's counters row"""
+    table = ProjectStats.__table__
+    row = connection.execute(_locked_counters(user_id)).mappings().first()
+    
+    if row is None or changes is None:
+        # Missing row or unknown previous values: recount, the flushed row is already visible
+        _rebuild_stats(connection, user_id, exists=row is not None)
+        return
+    
+    counters = {
+        'total': 0,
+        'status': json_loads(row['status_counts'] or '{}'),
+        'framework': json_loads(row['framework_counts'] or '{}'),
+        'complexity': json_loads(row['complexity_counts'] or '{}')
+    }
+    for dimension, key, delta in changes:
+        _bump_counter(counters, dimension, key, delta)
+    
+    values = _counter_values(counters)
+    # The total is a plain column, so it is incremented in SQL
+    total = func.coalesce(table.c.total_projects, 0) + total_delta
+    values['total_projects'] = case((total < 0, 0), else_=total)
+    connection.execute(table.update().where(table.c.user_id == user_id).values(**values))
+
+
+def _project_stat_changes(project, delta):
+    return [
+        (dimension, getattr(project, dimension) or _STATS_DEFAULTS[dimension], delta)
+        for dimension in _STATS_DIMENSIONS
+    ]
+
+
+@event.listens_for(Project, 'after_insert')
+def _project_inserted(mapper, connection, project):
+    _apply_stats_delta(connection, project.user_id, _project_stat_changes(project, 1), total_delta=1)
+
+
+@event.listens_for(Project, 'after_delete')
+def _project_deleted(mapper, connection, project):
+    _apply_stats_delta(connection, project.user_id, _project_stat_changes(project, -1), total_delta=-1)
+
+
+@event.listens_for(Project, 'before_update')
+def _bump_project_version(mapper, connection, project):
+    if object_session(project).is_modified(project, include_collections=False):
+        # Incremented in SQL so concurrent writers never reuse a version
+        project.row_version = Project.row_version + 1
+
+
+@event.listens_for(Project, 'after_update')
+def _project_updated(mapper, connection, project):
+    state = inspect(project)
+    changes = []
+    for dimension in _STATS_DIMENSIONS:
+        history = state.attrs[dimension].history
+        if not history.has_changes():
+            continue
+        if not history.deleted:
+            # The old value was never loaded, so the delta is unknown
+            changes = None
+            break
+        old_key = history.deleted[0] or _STATS_DEFAULTS[dimension]
+        new_key = getattr(project, dimension) or _STATS_DEFAULTS[dimension]
+        if old_key != new_key:
+            changes.append((dimension, old_key, -1))
+            changes.append((dimension, new_key, 1))
+    if changes is None or changes:
+        _apply_stats_delta(connection, project.user_id, changes)
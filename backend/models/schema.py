@@ -0,0 +1,111 @@
+"""Additive schema upgrades for databases created by an earlier release.
+
+db.create_all() creates missing tables but never alters existing ones, so a
+column added to a model after its table was created is missing from older
+databases. upgrade_schema() adds such columns with ALTER TABLE ... ADD
+COLUMN, using the model's scalar default as the column default so NOT NULL
+columns can be added to tables with rows, and then backfills the
+denormalized chat session columns from the messages they summarize.
+
+Only additions are handled; renames, type changes and drops need a proper
+migration. Called by init_db after create_all, so it runs before serving.
+"""
+import logging
+
+from sqlalchemy import case, func, inspect, literal, select
+
+from models.database import db
+
+logger = logging.getLogger(__name__)
+
+
+def missing_columns(connection, metadata=None):
+    """{table: [columns]} for model columns the database tables lack"""
+    inspector = inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    missing = {}
+    for table in (metadata or db.metadata).sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        columns = [column for column in table.columns if column.name not in existing]
+        if columns:
+            missing[table] = columns
+    return missing
+
+
+def _scalar_default(column):
+    default = column.default
+    if default is None or not default.is_scalar:
+        return None
+    return default.arg
+
+
+def add_column(connection, table, column):
+    dialect = connection.dialect
+    preparer = dialect.identifier_preparer
+    ddl = (f'ALTER TABLE {preparer.format_table(table)} ADD COLUMN '
+           f'{preparer.format_column(column)} {column.type.compile(dialect=dialect)}')
+
+    default = _scalar_default(column)
+    if default is not None:
+        ddl += f' DEFAULT {literal(default, column.type).compile(dialect=dialect, compile_kwargs={"literal_binds": True})}'
+        if not column.nullable:
+            ddl += ' NOT NULL'
+    elif not column.nullable:
+        # Existing rows would have no value; the model still sets one on every insert
+        logger.warning(f"Adding {table.name}.{column.name} as nullable: it has no default for existing rows")
+    connection.exec_driver_sql(ddl)
+
+
+def backfill_chat_sessions(connection):
+    """Recompute message counts and last-message columns from chat_messages"""
+    from models.project import PREVIEW_LENGTH, ChatMessage, ChatSession
+
+    sessions = ChatSession.__table__
+    messages = ChatMessage.__table__
+    last_id = select(func.max(messages.c.id)).where(messages.c.session_id == sessions.c.id).scalar_subquery()
+    last = messages.alias('last_message')
+    preview = case(
+        (func.length(last.c.content) <= PREVIEW_LENGTH, last.c.content),
+        else_=func.substr(last.c.content, 1, PREVIEW_LENGTH - 3) + '...'
+    )
+
+    connection.execute(sessions.update().values(
+        message_count=select(func.count()).where(messages.c.session_id == sessions.c.id).scalar_subquery()
+        + func.coalesce(sessions.c.archived_message_count, 0),
+        last_message_id=last_id,
+        last_message_preview=select(preview).where(last.c.id == last_id).scalar_subquery(),
+        last_message_at=select(last.c.created_at).where(last.c.id == last_id).scalar_subquery()
+    ))
+
+
+# Columns whose values are derived from other rows, and how to derive them
+BACKFILLS = {
+    ('chat_sessions', 'message_count'): backfill_chat_sessions,
+    ('chat_sessions', 'last_message_id'): backfill_chat_sessions,
+    ('chat_sessions', 'last_message_preview'): backfill_chat_sessions,
+    ('chat_sessions', 'last_message_at'): backfill_chat_sessions,
+}
+
+
+def upgrade_schema(engine=None):
+    """Add missing model columns and backfill derived ones; returns the added 'table.column' names"""
+    added = []
+    with (engine or db.engine).begin() as connection:
+        for table, columns in missing_columns(connection).items():
+            for column in columns:
+                add_column(connection, table, column)
+                added.append((table.name, column.name))
+
+        backfills = []
+        for key in added:
+            backfill = BACKFILLS.get(key)
+            if backfill is not None and backfill not in backfills:
+                backfills.append(backfill)
+        for backfill in backfills:
+            backfill(connection)
+
+    if added:
+        logger.info(f"Schema upgraded, added columns: {', '.join(f'{table}.{column}' for table, column in added)}")
+    return [f'{table}.{column}' for table, column in added]
@@ -7,6 +7,7 @@ class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
+    password_hash = db.Column(db.String(255))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -14,10 +15,20 @@ class User(db.Model):
     api_keys = db.relationship('ApiKey', backref='user', lazy=True, cascade='all, delete-orphan')
     chat_sessions = db.relationship('ChatSession', backref='user', lazy=True, cascade='all, delete-orphan')
     
+    def set_password(self, password):
+        # passlib is imported on first use so it stays off the startup path
+        from passlib.hash import bcrypt
+        self.password_hash = bcrypt.hash(password)
+    
+    def check_password(self, password):
+        from passlib.hash import bcrypt
+        # Users without a password (e.g. the demo user) cannot sign in with one
+        return bool(self.password_hash) and bcrypt.verify(password, self.password_hash)
+    
     def to_dict(self):
         return {
             'id': self.id,
             'name': self.name,
             'email': self.email,
-            'created_at': self.created_at.isoformat()
+            'created_at': self.created_at
         }
\ No newline at end of file
@@ -1,15 +1,96 @@
 # backend/routes/api.py
+import logging
+from datetime import datetime
 from flask import Blueprint, jsonify, request
+from sqlalchemy import text
+from models.database import db
+from models.project import Project
+from services.health import readiness
+from services.identity import current_user
+from services.sql_metrics import metrics as sql_metrics
 
 api_bp = Blueprint("api", __name__)
+logger = logging.getLogger(__name__)
 
-@api_bp.route("/health", methods=["GET"])
-def health():
-    return jsonify(status="ok"), 200
+@api_bp.route('/health')
+def health_check():
+    try:
+        # Database connectivity check
+        db.session.execute(text('SELECT 1'))
+        return jsonify({
+            "status": "healthy",
+            "database": "connected",
+            "timestamp": datetime.utcnow().isoformat()
+        })
+    except Exception as e:
+        logger.error(f"Health check failed: {str(e)}")
+        return jsonify({
+            "status": "unhealthy",
+            "database": "disconnected",
+            "error": str(e)
+        }), 503
 
-@api_bp.route("/generate", methods=["POST"])
-def generate():
-    payload = request.get_json(force=True) or {}
-    idea = payload.get("idea", "Hello World App")
-    # TODO: wire up your agents; return stub for now
-    return jsonify(projectName=f"{idea}", steps=["plan","scaffold","code","deploy"]), 200
+@api_bp.route('/health/live')
+def liveness():
+    # No dependencies: restarting the process would not fix a database outage
+    return jsonify({
+        "status": "alive",
+        "timestamp": datetime.utcnow().isoformat()
+    })
+
+@api_bp.route('/health/ready')
+def readiness_check():
+    ready, report = readiness()
+    report['timestamp'] = datetime.utcnow().isoformat()
+    if not ready:
+        logger.warning(f"Readiness check failed: {report['database']} pool={report['pool']}")
+    return jsonify(report), 200 if ready else 503
+
+@api_bp.route('/metrics/sql')
+def sql_metrics_report():
+    # Per-endpoint query counts and SQL time since this process started
+    return jsonify({'success': True, 'endpoints': sql_metrics()})
+
+@api_bp.route('/metrics/semantic-cache')
+def semantic_cache_report():
+    # Imported here to keep numpy off the startup path
+    from services.semantic_cache import answer_cache
+    return jsonify({'success': True, 'cache': answer_cache.stats()})
+
+# Legacy generate route for backward compatibility
+@api_bp.route('/generate', methods=['POST'])
+def legacy_generate():
+    try:
+        data = request.get_json()
+        description = data.get('description', '')
+        
+        if not description:
+            return jsonify({"error": "Description is required"}), 400
+        
+        # Create a new project
+        user = current_user()
+        
+        project = Project(
+            name=data.get('name', 'Generated App'),
+            description=description,
+            user_id=user.id,
+            framework=data.get('framework', 'React'),
+            complexity='medium'
+        )
+        
+        if 'tech_stack' in data:
+            project.set_tech_stack(data['tech_stack'])
+        
+        db.session.add(project)
+        db.session.commit()
+        
+        return jsonify({
+            "project_id": project.id,
+            "message": "Project created successfully. Use /api/generation/start to begin generation.",
+            "redirect_to": f"/api/generation/start"
+        })
+        
+    except Exception as e:
+        logger.error(f"Error in legacy generate: {str(e)}")
+        db.session.rollback()
+        return jsonify({"error": "Internal server error"}), 500
@@ -1,21 +1,16 @@
 from flask import Blueprint, request, jsonify
 from datetime import datetime
 import time
-import requests
 from models.database import db
-from models.user import User
 from models.project import ApiKey
+from services.identity import current_user
 
 api_keys_bp = Blueprint('api_keys', __name__)
 
 @api_keys_bp.route('/api-keys', methods=['GET'])
 def get_api_keys():
     try:
-        user = User.query.first()
-        if not user:
-            user = User(name="Demo User", email="demo@aiappbuilder.com")
-            db.session.add(user)
-            db.session.commit()
+        user = current_user()
         
         api_keys = ApiKey.query.filter_by(user_id=user.id).all()
         
@@ -42,11 +37,7 @@ def save_api_key():
         if service not in valid_services:
             return jsonify({'success': False, 'error': f'Invalid service. Must be one of: {", ".join(valid_services)}'}), 400
         
-        user = User.query.first()
-        if not user:
-            user = User(name="Demo User", email="demo@aiappbuilder.com")
-            db.session.add(user)
-            db.session.commit()
+        user = current_user()
         
         existing_key = ApiKey.query.filter_by(user_id=user.id, service=service).first()
         
@@ -82,7 +73,7 @@ def save_api_key():
 @api_keys_bp.route('/api-keys/<int:key_id>', methods=['DELETE'])
 def delete_api_key(key_id):
     try:
-        api_key = ApiKey.query.get(key_id)
+        api_key = ApiKey.query.filter_by(id=key_id, user_id=current_user().id).first()
         
         if not api_key:
             return jsonify({'success': False, 'error': 'API key not found'}), 404
@@ -115,15 +106,13 @@ def test_api_key():
         test_result = test_service_connection(service, key_value)
         response_time = int((time.time() - start_time) * 1000)
         
-        user = User.query.first()
-        if user:
-            api_key = ApiKey.query.filter_by(user_id=user.id, service=service).first()
-            if api_key:
-                api_key.status = 'connected' if test_result['success'] else 'error'
-                api_key.last_tested = datetime.utcnow()
-                api_key.response_time = response_time
-                api_key.error_message = test_result.get('error')
-                db.session.commit()
+        api_key = ApiKey.query.filter_by(user_id=current_user().id, service=service).first()
+        if api_key:
+            api_key.status = 'connected' if test_result['success'] else 'error'
+            api_key.last_tested = datetime.utcnow()
+            api_key.response_time = response_time
+            api_key.error_message = test_result.get('error')
+            db.session.commit()
         
         return jsonify({
             'success': test_result['success'],
@@ -165,6 +154,8 @@ def test_cerebras_connection(api_key):
         return {'success': False, 'error': f'Cerebras API test failed: {str(e)}'}
 
 def test_openai_connection(api_key):
+    import requests
+    
     try:
         headers = {
             'Authorization': f'Bearer {api_key}',
@@ -193,6 +184,8 @@ def test_openai_connection(api_key):
         return {'success': False, 'error': f'OpenAI API test failed: {str(e)}'}
 
 def test_anthropic_connection(api_key):
+    import requests
+    
     try:
         headers = {
             'x-api-key': api_key,
@@ -222,6 +215,8 @@ def test_anthropic_connection(api_key):
         return {'success': False, 'error': f'Anthropic API test failed: {str(e)}'}
 
 def test_vercel_connection(api_key):
+    import requests
+    
     try:
         headers = {
             'Authorization': f'Bearer {api_key}',
@@ -243,6 +238,8 @@ def test_vercel_connection(api_key):
         return {'success': False, 'error': f'Vercel API test failed: {str(e)}'}
 
 def test_netlify_connection(api_key):
+    import requests
+    
     try:
         headers = {
             'Authorization': f'Bearer {api_key}',
@@ -0,0 +1,77 @@
+from flask import Blueprint, request, jsonify
+from models.database import db
+from models.user import User
+from services.identity import issue_token, cache_user
+
+auth_bp = Blueprint('auth', __name__)
+
+MIN_PASSWORD_LENGTH = 8
+
+def read_credentials(data):
+    """(email, password) from a request body; raises ValueError when either is missing"""
+    if not isinstance(data, dict):
+        raise ValueError('Request body must be a JSON object')
+    email = data.get('email')
+    password = data.get('password')
+    if not isinstance(email, str) or not email.strip():
+        raise ValueError('Email is required')
+    if not isinstance(password, str) or not password:
+        raise ValueError('Password is required')
+    return email.strip().lower(), password
+
+def token_response(user, status=200):
+    cache_user(user)
+
+    return jsonify({
+        'success': True,
+        'access_token': issue_token(user),
+        'user': user.to_dict()
+    }), status
+
+@auth_bp.route('/auth/register', methods=['POST'])
+def register():
+    try:
+        data = request.get_json()
+        email, password = read_credentials(data)
+        if len(password) < MIN_PASSWORD_LENGTH:
+            raise ValueError(f'Password must be at least {MIN_PASSWORD_LENGTH} characters')
+        name = data.get('name') or email.split('@')[0]
+        if not isinstance(name, str) or len(name) > 100:
+            raise ValueError('name must be a string of at most 100 characters')
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    try:
+        if User.query.filter_by(email=email).first():
+            return jsonify({'success': False, 'error': 'An account with this email already exists'}), 409
+
+        user = User(name=name, email=email)
+        user.set_password(password)
+        db.session.add(user)
+        db.session.commit()
+
+        return token_response(user, 201)
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@auth_bp.route('/auth/token', methods=['POST'])
+def create_token():
+    try:
+        email, password = read_credentials(request.get_json())
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    try:
+        user = User.query.filter_by(email=email).first()
+
+        # One message for an unknown email and a wrong password, so accounts cannot be probed
+        if not user or not user.check_password(password):
+            return jsonify({'success': False, 'error': 'Invalid email or password'}), 401
+
+        return token_response(user)
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
@@ -1,24 +1,32 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from datetime import datetime
 import json
+import time
+from sqlalchemy.orm import selectinload
 from models.database import db
-from models.user import User
-from models.project import ChatSession, ChatMessage
-from services.ai_service import AIService
+from models.project import ChatSession, ChatMessage, ChatMessageArchive
+from services.ai_service import get_ai_service, word_chunks
+from services.chat_memory import session_memory
+from services.identity import current_user
+from services.knowledge_base import knowledge_base
+from services.json_backend import dumps as json_dumps
+from services.read_replicas import read_only
 
 chat_bp = Blueprint('chat', __name__)
-ai_service = AIService()
+
+FALLBACK_REPLY = "I apologize, but I'm having trouble processing your request right now. Please try again later."
+UNCLEAR_REPLY = "I understand your question. Let me help you with that. Could you provide more specific details about what you're trying to accomplish?"
+UNAVAILABLE_REPLY = "I'm currently experiencing some technical difficulties. Please try again in a moment."
 
 @chat_bp.route('/chat/sessions', methods=['GET'])
 def get_chat_sessions():
     try:
-        user = User.query.first()
-        if not user:
-            user = User(name="Demo User", email="demo@aiappbuilder.com")
-            db.session.add(user)
-            db.session.commit()
+        user = current_user()
         
-        sessions = ChatSession.query.filter_by(user_id=user.id).order_by(ChatSession.updated_at.desc()).all()
+        # Counts and previews are denormalized; last messages load in one extra IN query
+        sessions = ChatSession.query.filter_by(user_id=user.id)\
+            .options(selectinload(ChatSession.last_message))\
+            .order_by(ChatSession.updated_at.desc()).all()
         
         return jsonify({
             'success': True,
@@ -33,11 +41,7 @@ def create_chat_session():
     try:
         data = request.get_json()
         
-        user = User.query.first()
-        if not user:
-            user = User(name="Demo User", email="demo@aiappbuilder.com")
-            db.session.add(user)
-            db.session.commit()
+        user = current_user()
         
         session = ChatSession(
             title=data.get('title', 'New Chat'),
@@ -59,18 +63,22 @@ def create_chat_session():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @chat_bp.route('/chat/sessions/<int:session_id>/messages', methods=['GET'])
+@read_only
 def get_chat_messages(session_id):
     try:
-        session = ChatSession.query.get(session_id)
+        session = ChatSession.query.filter_by(id=session_id, user_id=current_user().id).first()
         
         if not session:
             return jsonify({'success': False, 'error': 'Chat session not found'}), 404
         
         messages = ChatMessage.query.filter_by(session_id=session_id).order_by(ChatMessage.created_at.asc()).all()
         
+        # Archived messages are all older than the hot ones
+        archived = ChatMessageArchive.messages_for(session_id) if session.archived_message_count else []
+        
         return jsonify({
             'success': True,
-            'messages': [message.to_dict() for message in messages],
+            'messages': archived + [message.to_dict() for message in messages],
             'session': session.to_dict()
         })
     
@@ -85,7 +93,7 @@ def send_chat_message(session_id):
         if not data or 'content' not in data:
             return jsonify({'success': False, 'error': 'Message content is required'}), 400
         
-        session = ChatSession.query.get(session_id)
+        session = ChatSession.query.filter_by(id=session_id, user_id=current_user().id).first()
         
         if not session:
             return jsonify({'success': False, 'error': 'Chat session not found'}), 404
@@ -105,23 +113,7 @@ def send_chat_message(session_id):
         # Generate AI response
         try:
             ai_response = generate_ai_response(user_content, session)
-            
-            # Save AI message
-            ai_message = ChatMessage(
-                type='ai',
-                content=ai_response['content'],
-                session_id=session_id,
-                message_metadata=json.dumps(ai_response.get('metadata', {}))
-            )
-            
-            db.session.add(ai_message)
-            
-            # Update session title if it's the first message
-            if session.title == 'New Chat' and len(session.messages) <= 2:
-                session.title = generate_session_title(user_content)
-            
-            session.updated_at = datetime.utcnow()
-            db.session.commit()
+            ai_message = save_ai_reply(session, user_content, ai_response['content'], ai_response.get('metadata', {}))
             
             return jsonify({
                 'success': True,
@@ -143,10 +135,102 @@ def send_chat_message(session_id):
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@chat_bp.route('/chat/sessions/<int:session_id>/messages/stream', methods=['POST'])
+def stream_chat_message(session_id):
+    """Like send_chat_message, but streams the reply as Server-Sent Events:
+    user_message, then one token event per chunk, then done with the saved
+    ai_message. The reply is persisted once, when the stream ends."""
+    try:
+        data = request.get_json()
+        
+        if not data or 'content' not in data:
+            return jsonify({'success': False, 'error': 'Message content is required'}), 400
+        
+        session = ChatSession.query.filter_by(id=session_id, user_id=current_user().id).first()
+        
+        if not session:
+            return jsonify({'success': False, 'error': 'Chat session not found'}), 404
+        
+        user_content = data['content']
+        
+        user_message = ChatMessage(
+            type='user',
+            content=user_content,
+            session_id=session_id
+        )
+        
+        db.session.add(user_message)
+        db.session.commit()
+        
+        context = chat_context(session)
+        prompt = build_ai_chat_prompt(user_content, context)
+        cacheable = is_context_free(user_content, context)
+        cached, similarity = cached_answer(user_content, session.user_id) if cacheable else (None, 0.0)
+        
+        def events():
+            started = time.perf_counter()
+            if cached is not None:
+                tokens = (chunk for chunk in word_chunks(cached))
+            else:
+                tokens = get_ai_service().stream_ai_service(prompt, 'chat_response')
+            reply = []
+            metadata = {
+                'model': 'ai-assistant',
+                'context_used': len(context['conversation_history']),
+                'summarized': bool(context['summary']),
+                'streamed': True
+            }
+            if cached is not None:
+                metadata.update({'cached': True, 'similarity': round(similarity, 3)})
+            
+            try:
+                yield f"event: user_message\ndata: {json_dumps(user_message.to_dict())}\n\n"
+                for token in tokens:
+                    if not reply:
+                        metadata['first_token_ms'] = round((time.perf_counter() - started) * 1000, 1)
+                    reply.append(token)
+                    yield f"event: token\ndata: {json_dumps({'content': token})}\n\n"
+            except GeneratorExit:
+                # The client went away: stop the provider and keep the part it already received
+                tokens.close()
+                if reply:
+                    try:
+                        save_ai_reply(session, user_content, ''.join(reply), {**metadata, 'interrupted': True})
+                    except Exception:
+                        db.session.rollback()
+                raise
+            except Exception as e:
+                metadata['error'] = str(e)
+                if not reply:
+                    reply.append(FALLBACK_REPLY)
+                    yield f"event: token\ndata: {json_dumps({'content': FALLBACK_REPLY})}\n\n"
+            finally:
+                tokens.close()
+            
+            if cacheable and cached is None and 'error' not in metadata:
+                remember_answer(user_content, ''.join(reply), session.user_id)
+            
+            try:
+                ai_message = save_ai_reply(session, user_content, ''.join(reply), metadata)
+                yield f"event: done\ndata: {json_dumps({'ai_message': ai_message.to_dict(), 'session': session.to_dict()})}\n\n"
+            except Exception as e:
+                db.session.rollback()
+                yield f"event: error\ndata: {json_dumps({'error': str(e)})}\n\n"
+        
+        return Response(
+            stream_with_context(events()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @chat_bp.route('/chat/sessions/<int:session_id>', methods=['DELETE'])
 def delete_chat_session(session_id):
     try:
-        session = ChatSession.query.get(session_id)
+        session = ChatSession.query.filter_by(id=session_id, user_id=current_user().id).first()
         
         if not session:
             return jsonify({'success': False, 'error': 'Chat session not found'}), 404
@@ -169,7 +253,7 @@ def quick_help():
             return jsonify({'success': False, 'error': 'Question is required'}), 400
         
         question = data['question']
-        response = get_quick_help_response(question)
+        response = get_quick_help_response(question, current_user().id)
         
         return jsonify({
             'success': True,
@@ -181,46 +265,91 @@ def quick_help():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def chat_context(session):
+    memory = session_memory(session)
+    
+    return {
+        'session_id': session.id,
+        'project_id': session.project_id,
+        'summary': memory['summary'],
+        'conversation_history': memory['recent']
+    }
+
 def generate_ai_response(user_message, session):
     try:
-        recent_messages = ChatMessage.query.filter_by(session_id=session.id)\
-            .order_by(ChatMessage.created_at.desc())\
-            .limit(10).all()
-        
-        context = {
-            'session_id': session.id,
-            'project_id': session.project_id,
-            'conversation_history': [
-                {
-                    'type': msg.type,
-                    'content': msg.content,
-                    'timestamp': msg.created_at.isoformat()
-                }
-                for msg in reversed(recent_messages)
-            ]
+        context = chat_context(session)
+        metadata = {
+            'model': 'ai-assistant',
+            'timestamp': datetime.utcnow().isoformat(),
+            'context_used': len(context['conversation_history']),
+            'summarized': bool(context['summary'])
         }
         
+        cacheable = is_context_free(user_message, context)
+        if cacheable:
+            cached, similarity = cached_answer(user_message, session.user_id)
+            if cached is not None:
+                return {'content': cached, 'metadata': {**metadata, 'cached': True, 'similarity': round(similarity, 3)}}
+        
         prompt = build_ai_chat_prompt(user_message, context)
         ai_response_text = get_ai_chat_response(prompt)
         
+        if cacheable:
+            remember_answer(user_message, ai_response_text, session.user_id)
+        
         return {
             'content': ai_response_text,
-            'metadata': {
-                'model': 'ai-assistant',
-                'timestamp': datetime.utcnow().isoformat(),
-                'context_used': len(context['conversation_history'])
-            }
+            'metadata': metadata
         }
     
     except Exception as e:
         return {
-            'content': "I apologize, but I'm having trouble processing your request right now. Please try again later.",
+            'content': FALLBACK_REPLY,
             'metadata': {
                 'error': str(e),
                 'timestamp': datetime.utcnow().isoformat()
             }
         }
 
+def is_context_free(user_message, context):
+    """Only a session's opening question has an answer that does not depend on earlier turns"""
+    return not context['summary'] and all(
+        msg['type'] == 'user' and msg['content'] == user_message for msg in context['conversation_history']
+    )
+
+def cached_answer(question, user_id):
+    # Imported here to keep numpy off the startup path. Callers only pass context-free questions;
+    # those with nothing personal in them are shared between users
+    from services.semantic_cache import answer_cache, scope_for
+    return answer_cache.lookup(question, scope=scope_for(question, user_id))
+
+def remember_answer(question, answer, user_id):
+    # Placeholders and apologies must not be served to the next person asking
+    if not answer or answer in (FALLBACK_REPLY, UNCLEAR_REPLY, UNAVAILABLE_REPLY) or get_ai_service().is_mock_response(answer):
+        return
+    from services.semantic_cache import answer_cache, scope_for
+    answer_cache.store(question, answer, scope=scope_for(question, user_id))
+
+def save_ai_reply(session, user_content, content, metadata):
+    metadata.setdefault('timestamp', datetime.utcnow().isoformat())
+    ai_message = ChatMessage(
+        type='ai',
+        content=content,
+        session_id=session.id,
+        message_metadata=json.dumps(metadata)
+    )
+    
+    db.session.add(ai_message)
+    
+    # Update session title if it's the first message
+    if session.title == 'New Chat' and session.message_count <= 2:
+        session.title = generate_session_title(user_content)
+    
+    session.updated_at = datetime.utcnow()
+    db.session.commit()
+    
+    return ai_message
+
 def build_ai_chat_prompt(user_message, context):
     system_prompt = """
 You are an AI assistant for the AI App Builder Pro platform. You help users with:
@@ -235,9 +364,16 @@ You are knowledgeable, helpful, and concise. Always provide practical advice and
     """
     
     conversation_context = ""
-    if context['conversation_history']:
-        conversation_context = "\n\nConversation History:\n"
-        for msg in context['conversation_history'][-5:]:
+    if context.get('summary'):
+        conversation_context += f"\n\nConversation Summary:\n{context['summary']}\n"
+    
+    history = context['conversation_history']
+    # The user message is saved before the context is built; don't repeat it
+    if history and history[-1]['type'] == 'user' and history[-1]['content'] == user_message:
+        history = history[:-1]
+    if history:
+        conversation_context += "\n\nConversation History:\n"
+        for msg in history:
             conversation_context += f"{msg['type'].title()}: {msg['content']}\n"
     
     prompt = f"{system_prompt}{conversation_context}\n\nUser: {user_message}\n\nAssistant:"
@@ -246,50 +382,27 @@ You are knowledgeable, helpful, and concise. Always provide practical advice and
 
 def get_ai_chat_response(prompt):
     try:
-        response = ai_service._call_ai_service(prompt, "chat_response")
+        response = get_ai_service()._call_ai_service(prompt, "chat_response")
         
         if isinstance(response, str):
             return response
         else:
-            return "I understand your question. Let me help you with that. Could you provide more specific details about what you're trying to accomplish?"
+            return UNCLEAR_REPLY
     
-    except Exception as e:
-        return "I'm currently experiencing some technical difficulties. Please try again in a moment."
+    except Exception:
+        return UNAVAILABLE_REPLY
 
 def generate_session_title(first_message):
-    message_lower = first_message.lower()
-    
-    if 'help' in message_lower or 'how' in message_lower:
-        return "Help & Guidance"
-    elif 'build' in message_lower or 'create' in message_lower:
-        return "App Building"
-    elif 'deploy' in message_lower:
-        return "Deployment Help"
-    elif 'error' in message_lower or 'problem' in message_lower:
-        return "Troubleshooting"
-    elif 'api' in message_lower:
-        return "API Configuration"
-    else:
-        words = first_message.split()[:4]
-        return ' '.join(words) + ('...' if len(first_message.split()) > 4 else '')
+    return knowledge_base.session_title(first_message)
 
-def get_quick_help_response(question):
-    question_lower = question.lower()
-    
-    if 'how to start' in question_lower or 'getting started' in question_lower:
-        return "To get started: 1) Describe your app idea in the Builder tab, 2) Click 'Generate App' to start the AI generation process, 3) Monitor progress in real-time, 4) Review and deploy your generated app."
-    
-    elif 'api key' in question_lower:
-        return "To configure API keys: 1) Click the settings icon in the top right, 2) Enter your API keys for AI services (Cerebras, OpenAI, etc.), 3) Test the connection, 4) Save your configuration."
-    
-    elif 'deploy' in question_lower:
-        return "Your app will be automatically deployed once generation is complete. You can also manually deploy using the deployment options in your project settings."
-    
-    elif 'progress' in question_lower or 'status' in question_lower:
-        return "You can monitor generation progress in real-time on the Builder tab. The progress bar shows which AI agent is currently working and the overall completion percentage."
+def get_quick_help_response(question, user_id):
+    entry = knowledge_base.answer(question)
+    if entry is not None:
+        return entry['answer']
     
-    elif 'error' in question_lower or 'problem' in question_lower:
-        return "If you encounter errors: 1) Check your API key configuration, 2) Ensure your description is clear and detailed, 3) Try regenerating the app, 4) Contact support if issues persist."
+    # A paraphrase of a question chat has already answered
+    cached, _ = cached_answer(question, user_id)
+    if cached is not None:
+        return cached
     
-    else:
-        return "I'm here to help! You can ask me about getting started, configuring API keys, monitoring progress, deployment, or troubleshooting issues. What specific topic would you like help with?"
\ No newline at end of file
+    return knowledge_base.fallback('quick_help')
@@ -1,15 +1,25 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from datetime import datetime, timedelta
-import threading
+import queue
 import time
 import random
+from sqlalchemy import select
 from models.database import db
-from models.user import User
 from models.project import Project
-from services.ai_service import AIService
+from services.ai_service import get_ai_service
+from services.generation_pool import generation_pool
+from services.identity import current_user
+from services.http_cache import project_etag, not_modified_response, with_etag
+from services.json_backend import dumps as json_dumps
+from services.progress_buffer import progress_buffer
+from services.project_events import project_events, TERMINAL_STATUSES
+from services.read_replicas import read_only
+from services.realtime import emit_to_project
 
 generation_bp = Blueprint('generation', __name__)
-ai_service = AIService()
+
+SSE_HEARTBEAT_SECONDS = 15
+SSE_RETRY_MS = 3000
 
 @generation_bp.route('/generation/start', methods=['POST'])
 def start_generation():
@@ -23,7 +33,7 @@ def start_generation():
         description = data['description']
         requirements = data.get('requirements', {})
         
-        project = Project.query.get(project_id)
+        project = Project.query.filter_by(id=project_id, user_id=current_user().id).first()
         if not project:
             return jsonify({'success': False, 'error': 'Project not found'}), 404
         
@@ -41,12 +51,7 @@ def start_generation():
         db.session.commit()
         
         # Start generation process in background
-        generation_thread = threading.Thread(
-            target=run_generation_process,
-            args=(project_id, description, requirements)
-        )
-        generation_thread.daemon = True
-        generation_thread.start()
+        generation_pool.submit(project_id, run_generation_process, description, requirements)
         
         return jsonify({
             'success': True,
@@ -59,24 +64,81 @@ def start_generation():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @generation_bp.route('/generation/status/<int:project_id>', methods=['GET'])
+@read_only
 def get_generation_status(project_id):
     try:
-        project = Project.query.get(project_id)
+        version = db.session.query(Project.row_version, Project.updated_at)\
+            .filter_by(id=project_id, user_id=current_user().id).first()
+        
+        if not version:
+            return jsonify({'success': False, 'error': 'Project not found'}), 404
+        
+        # Unflushed progress ticks do not move row_version, so they are part of the ETag
+        buffered = progress_buffer.overlay(project_id)
+        variant = f"status:{buffered['seq']}" if buffered else 'status'
         
+        not_modified = not_modified_response(project_etag(project_id, *version, variant=variant))
+        if not_modified:
+            return not_modified
+        
+        project = Project.query.filter_by(id=project_id, user_id=current_user().id).first()
         if not project:
             return jsonify({'success': False, 'error': 'Project not found'}), 404
         
-        return jsonify({
+        if project.status != 'generating':
+            buffered = None
+        
+        response = jsonify({
             'success': True,
             'project_id': project_id,
             'status': project.status,
-            'progress': project.progress,
-            'current_agent': project.current_agent,
+            'progress': buffered['progress'] if buffered else project.progress,
+            'current_agent': buffered['current_agent'] if buffered else project.current_agent,
             'started_at': project.started_at.isoformat() if project.started_at else None,
             'completed_at': project.completed_at.isoformat() if project.completed_at else None,
             'estimated_completion': project.estimated_completion.isoformat() if project.estimated_completion else None,
             'error_message': project.error_message
         })
+        return with_etag(response, project_etag(project_id, project.row_version, project.updated_at, variant=variant))
+    
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@generation_bp.route('/generation/stream/<int:project_id>', methods=['GET'])
+def stream_generation_status(project_id):
+    try:
+        if not db.session.query(Project.id).filter_by(id=project_id, user_id=current_user().id).first():
+            return jsonify({'success': False, 'error': 'Project not found'}), 404
+        
+        last_event_id = request.headers.get('Last-Event-ID')
+        
+        def events():
+            subscriber, latest = project_events.subscribe(project_id)
+            sent_id = last_event_id
+            try:
+                yield f"retry: {SSE_RETRY_MS}\n\n"
+                event = latest
+                while True:
+                    if event is not None:
+                        # On resume, skip the snapshot the client already has
+                        if str(event['id']) != sent_id:
+                            sent_id = str(event['id'])
+                            yield f"id: {event['id']}\nevent: status\ndata: {json_dumps(event)}\n\n"
+                        if event['status'] in TERMINAL_STATUSES:
+                            return
+                    try:
+                        event = subscriber.get(timeout=SSE_HEARTBEAT_SECONDS)
+                    except queue.Empty:
+                        event = None
+                        yield ": heartbeat\n\n"
+            finally:
+                project_events.unsubscribe(project_id, subscriber)
+        
+        return Response(
+            events(),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
     
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -84,7 +146,7 @@ def get_generation_status(project_id):
 @generation_bp.route('/generation/cancel/<int:project_id>', methods=['POST'])
 def cancel_generation(project_id):
     try:
-        project = Project.query.get(project_id)
+        project = Project.query.filter_by(id=project_id, user_id=current_user().id).first()
         
         if not project:
             return jsonify({'success': False, 'error': 'Project not found'}), 404
@@ -97,6 +159,7 @@ def cancel_generation(project_id):
         project.current_agent = None
         
         db.session.commit()
+        publish_status(project)
         
         return jsonify({
             'success': True,
@@ -108,6 +171,35 @@ def cancel_generation(project_id):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def publish_status(project):
+    """Wake SSE listeners and push the status to Socket.IO clients on every worker"""
+    project_events.notify(project.id)
+    emit_to_project(project.id, 'generation_progress', {
+        'project_id': project.id,
+        'status': project.status,
+        'progress': project.progress,
+        'current_agent': project.current_agent,
+        'error_message': project.error_message
+    })
+
+def publish_progress(project_id, progress, current_agent, flush=False):
+    """Buffer a progress tick and push it to SSE and Socket.IO listeners"""
+    progress_buffer.record(project_id, progress, current_agent, flush=flush)
+    project_events.notify(project_id)
+    emit_to_project(project_id, 'generation_progress', {
+        'project_id': project_id,
+        'status': 'generating',
+        'progress': progress,
+        'current_agent': current_agent,
+        'error_message': None
+    })
+
+def generation_status(project_id):
+    # A column read on its own short-lived connection: it starts a fresh transaction, so a
+    # cancel committed by another request is always seen, and issues no COMMIT per tick
+    with db.engine.connect() as connection:
+        return connection.execute(select(Project.status).where(Project.id == project_id)).scalar()
+
 def run_generation_process(project_id, description, requirements):
     try:
         agents = [
@@ -132,13 +224,12 @@ def run_generation_process(project_id, description, requirements):
         }
         
         for i, agent in enumerate(agents):
-            project = Project.query.get(project_id)
-            if project.status == 'cancelled':
+            if generation_status(project_id) == 'cancelled':
+                progress_buffer.discard(project_id)
                 return
             
-            project.current_agent = agent['name']
-            project.progress = int((elapsed_time / total_duration) * 100)
-            db.session.commit()
+            # Stage transition: written through so every worker sees the new agent
+            publish_progress(project_id, int((elapsed_time / total_duration) * 100), agent['name'], flush=True)
             
             # Simulate agent work with AI integration
             agent_result = simulate_agent_work(agent, description, requirements, generation_results)
@@ -146,38 +237,38 @@ def run_generation_process(project_id, description, requirements):
             # Store agent result
             if agent['id'] == 'analyst':
                 generation_results['specifications'] = agent_result
-                project.set_specifications(agent_result)
+                Project.query.get(project_id).set_specifications(agent_result)
             elif agent['id'] == 'architect':
                 generation_results['architecture'] = agent_result
-                project.set_architecture(agent_result)
+                Project.query.get(project_id).set_architecture(agent_result)
             elif agent['id'] == 'designer':
                 generation_results['design'] = agent_result
-                project.set_design(agent_result)
+                Project.query.get(project_id).set_design(agent_result)
             elif agent['id'] == 'frontend':
                 generation_results['frontend_code'] = agent_result
             elif agent['id'] == 'backend':
                 generation_results['backend_code'] = agent_result
             elif agent['id'] == 'deployer':
                 generation_results['deployment'] = agent_result
+            db.session.commit()
             
-            # Simulate work progress
+            # Simulate work progress; ticks are coalesced in memory and flushed in batches
             agent_start_time = time.time()
             while time.time() - agent_start_time < agent['duration']:
-                if Project.query.get(project_id).status == 'cancelled':
+                if generation_status(project_id) == 'cancelled':
+                    progress_buffer.discard(project_id)
                     return
                 
                 agent_elapsed = time.time() - agent_start_time
                 total_progress = int(((elapsed_time + agent_elapsed) / total_duration) * 100)
-                
-                project = Project.query.get(project_id)
-                project.progress = min(total_progress, 100)
-                db.session.commit()
+                publish_progress(project_id, min(total_progress, 100), agent['name'])
                 
                 time.sleep(2)
             
             elapsed_time += agent['duration']
         
         # Finalize generation
+        progress_buffer.discard(project_id)
         project = Project.query.get(project_id)
         if project.status != 'cancelled':
             project.status = 'completed'
@@ -195,17 +286,22 @@ def run_generation_process(project_id, description, requirements):
             project.set_features(extract_features(description))
             
             db.session.commit()
+            publish_status(project)
     
     except Exception as e:
+        db.session.rollback()
+        progress_buffer.discard(project_id)
         project = Project.query.get(project_id)
         project.status = 'failed'
         project.completed_at = datetime.utcnow()
         project.error_message = str(e)
         project.current_agent = None
         db.session.commit()
+        publish_status(project)
 
 def simulate_agent_work(agent, description, requirements, previous_results):
     try:
+        ai_service = get_ai_service()
         if agent['id'] == 'analyst':
             return ai_service.analyze_requirements(description, requirements)
         elif agent['id'] == 'architect':
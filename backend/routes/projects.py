@@ -1,25 +1,36 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from datetime import datetime
 from models.database import db
-from models.user import User
-from models.project import Project
+from models.project import Project, ProjectArchive, ProjectStats, ChatSession, ChatMessage, ChatMessageArchive
+from services.export_service import stream_project_zip, export_filename
+from services.identity import current_user
+from services.json_backend import dumps as json_dumps
+from services.progress_buffer import progress_buffer
+from services.read_replicas import read_only, use_primary
+from services.search import reindex_projects, remove_projects as remove_search_documents
+from services.http_cache import project_etag, not_modified_response, with_etag
 
 projects_bp = Blueprint('projects', __name__)
 
 @projects_bp.route('/projects', methods=['GET'])
+@read_only
 def get_projects():
     try:
-        user = User.query.first()
-        if not user:
-            user = User(name="Demo User", email="demo@aiappbuilder.com")
-            db.session.add(user)
-            db.session.commit()
+        user = current_user()
         
-        projects = Project.query.filter_by(user_id=user.id).order_by(Project.updated_at.desc()).all()
+        try:
+            fields = Project.resolve_fields(request.args.get('fields'), request.args.get('include'))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        # Unrequested columns are never selected, so their JSON is never decoded
+        projects = Project.query.filter_by(user_id=user.id)\
+            .options(*Project.load_options(fields))\
+            .order_by(Project.updated_at.desc()).all()
         
         return jsonify({
             'success': True,
-            'projects': [project.to_dict() for project in projects],
+            'projects': [project.to_dict(fields) for project in projects],
             'total': len(projects)
         })
     
@@ -34,11 +45,7 @@ def create_project():
         if not data or 'name' not in data or 'description' not in data:
             return jsonify({'success': False, 'error': 'Name and description are required'}), 400
         
-        user = User.query.first()
-        if not user:
-            user = User(name="Demo User", email="demo@aiappbuilder.com")
-            db.session.add(user)
-            db.session.commit()
+        user = current_user()
         
         project = Project(
             name=data['name'],
@@ -69,14 +76,65 @@ def create_project():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @projects_bp.route('/projects/<int:project_id>', methods=['GET'])
+@read_only
 def get_project(project_id):
     try:
-        project = Project.query.get(project_id)
+        try:
+            fields = Project.resolve_fields(request.args.get('fields'), request.args.get('include'))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        variant = ','.join(fields) if fields else ''
+        
+        # Indexed version lookup first; unchanged polls end here with a 304
+        version = db.session.query(Project.row_version, Project.updated_at)\
+            .filter_by(id=project_id, user_id=current_user().id).first()
+        
+        if not version:
+            return jsonify({'success': False, 'error': 'Project not found'}), 404
+        
+        # Unflushed progress ticks do not move row_version, so they are part of the ETag
+        buffered = progress_buffer.overlay(project_id)
+        if buffered:
+            variant = f"{variant}:{buffered['seq']}"
+        
+        not_modified = not_modified_response(project_etag(project_id, *version, variant=variant))
+        if not_modified:
+            return not_modified
+        
+        project = Project.query.options(*Project.load_options(fields))\
+            .filter_by(id=project_id, user_id=current_user().id).first()
+        if not project:
+            return jsonify({'success': False, 'error': 'Project not found'}), 404
+        
+        data = project.to_dict(fields)
+        if buffered and project.status == 'generating':
+            for field in ('progress', 'current_agent'):
+                if field in data:
+                    data[field] = buffered[field]
+        
+        response = jsonify({'success': True, 'project': data})
+        return with_etag(response, project_etag(project_id, project.row_version, project.updated_at, variant=variant))
+    
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@projects_bp.route('/projects/<int:project_id>/export.zip', methods=['GET'])
+def export_project(project_id):
+    try:
+        project = Project.query.filter_by(id=project_id, user_id=current_user().id).first()
         
         if not project:
             return jsonify({'success': False, 'error': 'Project not found'}), 404
         
-        return jsonify({'success': True, 'project': project.to_dict()})
+        manifest = project.get_generated_code_manifest()
+        if not manifest:
+            return jsonify({'success': False, 'error': 'Project has no generated code to export'}), 409
+        
+        return Response(
+            stream_with_context(stream_project_zip(project.name, project.description, manifest)),
+            mimetype='application/zip',
+            headers={'Content-Disposition': f'attachment; filename="{export_filename(project.name)}"'}
+        )
     
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -84,12 +142,20 @@ def get_project(project_id):
 @projects_bp.route('/projects/<int:project_id>', methods=['PUT'])
 def update_project(project_id):
     try:
-        project = Project.query.get(project_id)
+        project = Project.query.filter_by(id=project_id, user_id=current_user().id).first()
         
         if not project:
             return jsonify({'success': False, 'error': 'Project not found'}), 404
         
         data = request.get_json()
+        if not isinstance(data, dict):
+            return jsonify({'success': False, 'error': 'Request body must be a JSON object'}), 400
+        
+        scalars = {field: data[field] for field in UPDATABLE_SCALAR_FIELDS if field in data}
+        try:
+            Project.validate_columns(scalars)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         
         # Update basic fields
         for field in ['name', 'description', 'status', 'framework', 'complexity', 'current_agent', 'progress', 'error_message']:
@@ -137,7 +203,7 @@ def update_project(project_id):
 @projects_bp.route('/projects/<int:project_id>', methods=['DELETE'])
 def delete_project(project_id):
     try:
-        project = Project.query.get(project_id)
+        project = Project.query.filter_by(id=project_id, user_id=current_user().id).first()
         
         if not project:
             return jsonify({'success': False, 'error': 'Project not found'}), 404
@@ -151,30 +217,155 @@ def delete_project(project_id):
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@projects_bp.route('/projects/stats', methods=['GET'])
-def get_project_stats():
+MAX_BULK_IDS = 1000
+UPDATABLE_SCALAR_FIELDS = ['name', 'description', 'status', 'framework', 'complexity', 'current_agent', 'progress',
+                           'error_message', 'deploy_url', 'build_time', 'performance_score']
+BULK_SCALAR_FIELDS = ['status', 'framework', 'complexity', 'current_agent', 'progress', 'error_message',
+                      'deploy_url', 'build_time', 'performance_score']
+BULK_LIST_FIELDS = ['tech_stack', 'features']
+
+def parse_bulk_ids(data):
+    if not isinstance(data, dict):
+        raise ValueError('Request body must be a JSON object')
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not ids:
+        raise ValueError('ids must be a non-empty list of project ids')
+    if len(ids) > MAX_BULK_IDS:
+        raise ValueError(f'At most {MAX_BULK_IDS} ids per request')
+    if not all(isinstance(project_id, int) and not isinstance(project_id, bool) for project_id in ids):
+        raise ValueError('ids must be integers')
+    return list(dict.fromkeys(ids))
+
+def bulk_results(ids, found, result):
+    return [{'id': project_id, 'result': result if project_id in found else 'not_found'} for project_id in ids]
+
+@projects_bp.route('/projects/bulk/fetch', methods=['POST'])
+def bulk_fetch_projects():
     try:
-        user = User.query.first()
-        if not user:
-            return jsonify({
-                'success': True,
-                'stats': {'total_projects': 0, 'deployed': 0, 'building': 0, 'total_views': 0}
-            })
-        
-        total_projects = Project.query.filter_by(user_id=user.id).count()
-        deployed = Project.query.filter_by(user_id=user.id, status='completed').count()
-        building = Project.query.filter_by(user_id=user.id, status='generating').count()
-        total_views = total_projects * 150 + deployed * 500
+        data = request.get_json()
+        ids = parse_bulk_ids(data)
+        fields = Project.resolve_fields(data.get('fields'), data.get('include'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    try:
+        user = current_user()
+        projects = Project.query.options(*Project.load_options(fields))\
+            .filter(Project.id.in_(ids), Project.user_id == user.id).all()
+        found = {project.id for project in projects}
         
         return jsonify({
             'success': True,
-            'stats': {
-                'total_projects': total_projects,
-                'deployed': deployed,
-                'building': building,
-                'total_views': total_views
-            }
+            'projects': [project.to_dict(fields) for project in projects],
+            'missing': [project_id for project_id in ids if project_id not in found]
         })
     
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@projects_bp.route('/projects/bulk/update', methods=['POST'])
+def bulk_update_projects():
+    try:
+        data = request.get_json()
+        ids = parse_bulk_ids(data)
+        updates = data.get('updates')
+        if not isinstance(updates, dict) or not updates:
+            raise ValueError('updates must be a non-empty object')
+        unknown = [field for field in updates if field not in BULK_SCALAR_FIELDS + BULK_LIST_FIELDS]
+        if unknown:
+            raise ValueError(f"Fields cannot be bulk updated: {', '.join(unknown)}")
+        Project.validate_columns({field: updates[field] for field in BULK_SCALAR_FIELDS if field in updates})
+        for field in BULK_LIST_FIELDS:
+            if field in updates and not isinstance(updates[field], (list, str)):
+                raise ValueError(f'{field} must be a list or a comma-separated string')
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    try:
+        user = current_user()
+        now = datetime.utcnow()
+        values = {field: updates[field] for field in BULK_SCALAR_FIELDS if field in updates}
+        for field in BULK_LIST_FIELDS:
+            if field in updates:
+                items = updates[field]
+                if isinstance(items, str):
+                    items = [item.strip() for item in items.split(',')]
+                values[field] = json_dumps(items if isinstance(items, list) else [])
+        
+        # Same timestamp rules as update_project, applied set-wise
+        if updates.get('status') == 'generating':
+            values['started_at'] = db.func.coalesce(Project.started_at, now)
+        elif updates.get('status') in ['completed', 'failed', 'cancelled']:
+            values['completed_at'] = db.func.coalesce(Project.completed_at, now)
+        values['updated_at'] = now
+        values['row_version'] = Project.row_version + 1
+        
+        scope = Project.query.filter(Project.id.in_(ids), Project.user_id == user.id)
+        found = {project_id for (project_id,) in scope.with_entities(Project.id)}
+        scope.update(values, synchronize_session=False)
+        
+        # Set-based writes bypass the mapper events, so recount this user's stats and re-index
+        if {'status', 'framework', 'complexity'} & set(updates):
+            ProjectStats.reconcile(user.id)
+        if 'features' in updates:
+            reindex_projects(found)
+        db.session.commit()
+        
+        return jsonify({'success': True, 'results': bulk_results(ids, found, 'updated')})
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@projects_bp.route('/projects/bulk/delete', methods=['POST'])
+def bulk_delete_projects():
+    try:
+        ids = parse_bulk_ids(request.get_json())
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    try:
+        user = current_user()
+        scope = Project.query.filter(Project.id.in_(ids), Project.user_id == user.id)
+        found = {project_id for (project_id,) in scope.with_entities(Project.id)}
+        
+        if found:
+            # Replicate the ORM delete-orphan cascade with set-based deletes
+            session_ids = db.session.query(ChatSession.id).filter(ChatSession.project_id.in_(found))
+            ChatMessage.query.filter(ChatMessage.session_id.in_(session_ids.scalar_subquery()))\
+                .delete(synchronize_session=False)
+            ChatMessageArchive.query.filter(ChatMessageArchive.session_id.in_(session_ids.scalar_subquery()))\
+                .delete(synchronize_session=False)
+            ChatSession.query.filter(ChatSession.project_id.in_(found)).delete(synchronize_session=False)
+            ProjectArchive.query.filter(ProjectArchive.project_id.in_(found)).delete(synchronize_session=False)
+            Project.query.filter(Project.id.in_(found)).delete(synchronize_session=False)
+            remove_search_documents(found)
+            ProjectStats.reconcile(user.id)
+        db.session.commit()
+        
+        return jsonify({'success': True, 'results': bulk_results(ids, found, 'deleted')})
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@projects_bp.route('/projects/stats', methods=['GET'])
+@read_only
+def get_project_stats():
+    try:
+        user = current_user()
+        
+        # Counters are maintained on every project write; this is a primary key read
+        stats = db.session.get(ProjectStats, user.id)
+        if not stats:
+            # The rebuild is a write, so it reads its source rows from the primary too
+            with use_primary():
+                ProjectStats.reconcile(user.id)
+                db.session.commit()
+                stats = db.session.get(ProjectStats, user.id)
+        
+        return jsonify({'success': True, 'stats': stats.to_dict()})
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
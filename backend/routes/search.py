@@ -0,0 +1,44 @@
+from flask import Blueprint, request, jsonify
+from services.identity import current_user
+from services.read_replicas import read_only
+from services.search import search_dialect, search_documents, search_supported, SEARCH_KINDS, MAX_PER_PAGE
+
+search_bp = Blueprint('search', __name__)
+
+@search_bp.route('/search', methods=['GET'])
+@read_only
+def search():
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return jsonify({'success': False, 'error': 'Query parameter q is required'}), 400
+    
+    kinds = [kind.strip() for kind in request.args.get('type', ','.join(SEARCH_KINDS)).split(',') if kind.strip()]
+    unknown = [kind for kind in kinds if kind not in SEARCH_KINDS]
+    if unknown or not kinds:
+        return jsonify({'success': False, 'error': f"type must be one of: {', '.join(SEARCH_KINDS)}"}), 400
+    
+    try:
+        page = max(int(request.args.get('page', 1)), 1)
+        per_page = min(max(int(request.args.get('per_page', 20)), 1), MAX_PER_PAGE)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'page and per_page must be integers'}), 400
+    
+    try:
+        dialect = search_dialect()
+        if not search_supported(dialect):
+            return jsonify({'success': False, 'error': f'Full-text search is not available on {dialect}'}), 501
+        
+        user = current_user()
+        results, total = search_documents(user.id, query, kinds, limit=per_page, offset=(page - 1) * per_page)
+        
+        return jsonify({
+            'success': True,
+            'query': query,
+            'results': results,
+            'total': total,
+            'page': page,
+            'per_page': per_page
+        })
+    
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
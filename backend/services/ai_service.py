@@ -1,8 +1,31 @@
 import os
-import requests
+import re
 import json
-import time
-from datetime import datetime
+import logging
+from services.circuit_breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+# Shared by every AIService so the health endpoint can report provider state
+# without constructing the service
+PROVIDER_BREAKERS = {
+    name: CircuitBreaker(
+        name,
+        failure_threshold=int(os.getenv('PROVIDER_FAILURE_THRESHOLD', 5)),
+        reset_timeout=float(os.getenv('PROVIDER_RESET_TIMEOUT', 30))
+    )
+    for name in ('cerebras', 'openai')
+}
+
+MOCK_PREFIX = "Mock "
+MOCK_SUFFIX = " response - AI service integration in progress"
+
+def provider_circuits():
+    return {name: breaker.to_dict() for name, breaker in PROVIDER_BREAKERS.items()}
+
+def word_chunks(text):
+    """Split a complete reply into word-sized chunks for providers that do not stream"""
+    return re.findall(r'\s*\S+|\s+$', text)
 
 class AIService:
     def __init__(self):
@@ -242,51 +265,137 @@ Generate a complete backend API with routes, models, and middleware.
     
     def _call_ai_service(self, prompt, task_type):
         if self.cerebras_api_key:
-            try:
-                return self._call_cerebras(prompt)
-            except Exception as e:
-                print(f"Cerebras API failed: {e}")
+            result = self._call_provider('cerebras', self._call_cerebras, prompt)
+            if result is not None:
+                return result
         
         if self.openai_api_key:
-            try:
-                return self._call_openai(prompt)
-            except Exception as e:
-                print(f"OpenAI API failed: {e}")
+            result = self._call_provider('openai', self._call_openai, prompt)
+            if result is not None:
+                return result
         
         return self._get_mock_response(task_type)
     
+    def _call_provider(self, name, call, prompt):
+        breaker = PROVIDER_BREAKERS[name]
+        if not breaker.allow():
+            return None
+        
+        try:
+            result = call(prompt)
+        except Exception as e:
+            breaker.record_failure()
+            logger.warning(f"{name} API failed: {e}")
+            return None
+        except BaseException:
+            # Interrupted (e.g. a timeout or shutdown) before an outcome
+            breaker.release_trial()
+            raise
+        
+        breaker.record_success()
+        return result
+    
     def _call_cerebras(self, prompt):
         # Mock implementation for Cerebras
         return self._get_mock_response("cerebras_response")
     
-    def _call_openai(self, prompt):
-        try:
-            headers = {
-                'Authorization': f'Bearer {self.openai_api_key}',
-                'Content-Type': 'application/json'
-            }
-            
-            data = {
-                'model': 'gpt-3.5-turbo',
-                'messages': [{'role': 'user', 'content': prompt}],
-                'max_tokens': 4000,
-                'temperature': 0.7
-            }
+    def stream_ai_service(self, prompt, task_type):
+        """Yield the reply in chunks as the provider produces them.
+        
+        A provider that fails before its first chunk falls through to the next
+        one, as in _call_ai_service; after that the error propagates. Closing
+        the generator closes the provider connection.
+        """
+        providers = []
+        if self.cerebras_api_key:
+            providers.append(('cerebras', self._stream_cerebras))
+        if self.openai_api_key:
+            providers.append(('openai', self._stream_openai))
+        
+        for name, stream in providers:
+            breaker = PROVIDER_BREAKERS[name]
+            if not breaker.allow():
+                continue
             
-            response = requests.post(
-                'https://api.openai.com/v1/chat/completions',
-                headers=headers,
-                json=data,
-                timeout=30
-            )
+            chunks = stream(prompt)
+            started = False
+            outcome = None
+            try:
+                for chunk in chunks:
+                    started = True
+                    yield chunk
+                outcome = breaker.record_success
+            except Exception as e:
+                outcome = breaker.record_failure
+                logger.warning(f"{name} API stream failed: {e}")
+                if started:
+                    raise
+                continue
+            finally:
+                chunks.close()
+                if outcome is not None:
+                    outcome()
+                elif started:
+                    # The client disconnected mid-stream (GeneratorExit); the provider was answering
+                    breaker.record_success()
+                else:
+                    # Interrupted before any outcome; without this a half-open trial would never end
+                    breaker.release_trial()
             
-            if response.status_code == 200:
-                return response.json()['choices'][0]['message']['content']
-            else:
-                return self._get_mock_response("openai_error")
+            return
         
-        except Exception as e:
-            return self._get_mock_response("openai_error")
+        yield from word_chunks(self._get_mock_response(task_type))
+    
+    def _stream_cerebras(self, prompt):
+        # Mock implementation for Cerebras
+        yield from word_chunks(self._get_mock_response("cerebras_response"))
+    
+    def _openai_request(self, prompt, stream=False):
+        # Imported on first provider call to keep it off the startup path
+        import requests
+        
+        headers = {
+            'Authorization': f'Bearer {self.openai_api_key}',
+            'Content-Type': 'application/json'
+        }
+        
+        data = {
+            'model': 'gpt-3.5-turbo',
+            'messages': [{'role': 'user', 'content': prompt}],
+            'max_tokens': 4000,
+            'temperature': 0.7,
+            'stream': stream
+        }
+        
+        response = requests.post(
+            'https://api.openai.com/v1/chat/completions',
+            headers=headers,
+            json=data,
+            timeout=30,
+            stream=stream
+        )
+        
+        # Errors propagate so the circuit breaker counts them
+        response.raise_for_status()
+        return response
+    
+    def _call_openai(self, prompt):
+        response = self._openai_request(prompt)
+        return response.json()['choices'][0]['message']['content']
+    
+    def _stream_openai(self, prompt):
+        response = self._openai_request(prompt, stream=True)
+        # Closing the response releases the connection, also when the consumer stops early
+        with response:
+            for line in response.iter_lines():
+                if not line.startswith(b'data: '):
+                    continue
+                payload = line[len(b'data: '):]
+                if payload == b'[DONE]':
+                    return
+                content = json.loads(payload)['choices'][0]['delta'].get('content')
+                if content:
+                    yield content
     
     def _parse_json_response(self, response, default_value):
         try:
@@ -299,11 +408,15 @@ Generate a complete backend API with routes, models, and middleware.
             
             return response if isinstance(response, dict) else default_value
         except Exception as e:
-            print(f"Failed to parse JSON response: {e}")
+            logger.warning(f"Failed to parse JSON response: {e}")
             return default_value
     
     def _get_mock_response(self, task_type):
-        return f"Mock {task_type} response - AI service integration in progress"
+        return f"{MOCK_PREFIX}{task_type}{MOCK_SUFFIX}"
+    
+    def is_mock_response(self, response):
+        """Whether a response is the placeholder returned when no provider answered"""
+        return isinstance(response, str) and response.startswith(MOCK_PREFIX) and response.endswith(MOCK_SUFFIX)
     
     def _get_default_requirements(self, error=None):
         return {
@@ -404,4 +517,14 @@ Generate a complete backend API with routes, models, and middleware.
                 "api": "// API routes"
             },
             "error": error
-        }
\ No newline at end of file
+        }
+
+
+_ai_service = None
+
+def get_ai_service():
+    """Shared AIService, constructed on first use rather than at import"""
+    global _ai_service
+    if _ai_service is None:
+        _ai_service = AIService()
+    return _ai_service
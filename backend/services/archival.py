@@ -0,0 +1,95 @@
+"""Moves cold rows out of the hot tables.
+
+Chat messages older than CHAT_ARCHIVE_AFTER_DAYS are packed per session into
+compressed chat_message_archives rows; a session's latest message always
+stays hot because its summary points at it. Artifact columns of projects
+completed more than PROJECT_ARCHIVE_AFTER_DAYS ago move into a compressed
+project_archives row. Reads are transparent: Project artifact getters fall
+back to the archive, and the messages endpoint prepends archived messages.
+Writing an artifact restores the project to the hot tier first.
+
+Run it with `flask archive`, e.g. from a daily cron job.
+"""
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_
+
+from models.artifacts import encode_artifact
+from models.database import db
+from models.project import Project, ChatSession, ChatMessage, ChatMessageArchive
+
+CHAT_ARCHIVE_AFTER_DAYS = int(os.getenv('CHAT_ARCHIVE_AFTER_DAYS', 180))
+PROJECT_ARCHIVE_AFTER_DAYS = int(os.getenv('PROJECT_ARCHIVE_AFTER_DAYS', 90))
+ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', 500))
+
+
+def archive_chat_messages(older_than_days=CHAT_ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE):
+    """Archive old chat messages in batches; returns the number of messages moved"""
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    moved = 0
+
+    while True:
+        messages = ChatMessage.query.join(ChatSession, ChatSession.id == ChatMessage.session_id)\
+            .filter(
+                ChatMessage.created_at < cutoff,
+                or_(ChatSession.last_message_id.is_(None), ChatMessage.id != ChatSession.last_message_id)
+            )\
+            .order_by(ChatMessage.session_id, ChatMessage.created_at, ChatMessage.id)\
+            .limit(batch_size).all()
+        if not messages:
+            return moved
+
+        by_session = {}
+        for message in messages:
+            by_session.setdefault(message.session_id, []).append(message)
+
+        for session_id, session_messages in by_session.items():
+            payload, _ = encode_artifact([message.to_dict() for message in session_messages])
+            db.session.add(ChatMessageArchive(
+                session_id=session_id,
+                message_count=len(session_messages),
+                oldest_at=session_messages[0].created_at,
+                newest_at=session_messages[-1].created_at,
+                payload=payload
+            ))
+            sessions = ChatSession.__table__
+            db.session.execute(
+                sessions.update()
+                .where(sessions.c.id == session_id)
+                .values(archived_message_count=sessions.c.archived_message_count + len(session_messages),
+                        updated_at=sessions.c.updated_at)
+            )
+
+        ChatMessage.query.filter(ChatMessage.id.in_([message.id for message in messages]))\
+            .delete(synchronize_session=False)
+        db.session.commit()
+        moved += len(messages)
+
+
+def archive_project_artifacts(older_than_days=PROJECT_ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE):
+    """Archive artifacts of long-completed projects; returns the number of projects archived"""
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    archived = 0
+
+    while True:
+        projects = Project.query.filter(
+            Project.status == 'completed',
+            Project.completed_at < cutoff,
+            Project.archived_at.is_(None),
+            or_(*(getattr(Project, field).isnot(None) for field in Project.ARTIFACT_FIELDS))
+        ).limit(batch_size).all()
+        if not projects:
+            return archived
+
+        for project in projects:
+            archived += 1 if project.archive_artifacts() else 0
+        db.session.commit()
+
+
+def run_archival(chat_days=None, project_days=None):
+    """Run both archival passes; None uses the configured retention"""
+    return {
+        'chat_messages': archive_chat_messages(CHAT_ARCHIVE_AFTER_DAYS if chat_days is None else chat_days),
+        'projects': archive_project_artifacts(PROJECT_ARCHIVE_AFTER_DAYS if project_days is None else project_days)
+    }
@@ -0,0 +1,130 @@
+import hashlib
+import mmap
+import os
+import tempfile
+import time
+
+DEFAULT_BLOB_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'blobs')
+
+CHUNK_SIZE = 64 * 1024
+
+# Blobs at least this large are memory-mapped instead of read through a file buffer
+MMAP_THRESHOLD = int(os.getenv('BLOB_MMAP_THRESHOLD', 256 * 1024))
+
+
+class BlobStore:
+    """Content-addressed file store for generated project files.
+
+    Each blob is named by the SHA-256 of its bytes and sharded into two levels
+    of directories (ab/cd/abcd...), so identical files are stored exactly once
+    no matter how many projects reference them.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or os.getenv('BLOB_STORE_PATH', DEFAULT_BLOB_ROOT)
+
+    def path_for(self, digest):
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def exists(self, digest):
+        return os.path.exists(self.path_for(digest))
+
+    def put(self, data):
+        """Store bytes and return their digest; existing blobs are not rewritten"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest)
+        if os.path.exists(path):
+            # Refresh the mtime so a concurrent gc treats the blob as newly referenced
+            os.utime(path)
+            return digest
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        # Write to a temp file and rename so readers never see a partial blob
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                temp_file.write(data)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        return digest
+
+    def _mapped(self, blob_file):
+        """A read-only map of a large blob file, or None for small ones"""
+        if os.fstat(blob_file.fileno()).st_size < MMAP_THRESHOLD:
+            return None
+        return mmap.mmap(blob_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def iter_chunks(self, digest, chunk_size=CHUNK_SIZE):
+        """Yield a blob's bytes in chunk_size slices, so large files are never held whole"""
+        with open(self.path_for(digest), 'rb') as blob_file:
+            mapped = self._mapped(blob_file)
+            if mapped is not None:
+                # Slices are copied out of the page cache without a read() per chunk
+                with mapped:
+                    for offset in range(0, len(mapped), chunk_size):
+                        yield mapped[offset:offset + chunk_size]
+                return
+
+            while True:
+                chunk = blob_file.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def read_text(self, digest, encoding='utf-8'):
+        """A blob's whole content, for callers that need it as one string"""
+        with open(self.path_for(digest), 'rb') as blob_file:
+            mapped = self._mapped(blob_file)
+            if mapped is None:
+                return blob_file.read().decode(encoding)
+            # Decoded straight from the map, without an intermediate bytes copy
+            with mapped:
+                return str(mapped, encoding)
+
+    def iter_digests(self):
+        for shard, _, files in os.walk(self.root):
+            for name in files:
+                if not name.startswith('.tmp-'):
+                    yield name, os.path.join(shard, name)
+
+    def gc(self, referenced, grace_seconds=3600):
+        """Delete blobs not in `referenced`.
+
+        Blobs newer than grace_seconds are kept, since a generation may have
+        written them before committing the project row that references them.
+        Returns (removed_count, freed_bytes).
+        """
+        cutoff = time.time() - grace_seconds
+        removed = 0
+        freed = 0
+
+        for digest, path in list(self.iter_digests()):
+            if digest in referenced:
+                continue
+            try:
+                stat = os.stat(path)
+                if stat.st_mtime > cutoff:
+                    continue
+                os.remove(path)
+                removed += 1
+                freed += stat.st_size
+            except FileNotFoundError:
+                continue
+
+        return removed, freed
+
+
+_blob_store = None
+
+
+def get_blob_store():
+    global _blob_store
+    if _blob_store is None:
+        _blob_store = BlobStore()
+    return _blob_store
@@ -0,0 +1,112 @@
+"""Bounded conversation memory for chat sessions.
+
+A session's memory is a rolling summary plus its most recent turns. The
+summary is cached on the session (memory_summary, summarized_through_id)
+and grows incrementally: when the unsummarized turns no longer fit the
+recent-turns budget, the oldest of them are folded into it, and when the
+summary outgrows its own budget its oldest lines are dropped. A turn
+normally reads at most MAX_RECENT_MESSAGES + 1 rows in one query; when more
+turns than that are unsummarized (e.g. a session from before summaries
+existed), the older ones are first folded in id order, in batches of
+MAX_RECENT_MESSAGES, so none is skipped. The conversation part of the prompt
+stays under CHAT_MEMORY_TOKEN_BUDGET however long the session gets.
+
+Token counts are estimated from text length, the same rough 4 characters
+per token for every provider, so no tokenizer is needed.
+"""
+import os
+import re
+
+from models.project import ChatMessage
+
+TOKEN_BUDGET = int(os.getenv('CHAT_MEMORY_TOKEN_BUDGET', 1500))
+SUMMARY_TOKEN_BUDGET = int(os.getenv('CHAT_SUMMARY_TOKEN_BUDGET', 400))
+# The current exchange is never folded into the summary
+MIN_RECENT_MESSAGES = 2
+MAX_RECENT_MESSAGES = int(os.getenv('CHAT_MEMORY_MAX_RECENT', 50))
+
+CHARS_PER_TOKEN = 4
+SUMMARY_LINE_CHARS = 160
+ROLE_LABELS = {'user': 'User', 'ai': 'Assistant', 'system': 'System'}
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def estimate_tokens(text):
+    return (len(text or '') + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def clip(text, max_tokens):
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    return text if len(text) <= max_chars else text[:max_chars - 3].rstrip() + '...'
+
+
+def summary_line(message):
+    """One summary line for a message: its role and first sentence"""
+    text = _WHITESPACE.sub(' ', message.content or '').strip()
+    first_sentence = _SENTENCE_END.split(text, 1)[0]
+    if len(first_sentence) > SUMMARY_LINE_CHARS:
+        first_sentence = first_sentence[:SUMMARY_LINE_CHARS - 3].rstrip() + '...'
+    return f"- {ROLE_LABELS.get(message.type, message.type.title())}: {first_sentence}"
+
+
+def fold_into_summary(summary, messages, budget=SUMMARY_TOKEN_BUDGET):
+    """Extend a summary with messages, dropping its oldest lines to stay within budget"""
+    lines = (summary.splitlines() if summary else []) + [summary_line(message) for message in messages]
+    tokens = sum(estimate_tokens(line) + 1 for line in lines)
+    while lines and tokens > budget:
+        tokens -= estimate_tokens(lines.pop(0)) + 1
+    return '\n'.join(lines)
+
+
+def session_memory(session, budget=TOKEN_BUDGET):
+    """The session's summary and the recent messages that fit the budget.
+
+    Folding updates the session's cached summary; the change is committed with
+    the turn that triggered it.
+    """
+    def unsummarized():
+        query = ChatMessage.query.filter_by(session_id=session.id)
+        if session.summarized_through_id:
+            query = query.filter(ChatMessage.id > session.summarized_through_id)
+        return query
+    
+    # One row past the window tells whether older turns are waiting to be folded
+    recent = list(reversed(unsummarized().order_by(ChatMessage.id.desc()).limit(MAX_RECENT_MESSAGES + 1).all()))
+    if len(recent) > MAX_RECENT_MESSAGES:
+        recent = recent[1:]
+        while True:
+            batch = unsummarized().filter(ChatMessage.id < recent[0].id)\
+                .order_by(ChatMessage.id.asc()).limit(MAX_RECENT_MESSAGES).all()
+            if not batch:
+                break
+            session.memory_summary = fold_into_summary(session.memory_summary, batch)
+            session.summarized_through_id = batch[-1].id
+
+    recent_budget = budget - SUMMARY_TOKEN_BUDGET
+    tokens = sum(estimate_tokens(message.content) for message in recent)
+    cut = 0
+    while len(recent) - cut > MIN_RECENT_MESSAGES and tokens > recent_budget:
+        tokens -= estimate_tokens(recent[cut].content)
+        cut += 1
+
+    if cut:
+        session.memory_summary = fold_into_summary(session.memory_summary, recent[:cut])
+        session.summarized_through_id = recent[cut - 1].id
+        recent = recent[cut:]
+
+    # The kept turns may still overflow when single messages are huge; clip them to their share
+    share = max(recent_budget // max(len(recent), 1), 1)
+    return {
+        'summary': session.memory_summary or '',
+        'recent': [
+            {
+                'id': message.id,
+                'type': message.type,
+                'content': message.content if tokens <= recent_budget else clip(message.content, share),
+                'timestamp': message.created_at.isoformat() if message.created_at else None
+            }
+            for message in recent
+        ]
+    }
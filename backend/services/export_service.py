@@ -0,0 +1,124 @@
+import io
+import json
+import posixpath
+import re
+import zipfile
+
+from models.artifacts import BLOB_REF_KEY, is_blob_ref
+from services.blob_store import CHUNK_SIZE, get_blob_store
+from services.generated_files import resolve_files
+
+# Sections of generation_results that hold source files, with the extension
+# used for entries whose key has none. Everything else is exported as JSON.
+CODE_SECTIONS = {
+    'frontend_code': '.jsx',
+    'backend_code': '.js'
+}
+
+
+class _ZipStream(io.RawIOBase):
+    """Unseekable sink that hands written bytes back to the response generator"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def export_filename(name):
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', name or '').strip('-').lower()
+    return f"{slug or 'project'}.zip"
+
+
+def _safe_segment(part):
+    segment = re.sub(r'[^A-Za-z0-9._-]+', '_', str(part))
+    # Empty, "." and ".." segments would collapse or escape the entry's directory
+    if not segment.strip('.'):
+        segment = segment.replace('.', '_') or '_'
+    return segment
+
+
+def _entry_path(parts, extension):
+    segments = [_safe_segment(part) for part in parts]
+    path = '/'.join(segments)
+    return path if '.' in segments[-1] else path + extension
+
+
+def _unique_path(path, used):
+    """path, or path with a _2, _3... suffix before its extension if an earlier entry took it"""
+    stem, extension = posixpath.splitext(path)
+    candidate = path
+    counter = 1
+    while candidate in used:
+        counter += 1
+        candidate = f'{stem}_{counter}{extension}'
+    used.add(candidate)
+    return candidate
+
+
+def _iter_entries(manifest, store):
+    """Yield (path, source) pairs; source is a str or a blob reference"""
+    for section, value in manifest.items():
+        if value is None:
+            continue
+        if section not in CODE_SECTIONS:
+            yield f'{section}.json', json.dumps(resolve_files(value, store), indent=2)
+            continue
+        yield from _iter_code_entries([section], value, CODE_SECTIONS[section], store)
+
+
+def _iter_code_entries(parts, value, extension, store):
+    if isinstance(value, str) or is_blob_ref(value):
+        yield _entry_path(parts, extension), value
+    elif isinstance(value, dict):
+        for key, child in value.items():
+            yield from _iter_code_entries(parts + [key], child, extension, store)
+    elif value is not None:
+        yield _entry_path(parts, '.json'), json.dumps(resolve_files(value, store), indent=2)
+
+
+def stream_project_zip(name, description, manifest):
+    """Generate a ZIP archive of a project's generated files chunk by chunk.
+
+    Entries are written one at a time through an unseekable stream (zipfile
+    then uses data descriptors), and blob-backed files are copied in
+    CHUNK_SIZE reads from the blob store, so memory use stays constant
+    regardless of project size.
+    """
+    # An empty chunk would terminate a chunked response early
+    return (chunk for chunk in _generate_zip(name, description, manifest) if chunk)
+
+
+def _generate_zip(name, description, manifest):
+    store = get_blob_store()
+    sink = _ZipStream()
+
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        readme = f"# {name}\n\n{description}\n"
+        archive.writestr('README.md', readme)
+        yield sink.drain()
+
+        # Distinct keys can sanitize to the same entry name, and zipfile would write both
+        used = {'README.md'}
+        for path, source in _iter_entries(manifest, store):
+            with archive.open(_unique_path(path, used), mode='w', force_zip64=True) as entry:
+                if is_blob_ref(source):
+                    for chunk in store.iter_chunks(source[BLOB_REF_KEY], CHUNK_SIZE):
+                        entry.write(chunk)
+                        yield sink.drain()
+                else:
+                    entry.write(source.encode('utf-8'))
+            yield sink.drain()
+
+    # Central directory is written when the archive closes
+    yield sink.drain()
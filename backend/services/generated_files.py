@@ -0,0 +1,50 @@
+"""Generated files stored outside the project row.
+
+Large string leaves of generated_code are written to the content-addressed
+blob store and replaced by {"$blob": <sha256>, "size": <bytes>} references.
+Importing this module installs the codec on Project, so the model stays
+free of storage concerns; the factory imports it with the models.
+"""
+import os
+
+from models.artifacts import BLOB_REF_KEY, is_blob_ref
+from models.project import Project
+from services.blob_store import get_blob_store
+
+BLOB_THRESHOLD = int(os.getenv('BLOB_THRESHOLD', 512))
+
+
+def externalize_files(data, store):
+    """Replace large string leaves with blob references, storing each file once"""
+    if isinstance(data, dict):
+        return {key: externalize_files(value, store) for key, value in data.items()}
+    if isinstance(data, list):
+        return [externalize_files(value, store) for value in data]
+    if isinstance(data, str) and len(data) >= BLOB_THRESHOLD:
+        content = data.encode('utf-8')
+        return {BLOB_REF_KEY: store.put(content), 'size': len(content)}
+    return data
+
+
+def resolve_files(data, store):
+    """Inverse of externalize_files: inline the content of every blob reference"""
+    if is_blob_ref(data):
+        return store.read_text(data[BLOB_REF_KEY])
+    if isinstance(data, dict):
+        return {key: resolve_files(value, store) for key, value in data.items()}
+    if isinstance(data, list):
+        return [resolve_files(value, store) for value in data]
+    return data
+
+
+class BlobFiles:
+    """The Project.generated_files codec backed by the shared blob store"""
+
+    def externalize(self, data):
+        return externalize_files(data, get_blob_store())
+
+    def resolve(self, data):
+        return resolve_files(data, get_blob_store())
+
+
+Project.generated_files = BlobFiles()
@@ -0,0 +1,61 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENT_GENERATIONS = int(os.getenv('MAX_CONCURRENT_GENERATIONS', 5))
+
+
+class GenerationPool:
+    """Bounded pool of generation workers.
+
+    Generations beyond max_workers wait in the executor queue instead of each
+    getting its own thread, and the queued and running project ids are kept
+    so readiness probes can report queue depth. Every job runs inside an app
+    context of the app passed to init_app().
+    """
+
+    def __init__(self, app=None, max_workers=MAX_CONCURRENT_GENERATIONS):
+        self.app = app
+        self.max_workers = max_workers
+        self._executor = None
+        self._queued = set()
+        self._running = set()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+
+    def submit(self, project_id, target, *args):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='generation')
+            self._queued.add(project_id)
+        return self._executor.submit(self._run, project_id, target, args)
+
+    def _run(self, project_id, target, args):
+        with self._lock:
+            self._queued.discard(project_id)
+            self._running.add(project_id)
+        try:
+            with self.app.app_context():
+                target(project_id, *args)
+        except Exception:
+            logger.exception(f"Generation for project {project_id} crashed")
+        finally:
+            with self._lock:
+                self._running.discard(project_id)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': len(self._queued),
+                'running': len(self._running),
+                'max_workers': self.max_workers
+            }
+
+
+generation_pool = GenerationPool()
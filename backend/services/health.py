@@ -0,0 +1,70 @@
+"""Readiness checks for load balancer probes.
+
+Liveness only says the process can answer HTTP. Readiness says whether this
+instance should get traffic: the database answers, the connection pool has a
+free connection, plus generation queue, thread and provider circuit telemetry
+for dashboards. Only a failing database or an exhausted pool make an instance
+not ready; an open provider circuit still serves fallback responses.
+"""
+import threading
+import time
+
+from sqlalchemy import text
+
+from models.database import db
+
+
+def pool_status():
+    pool = db.engine.pool
+    status = {'class': type(pool).__name__}
+    # Only QueuePool tracks sizes; SQLite memory and NullPool do not
+    if not hasattr(pool, 'checkedout'):
+        status['exhausted'] = False
+        return status
+
+    size = pool.size()
+    checked_out = pool.checkedout()
+    # QueuePool keeps its overflow limit private; -1 means unlimited
+    max_overflow = getattr(pool, '_max_overflow', -1)
+    status.update({
+        'size': size,
+        'checked_out': checked_out,
+        'checked_in': pool.checkedin(),
+        'overflow': max(pool.overflow(), 0),
+        'max_overflow': max_overflow,
+        'exhausted': max_overflow >= 0 and checked_out >= size + max_overflow
+    })
+    return status
+
+
+def database_status():
+    start = time.perf_counter()
+    try:
+        db.session.execute(text('SELECT 1'))
+        return {'connected': True, 'latency_ms': round((time.perf_counter() - start) * 1000, 2)}
+    except Exception as e:
+        return {'connected': False, 'error': str(e)}
+    finally:
+        db.session.remove()
+
+
+def readiness():
+    """Returns (ready, report)"""
+    from services.ai_service import provider_circuits
+    from services.generation_pool import generation_pool
+    from services.progress_buffer import progress_buffer
+
+    pool = pool_status()
+    # Querying an exhausted pool would block for pool_timeout, so report it unready straight away
+    database = {'connected': None, 'skipped': 'pool exhausted'} if pool['exhausted'] else database_status()
+    ready = bool(database['connected']) and not pool['exhausted']
+
+    return ready, {
+        'status': 'ready' if ready else 'unavailable',
+        'database': database,
+        'pool': pool,
+        'generation': generation_pool.stats(),
+        'progress_writes': progress_buffer.stats(),
+        'threads': threading.active_count(),
+        'providers': provider_circuits()
+    }
@@ -0,0 +1,33 @@
+import hashlib
+
+from flask import Response, request
+
+
+def make_etag(*parts):
+    """Build a strong ETag value from the parts that identify a representation"""
+    return hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+def project_etag(project_id, row_version, updated_at, variant=''):
+    return make_etag('project', project_id, row_version, updated_at.isoformat() if updated_at else '', variant)
+
+
+def not_modified_response(etag):
+    """Return a 304 if the client already holds this ETag, otherwise None.
+
+    Call this with a version read before the full row is loaded, so
+    unchanged polls skip loading, decoding and serializing the object.
+    """
+    if not request.if_none_match.contains_weak(etag):
+        return None
+
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def with_etag(response, etag):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,112 @@
+import hashlib
+import os
+import threading
+import zlib
+
+from cachetools import LRUCache
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always offered
+    brotli = None
+
+MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 5))
+
+# Compressed bodies at least this large are cached by content hash, so
+# repeated fetches of an unchanged project are not recompressed
+CACHE_MIN_SIZE = int(os.getenv('COMPRESSION_CACHE_MIN_SIZE', 32 * 1024))
+CACHE_MAX_ENTRIES = int(os.getenv('COMPRESSION_CACHE_ENTRIES', 256))
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/plain', 'text/html', 'text/css', 'application/javascript'}
+
+_cache = LRUCache(maxsize=CACHE_MAX_ENTRIES)
+_cache_lock = threading.Lock()
+
+
+def _supported_encodings():
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def _compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits 31 writes a gzip container
+    return compressor.compress(body) + compressor.flush()
+
+
+def _compress_cached(body, encoding):
+    if len(body) < CACHE_MIN_SIZE:
+        return _compress(body, encoding)
+
+    key = (hashlib.sha256(body).hexdigest(), encoding)
+    with _cache_lock:
+        compressed = _cache.get(key)
+    if compressed is None:
+        compressed = _compress(body, encoding)
+        with _cache_lock:
+            _cache[key] = compressed
+    return compressed
+
+
+def _stream_compress(chunks, encoding):
+    """Compress a streamed body, flushing after each chunk so delivery is not delayed"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        for chunk in chunks:
+            data = compressor.process(chunk.encode('utf-8') if isinstance(chunk, str) else chunk) + compressor.flush()
+            if data:
+                yield data
+        tail = compressor.finish()
+        if tail:
+            yield tail
+        return
+
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+        data += compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    tail = compressor.flush()
+    if tail:
+        yield tail
+
+
+def compress_response(response):
+    """after_request hook negotiating gzip/brotli for /api/* responses"""
+    if not request.path.startswith('/api/'):
+        return response
+    if response.status_code < 200 or response.status_code in (204, 304):
+        return response
+    if 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(_supported_encodings())
+    if not encoding:
+        return response
+
+    if response.is_streamed:
+        response.response = _stream_compress(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < MIN_SIZE:
+            return response
+        response.set_data(_compress_cached(body, encoding))
+
+    response.headers['Content-Encoding'] = encoding
+
+    # The encoded bytes differ from the identity representation
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+    return response
+
+
+def init_compression(app):
+    app.after_request(compress_response)
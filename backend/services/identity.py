@@ -0,0 +1,141 @@
+"""Request-scoped identity resolution.
+
+The current user is resolved once per request in a before_request hook: from
+the JWT identity when a bearer token is sent, otherwise, when ALLOW_DEMO_USER
+is enabled, from the demo user created at startup. flask-jwt-extended caches the decoded claims for the
+request, and user rows are cached per process in a bounded TTL cache, so a
+warm request costs no identity queries at all.
+"""
+import os
+import threading
+from collections import namedtuple
+
+from cachetools import TTLCache
+from flask import current_app, g, jsonify, request
+from flask_jwt_extended import JWTManager, create_access_token, get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
+
+from models.database import db
+from models.user import User
+
+DEMO_USER_NAME = 'Demo User'
+DEMO_USER_EMAIL = 'demo@aiappbuilder.com'
+
+# Requests without a token act as the demo user only when this is enabled
+ALLOW_DEMO_USER = os.getenv('ALLOW_DEMO_USER', 'False').lower() in ('1', 'true', 'yes')
+
+# Probes must get an answer without a token or a user lookup, and signing up or
+# in is how a client gets a token in the first place
+ANONYMOUS_ENDPOINTS = {'api.health_check', 'api.liveness', 'api.readiness_check', 'auth.register', 'auth.create_token'}
+
+# Metrics reveal endpoint, query and cache internals; scrapers may read them without a
+# token only when METRICS_PUBLIC is enabled, e.g. behind a private network
+METRICS_ENDPOINTS = {'api.sql_metrics_report', 'api.semantic_cache_report'}
+METRICS_PUBLIC = os.getenv('METRICS_PUBLIC', 'False').lower() in ('1', 'true', 'yes')
+
+USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 300))
+USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 1024))
+
+# Detached snapshot of a user row, safe to share across requests and threads
+CurrentUser = namedtuple('CurrentUser', ['id', 'name', 'email'])
+
+_user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+_cache_lock = threading.Lock()
+_demo_user_id = None
+_demo_lock = threading.Lock()
+
+
+def _snapshot(user):
+    return CurrentUser(id=user.id, name=user.name, email=user.email)
+
+
+def cache_user(user):
+    snapshot = _snapshot(user)
+    with _cache_lock:
+        _user_cache[snapshot.id] = snapshot
+    return snapshot
+
+
+def load_user(user_id):
+    """Return a CurrentUser for an id, hitting the database only on a cache miss"""
+    with _cache_lock:
+        cached = _user_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    user = db.session.get(User, user_id)
+    return cache_user(user) if user else None
+
+
+def ensure_demo_user():
+    """Create the demo user if needed; called once at startup"""
+    global _demo_user_id
+    if _demo_user_id is not None:
+        return _demo_user_id
+    with _demo_lock:
+        if _demo_user_id is not None:
+            return _demo_user_id
+
+        user = User.query.filter_by(email=DEMO_USER_EMAIL).first()
+        if not user:
+            user = User(name=DEMO_USER_NAME, email=DEMO_USER_EMAIL)
+            db.session.add(user)
+            db.session.commit()
+
+        _demo_user_id = cache_user(user).id
+        return _demo_user_id
+
+
+def issue_token(user):
+    return create_access_token(identity=str(user.id))
+
+
+def current_user():
+    """The CurrentUser resolved for this request"""
+    return g.get('current_user')
+
+
+def resolve_current_user():
+    if request.method == 'OPTIONS' or not request.path.startswith('/api/'):
+        return None
+    if request.endpoint in ANONYMOUS_ENDPOINTS:
+        return None
+    if request.endpoint in METRICS_ENDPOINTS and current_app.config['METRICS_PUBLIC']:
+        return None
+
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except (JWTExtendedException, PyJWTError) as e:
+        return jsonify({'success': False, 'error': f'Invalid token: {str(e)}'}), 401
+
+    if identity is not None:
+        try:
+            user_id = int(identity)
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'Invalid token: malformed subject'}), 401
+        user = load_user(user_id)
+        if not user:
+            return jsonify({'success': False, 'error': 'User not found'}), 401
+    elif current_app.config['ALLOW_DEMO_USER']:
+        # Normally created by init_db; a process started without it creates it here once
+        user = load_user(ensure_demo_user())
+    else:
+        return jsonify({'success': False, 'error': 'Authentication required'}), 401
+
+    g.current_user = user
+    return None
+
+
+def init_identity(app):
+    app.config.setdefault('JWT_SECRET_KEY', os.getenv('JWT_SECRET_KEY'))
+    if not app.config['JWT_SECRET_KEY']:
+        # A dedicated key keeps tokens independent of the session secret; only tests may share them
+        if not app.config.get('TESTING'):
+            raise RuntimeError('JWT_SECRET_KEY must be set')
+        app.config['JWT_SECRET_KEY'] = app.config['SECRET_KEY']
+    app.config.setdefault('ALLOW_DEMO_USER', ALLOW_DEMO_USER)
+    app.config.setdefault('METRICS_PUBLIC', METRICS_PUBLIC)
+    JWTManager(app)
+    app.before_request(resolve_current_user)
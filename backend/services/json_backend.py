@@ -0,0 +1,62 @@
+"""JSON encoding shared by the API responses and the model helpers.
+
+Uses orjson when it is installed and falls back to the stdlib otherwise.
+Both backends serialize datetime/date values natively as ISO 8601 strings,
+so models can hand datetimes straight to the response.
+"""
+import json
+from datetime import date, datetime
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional speedup; the stdlib fallback is API-compatible
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps_bytes(obj):
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+    def dumps(obj):
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS).decode('utf-8')
+
+    def loads(data):
+        return orjson.loads(data)
+
+else:
+    def dumps(obj):
+        return json.dumps(obj, default=_default, separators=(',', ':'))
+
+    def dumps_bytes(obj):
+        return dumps(obj).encode('utf-8')
+
+    def loads(data):
+        return json.loads(data)
+
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider backed by dumps/loads above"""
+
+    mimetype = 'application/json'
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj)
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,165 @@
+"""Data-driven quick-help answers and session titles.
+
+The knowledge base is a JSON file (KNOWLEDGE_BASE_PATH, by default
+data/knowledge_base.json) of sections, each a list of entries with
+patterns. A pattern is a word or phrase, optionally with a weight; by
+default a phrase weighs its number of words, so "api key" beats "key".
+Patterns and questions are tokenized the same way, with light suffix
+stemming, so "deploying", "deployed" and "deployment" all match "deploy".
+
+Each section is compiled once into an inverted index keyed by a pattern's
+first token. Matching walks the question's tokens once, checks the few
+patterns starting at each position, and sums the weights of the distinct
+patterns found per entry (times the entry's own weight). The highest score
+wins; ties go to the entry listed first, so file order is priority order. A
+section with "match": "first" ignores scores: the first listed entry with
+any pattern found wins, like a chain of if/elif checks. Cost depends on the
+question length, not on the number of entries.
+"""
+import json
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'knowledge_base.json')
+DEFAULT_FALLBACK = "I'm here to help! What specific topic would you like help with?"
+
+_WORD = re.compile(r'[a-z0-9]+')
+_SUFFIXES = ('ment', 'ing', 'ed')
+MIN_STEM = 3
+
+
+def stem(word):
+    """Drop a plural s, then one of -ment/-ing/-ed (undoubling a final consonant,
+    as in "stopped"), then a final e, so "create", "creates", "created" and
+    "creating" share one stem. Crude, but applied alike on both sides."""
+    if len(word) > MIN_STEM and word.endswith('s') and not word.endswith('ss'):
+        word = word[:-1]
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM:
+            word = word[:-len(suffix)]
+            if len(word) > MIN_STEM and word[-1] == word[-2] and word[-1] not in 'aeiousz':
+                word = word[:-1]
+            break
+    if len(word) > MIN_STEM and word.endswith('e'):
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Lowercased, stemmed words"""
+    return [stem(word) for word in _WORD.findall((text or '').lower())]
+
+
+class Matcher:
+    def __init__(self, entries, first_match=False):
+        self.entries = list(entries)
+        self.first_match = first_match
+        self.patterns = 0
+        self._index = {}
+        for position, entry in enumerate(self.entries):
+            entry_weight = float(entry.get('weight', 1.0))
+            for pattern in entry.get('patterns', []):
+                if isinstance(pattern, dict):
+                    text, weight = pattern['pattern'], pattern.get('weight')
+                else:
+                    text, weight = pattern, None
+                tokens = tuple(tokenize(text))
+                if not tokens:
+                    continue
+                weight = float(len(tokens) if weight is None else weight) * entry_weight
+                self._index.setdefault(tokens[0], []).append((tokens, position, weight))
+                self.patterns += 1
+
+    def scores(self, text):
+        """Score per entry position for the patterns found in text"""
+        tokens = tokenize(text)
+        found = {}
+        for start, token in enumerate(tokens):
+            for pattern, position, weight in self._index.get(token, ()):
+                if len(pattern) == 1 or tuple(tokens[start:start + len(pattern)]) == pattern:
+                    # A pattern counts once however often it occurs
+                    found[(position, pattern)] = weight
+
+        scores = {}
+        for (position, _), weight in found.items():
+            scores[position] = scores.get(position, 0.0) + weight
+        return scores
+
+    def best(self, text):
+        """(entry, score) of the best match, or (None, 0.0)"""
+        scores = self.scores(text)
+        if not scores:
+            return None, 0.0
+        if self.first_match:
+            position = min(scores)
+        else:
+            position = min(scores, key=lambda candidate: (-scores[candidate], candidate))
+        return self.entries[position], scores[position]
+
+
+class KnowledgeBase:
+    def __init__(self, path=None):
+        self.path = path
+        self._sections = None
+
+    def init_app(self, app):
+        self.path = app.config.get('KNOWLEDGE_BASE_PATH') or os.getenv('KNOWLEDGE_BASE_PATH') or DEFAULT_PATH
+        try:
+            counts = self.load()
+            logger.info(f"Knowledge base loaded from {self.path}: {counts}")
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            # Quick help degrades to its fallback answer rather than taking the app down
+            logger.error(f"Knowledge base {self.path} could not be loaded: {e}")
+            self._sections = {}
+
+    def load(self, data=None):
+        """Compile the knowledge base from data, or from the file; returns entry counts per section"""
+        if data is None:
+            with open(self.path or DEFAULT_PATH, encoding='utf-8') as f:
+                data = json.load(f)
+
+        sections = {}
+        for name, section in data.items():
+            matcher = Matcher(section.get('entries', []), first_match=section.get('match') == 'first')
+            sections[name] = {**section, 'matcher': matcher}
+        # Swapped in whole, so readers see the old or the new knowledge base, never a mix
+        self._sections = sections
+        return {name: len(section['matcher'].entries) for name, section in sections.items()}
+
+    def section(self, name):
+        # Compiled on first use when init_app was not called, e.g. in scripts
+        if self._sections is None:
+            self.load()
+        return self._sections.get(name, {})
+
+    def match(self, section, text):
+        """The best entry of a section for text, or None"""
+        matcher = self.section(section).get('matcher')
+        if matcher is None:
+            return None
+        entry, score = matcher.best(text)
+        if entry is None or score < float(entry.get('min_score', 0)):
+            return None
+        return entry
+
+    def fallback(self, section):
+        return self.section(section).get('fallback', DEFAULT_FALLBACK)
+
+    def answer(self, question):
+        """Quick-help entry for a question, or None"""
+        return self.match('quick_help', question)
+
+    def session_title(self, first_message):
+        entry = self.match('session_titles', first_message)
+        if entry is not None:
+            return entry['title']
+
+        max_words = int(self.section('session_titles').get('max_words', 4))
+        words = first_message.split()
+        return ' '.join(words[:max_words]) + ('...' if len(words) > max_words else '')
+
+
+knowledge_base = KnowledgeBase()
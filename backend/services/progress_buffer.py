@@ -0,0 +1,141 @@
+"""Coalesced progress writes for running generations.
+
+A generation reports progress every couple of seconds. Instead of a SELECT
+and a COMMIT per tick, ticks land in memory and a flusher thread writes the
+latest value of every pending project in one executemany UPDATE each
+flush_interval. Stage transitions (a new current agent) are written through
+immediately. Readers in this process overlay the in-memory value with
+overlay(); other processes see the flushed value, at most one interval old.
+
+stats() reports ticks recorded against rows actually written, which is the
+write reduction.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import bindparam
+
+from models.database import db
+from models.project import Project
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_FLUSH_INTERVAL = float(os.getenv('PROGRESS_FLUSH_INTERVAL', 5))
+
+
+class ProgressBuffer:
+    def __init__(self, app=None, flush_interval=PROGRESS_FLUSH_INTERVAL):
+        self.app = app
+        self.flush_interval = flush_interval
+        self._latest = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flusher = None
+        self._ticks = 0
+        self._rows_written = 0
+        self._statements = 0
+
+    def init_app(self, app):
+        self.app = app
+
+    def record(self, project_id, progress, current_agent, flush=False):
+        """Buffer a progress tick; flush=True writes it through, for stage transitions"""
+        with self._lock:
+            previous = self._latest.get(project_id)
+            entry = {
+                'progress': progress,
+                'current_agent': current_agent,
+                'seq': previous['seq'] + 1 if previous else 1,
+                'updated_at': datetime.utcnow()
+            }
+            self._latest[project_id] = entry
+            self._pending[project_id] = entry
+            self._ticks += 1
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._run, daemon=True)
+                self._flusher.start()
+        if flush:
+            self.flush([project_id])
+        return entry
+
+    def overlay(self, project_id):
+        """Latest buffered values for a project, or None"""
+        with self._lock:
+            entry = self._latest.get(project_id)
+            return dict(entry) if entry else None
+
+    def discard(self, project_id):
+        """Forget a project once its generation has ended; unflushed ticks are dropped"""
+        with self._lock:
+            self._latest.pop(project_id, None)
+            self._pending.pop(project_id, None)
+
+    def flush(self, project_ids=None):
+        """Write pending ticks in one batched UPDATE; returns the rows written"""
+        with self._lock:
+            ids = list(self._pending) if project_ids is None else [pid for pid in project_ids if pid in self._pending]
+            batch = [(pid, self._pending.pop(pid)) for pid in ids]
+        if not batch:
+            return 0
+
+        table = Project.__table__
+        # Core executemany: one statement for every project. Only running
+        # generations are touched, so a late flush never overwrites a final
+        # status, and row_version moves so ETags and SSE ids change.
+        statement = (
+            table.update()
+            .where(table.c.id == bindparam('b_id'))
+            .where(table.c.status == 'generating')
+            .values(
+                progress=bindparam('b_progress'),
+                current_agent=bindparam('b_agent'),
+                updated_at=bindparam('b_updated_at'),
+                row_version=table.c.row_version + 1
+            )
+        )
+        params = [
+            {'b_id': pid, 'b_progress': entry['progress'], 'b_agent': entry['current_agent'],
+             'b_updated_at': entry['updated_at']}
+            for pid, entry in batch
+        ]
+        try:
+            db.session.execute(statement, params)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            with self._lock:
+                # Keep the ticks for the next flush unless newer ones arrived meanwhile
+                for pid, entry in batch:
+                    if pid in self._latest:
+                        self._pending.setdefault(pid, entry)
+            raise
+
+        with self._lock:
+            self._rows_written += len(batch)
+            self._statements += 1
+        return len(batch)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'ticks': self._ticks,
+                'rows_written': self._rows_written,
+                'statements': self._statements,
+                'pending': len(self._pending),
+                'flush_interval': self.flush_interval
+            }
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                with self.app.app_context():
+                    self.flush()
+            except Exception as e:
+                logger.warning(f"Progress flush failed: {str(e)}")
+
+
+progress_buffer = ProgressBuffer()
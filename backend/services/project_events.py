@@ -0,0 +1,118 @@
+import queue
+import threading
+
+from models.database import db
+from models.project import Project
+from services.progress_buffer import progress_buffer
+
+POLL_INTERVAL = 1.0
+TERMINAL_STATUSES = ('completed', 'failed', 'cancelled')
+
+
+class _Channel:
+    def __init__(self, project_id):
+        self.project_id = project_id
+        self.subscribers = set()
+        self.last_event = None
+        self.wakeup = threading.Event()
+        self.listener = None
+
+
+class ProjectEventBroker:
+    """In-process pub/sub of project status snapshots.
+
+    Each watched project has exactly one upstream listener thread, however
+    many subscribers it has. The listener re-reads the status columns when
+    notify() is called by an in-process writer, or every POLL_INTERVAL to
+    pick up writes from other processes, and fans changed snapshots out to
+    subscriber queues. Event ids are the project's row_version, suffixed with
+    the progress buffer sequence while unflushed ticks are overlaid.
+    """
+
+    def __init__(self, app=None, poll_interval=POLL_INTERVAL):
+        self.app = app
+        self.poll_interval = poll_interval
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+
+    def subscribe(self, project_id):
+        """Register a subscriber; returns (queue, latest snapshot or None)"""
+        subscriber = queue.Queue()
+        with self._lock:
+            channel = self._channels.get(project_id)
+            if channel is None:
+                channel = self._channels[project_id] = _Channel(project_id)
+            channel.subscribers.add(subscriber)
+            if channel.listener is None:
+                channel.listener = threading.Thread(target=self._listen, args=(channel,), daemon=True)
+                channel.listener.start()
+            return subscriber, channel.last_event
+
+    def unsubscribe(self, project_id, subscriber):
+        with self._lock:
+            channel = self._channels.get(project_id)
+            if channel is not None:
+                channel.subscribers.discard(subscriber)
+                channel.wakeup.set()
+
+    def notify(self, project_id):
+        """Wake the listener for a project after writing to it"""
+        channel = self._channels.get(project_id)
+        if channel is not None:
+            channel.wakeup.set()
+
+    def snapshot(self, project_id):
+        row = db.session.query(
+            Project.row_version, Project.status, Project.progress,
+            Project.current_agent, Project.error_message
+        ).filter_by(id=project_id).first()
+        if row is None:
+            return None
+        # Progress ticks of a generation running in this process are newer than the row
+        buffered = progress_buffer.overlay(project_id) if row.status == 'generating' else None
+        return {
+            'id': f"{row.row_version}.{buffered['seq']}" if buffered else row.row_version,
+            'project_id': project_id,
+            'status': row.status,
+            'progress': buffered['progress'] if buffered else row.progress,
+            'current_agent': buffered['current_agent'] if buffered else row.current_agent,
+            'error_message': row.error_message
+        }
+
+    def _listen(self, channel):
+        while True:
+            with self._lock:
+                if not channel.subscribers:
+                    # Last subscriber left: retire the channel and its listener
+                    self._channels.pop(channel.project_id, None)
+                    return
+
+            channel.wakeup.clear()
+            try:
+                with self.app.app_context():
+                    event = self.snapshot(channel.project_id)
+            except Exception:
+                event = None
+
+            subscribers = []
+            with self._lock:
+                # Publish under the lock so a concurrent subscribe() sees either
+                # the new snapshot as `latest` or the event in its queue
+                if event is not None and _changed(channel.last_event, event):
+                    channel.last_event = event
+                    subscribers = list(channel.subscribers)
+            for subscriber in subscribers:
+                subscriber.put(event)
+
+            channel.wakeup.wait(self.poll_interval)
+
+
+def _changed(previous, event):
+    # Only status fields matter; unrelated writes also bump row_version
+    return previous is None or any(previous[key] != event[key] for key in event if key != 'id')
+
+
+project_events = ProjectEventBroker()
@@ -0,0 +1,199 @@
+"""Routing of read-only requests to database replicas.
+
+Replicas are listed in DATABASE_REPLICA_URLS (comma separated) and become
+SQLAlchemy binds named replica_0, replica_1, ... Views decorated with
+@read_only run their queries on one healthy replica, picked once per request.
+Everything else stays on the primary:
+
+- writes: flushes and INSERT/UPDATE/DELETE statements
+- code inside use_primary(), for reads that feed a write
+- a user who wrote in the last REPLICA_STICKY_SECONDS (read-your-writes)
+- every request when no replica is configured or all are marked down
+
+A replica error marks that replica down for REPLICA_RETRY_SECONDS, and the
+read_only view is run again on the primary so the client never sees it.
+
+Stickiness is carried by the client, so it holds whichever worker serves the
+next request: a response to a request that committed a write sets a signed
+last_write cookie and X-Last-Write header (the user id, timestamped with the
+secret key), and a request presenting one younger than REPLICA_STICKY_SECONDS
+reads from the primary. Clients without cookies echo the header back. Keep
+REPLICA_STICKY_SECONDS above the replication lag.
+"""
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from sqlalchemy import event
+
+REPLICA_BIND_PREFIX = 'replica_'
+REPLICA_STICKY_SECONDS = float(os.getenv('REPLICA_STICKY_SECONDS', 5))
+REPLICA_RETRY_SECONDS = float(os.getenv('REPLICA_RETRY_SECONDS', 30))
+LAST_WRITE_COOKIE = 'last_write'
+LAST_WRITE_HEADER = 'X-Last-Write'
+
+_down_until = {}
+_lock = threading.Lock()
+
+
+def replica_urls(value=None):
+    value = value if value is not None else os.getenv('DATABASE_REPLICA_URLS', '')
+    if isinstance(value, str):
+        value = value.split(',')
+    return [url.strip() for url in value if url and url.strip()]
+
+
+def replica_binds(urls, options_for=None):
+    """SQLALCHEMY_BINDS entries for the replica URLs"""
+    binds = {}
+    for index, url in enumerate(urls):
+        options = options_for(url) if options_for else {}
+        binds[f'{REPLICA_BIND_PREFIX}{index}'] = {'url': url, **options}
+    return binds
+
+
+def is_replica(key):
+    return isinstance(key, str) and key.startswith(REPLICA_BIND_PREFIX)
+
+
+def watch_replica(key, engine):
+    """Mark a replica down on connection or query errors"""
+    def handle_error(context):
+        with _lock:
+            _down_until[key] = time.monotonic() + REPLICA_RETRY_SECONDS
+        if has_request_context():
+            g.replica_failed = True
+
+    event.listen(engine, 'handle_error', handle_error)
+
+
+def healthy_replicas(engines):
+    now = time.monotonic()
+    with _lock:
+        return [key for key in engines if is_replica(key) and _down_until.get(key, 0) <= now]
+
+
+def _write_marker_serializer():
+    return URLSafeTimedSerializer(current_app.secret_key, salt='read-your-writes')
+
+
+def write_marker(user_id):
+    """Signed, timestamped marker that user_id has just written"""
+    return _write_marker_serializer().dumps(user_id)
+
+
+def _is_recent_writer(user_id):
+    if g.get('wrote'):
+        return True
+    marker = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE)
+    if not marker:
+        return False
+    try:
+        return _write_marker_serializer().loads(marker, max_age=REPLICA_STICKY_SECONDS) == user_id
+    except BadSignature:
+        # Expired or forged markers alike mean the replicas may serve this user
+        return False
+
+
+def _request_user_id():
+    user = g.get('current_user')
+    return user.id if user is not None else None
+
+
+def replica_engine(engines):
+    """The replica this request reads from, or None for the primary"""
+    if not has_request_context() or not g.get('read_only') or g.get('use_primary'):
+        return None
+
+    if 'replica_key' not in g:
+        user_id = _request_user_id()
+        candidates = [] if user_id is not None and _is_recent_writer(user_id) else healthy_replicas(engines)
+        g.replica_key = random.choice(candidates) if candidates else None
+    return engines[g.replica_key] if g.replica_key else None
+
+
+class RoutingSession(Session):
+    """db.session that sends reads of @read_only requests to a replica"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not getattr(clause, 'is_dml', False):
+            engine = replica_engine(self._db.engines)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _note_flush(session, flush_context):
+    session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _note_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _stick_writer_to_primary(session):
+    if session.info.pop('wrote', False) and has_request_context():
+        g.wrote = True
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _forget_writes(session):
+    session.info.pop('wrote', None)
+
+
+@contextmanager
+def use_primary():
+    """Read from the primary inside a read_only view, e.g. before writing"""
+    previous = g.get('use_primary')
+    g.use_primary = True
+    try:
+        yield
+    finally:
+        g.use_primary = previous
+
+
+def read_only(view):
+    """Serve a view's queries from a replica, falling back to the primary"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        from models.database import db
+
+        g.read_only = True
+        response = view(*args, **kwargs)
+        if g.pop('replica_failed', False):
+            # The replica broke mid-request: discard its session state and rerun on the primary
+            db.session.rollback()
+            g.read_only = False
+            g.pop('replica_key', None)
+            response = view(*args, **kwargs)
+        return response
+
+    return wrapper
+
+
+def _send_write_marker(response):
+    user_id = _request_user_id() if g.get('wrote') else None
+    if user_id is not None:
+        marker = write_marker(user_id)
+        response.headers[LAST_WRITE_HEADER] = marker
+        response.set_cookie(LAST_WRITE_COOKIE, marker, max_age=max(int(REPLICA_STICKY_SECONDS), 1),
+                            secure=request.is_secure, httponly=True, samesite='Lax')
+    return response
+
+
+def init_replicas(app, db):
+    app.after_request(_send_write_marker)
+    with app.app_context():
+        for key, engine in db.engines.items():
+            if is_replica(key):
+                watch_replica(key, engine)
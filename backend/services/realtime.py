@@ -0,0 +1,135 @@
+"""Socket.IO fan-out across processes.
+
+A Socket.IO server only knows the clients connected to its own process, so
+with several gunicorn workers an emit from one worker never reaches clients
+held by another. Pointing SOCKETIO_MESSAGE_QUEUE at a shared queue makes every
+emit go through it and each worker delivers it to its own clients:
+
+    SOCKETIO_MESSAGE_QUEUE=redis://localhost:6379/0   Redis (or any Redis-compatible server)
+    SOCKETIO_MESSAGE_QUEUE=amqp://guest@localhost//   any other Kombu transport
+    SOCKETIO_MESSAGE_QUEUE=local://                   in-process bus, for tests
+
+Processes that do not serve clients, such as a separate generation worker,
+publish through a write-only manager on the same queue; emit_to_project()
+picks the right path for the current process.
+"""
+import logging
+import os
+import threading
+from collections import defaultdict
+
+import socketio as python_socketio
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHANNEL = 'flask-socketio'
+LOCAL_SCHEME = 'local://'
+
+
+def message_queue_url():
+    return os.getenv('SOCKETIO_MESSAGE_QUEUE') or None
+
+
+def message_queue_channel():
+    return os.getenv('SOCKETIO_CHANNEL', DEFAULT_CHANNEL)
+
+
+class LocalQueueManager(python_socketio.Manager):
+    """Stand-in for a Redis queue that fans out within one process.
+
+    Every manager on the same channel delivers every emit to its own clients,
+    so a test can run two SocketIO servers side by side and check that an
+    emit on one reaches a client of the other, the same as two workers
+    sharing Redis. Delivery is synchronous, which keeps tests deterministic
+    and lets the Flask-SocketIO test client be used with it.
+    """
+
+    name = 'local'
+
+    _peers = defaultdict(list)
+    _lock = threading.Lock()
+
+    def __init__(self, url=LOCAL_SCHEME, channel=DEFAULT_CHANNEL, write_only=False, logger=None):
+        super().__init__()
+        self.url = url
+        self.channel = channel
+        self.write_only = write_only
+
+    def initialize(self):
+        super().initialize()
+        if not self.write_only:
+            with self._lock:
+                if self not in self._peers[self.channel]:
+                    self._peers[self.channel].append(self)
+
+    def close(self):
+        with self._lock:
+            peers = self._peers.get(self.channel, [])
+            if self in peers:
+                peers.remove(self)
+
+    def emit(self, event, data, namespace=None, room=None, skip_sid=None, callback=None, to=None, **kwargs):
+        namespace = namespace or '/'
+        room = to or room
+        with self._lock:
+            peers = list(self._peers.get(self.channel, []))
+        for peer in peers:
+            # Acknowledgement callbacks only make sense on the emitting server
+            python_socketio.Manager.emit(peer, event, data, namespace, room=room, skip_sid=skip_sid,
+                                         callback=callback if peer is self else None)
+
+
+def create_manager(url, channel=None, write_only=False):
+    """Build the client manager for a queue URL, or None for a single process"""
+    if not url:
+        return None
+    channel = channel or message_queue_channel()
+    if url.startswith(LOCAL_SCHEME):
+        manager_class = LocalQueueManager
+    elif url.startswith(('redis://', 'rediss://')):
+        manager_class = python_socketio.RedisManager
+    else:
+        manager_class = python_socketio.KombuManager
+    return manager_class(url, channel=channel, write_only=write_only)
+
+
+def socketio_options():
+    """Keyword arguments for SocketIO.init_app()"""
+    # Always pass client_manager: SocketIO keeps options between init_app()
+    # calls, and None restores the default single-process manager
+    return {'client_manager': create_manager(message_queue_url())}
+
+
+_emitter = None
+_emitter_lock = threading.Lock()
+
+
+def get_emitter():
+    """Write-only manager for processes that publish without serving clients"""
+    global _emitter
+    if _emitter is None:
+        with _emitter_lock:
+            if _emitter is None:
+                _emitter = create_manager(message_queue_url(), write_only=True)
+    return _emitter
+
+
+def project_room(project_id):
+    return f'project_{project_id}'
+
+
+def emit_to_project(project_id, event, data):
+    """Emit to everyone who joined a project's room, in whichever worker they are connected"""
+    from factory import socketio
+
+    try:
+        if socketio.server is not None:
+            socketio.emit(event, data, to=project_room(project_id))
+            return
+
+        emitter = get_emitter()
+        if emitter is not None:
+            emitter.emit(event, data, namespace='/', room=project_room(project_id))
+    except Exception as e:
+        # A queue outage must not fail the write that triggered the emit
+        logger.warning(f"Socket.IO emit of {event} for project {project_id} failed: {str(e)}")
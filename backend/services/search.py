@@ -0,0 +1,358 @@
+"""Full-text search over projects and chat messages.
+
+Documents are kept in a dialect-specific index, written through the flush
+connection by mapper events so the index commits or rolls back with the
+change that caused it:
+
+- SQLite: an FTS5 table with porter stemming and bm25 ranking. The owner and
+  document kind are indexed tokens, so a user's documents are filtered inside
+  the MATCH rather than after it. Row ids are derived from the document key
+  so updates and deletes are rowid lookups.
+- PostgreSQL: a search_documents table with a weighted, generated tsvector
+  column behind a GIN index, ranked with ts_rank_cd.
+
+Messages moved to the cold tier keep their documents until their session is
+deleted. `flask reindex-search` rebuilds the index from scratch, including
+archived messages.
+"""
+import html
+import re
+import weakref
+
+from sqlalchemy import bindparam, event, inspect, select, text
+from sqlalchemy.orm import load_only
+
+from models.database import db
+from models.project import Project, ChatSession, ChatMessage, ChatMessageArchive
+
+SEARCH_KINDS = ('project', 'message')
+MAX_PER_PAGE = 50
+
+# Highlight markers: control characters that never occur in indexed text, so
+# the output can be HTML-escaped before they become <mark> tags
+_MARK_START, _MARK_END = '\x02', '\x03'
+_TERM = re.compile(r'\w+', re.UNICODE)
+
+
+def project_document(project):
+    return {
+        'kind': 'project',
+        'ref_id': project.id,
+        'user_id': project.user_id,
+        'project_id': project.id,
+        'session_id': None,
+        'title': project.name or '',
+        'body': ' '.join([project.description or ''] + [str(feature) for feature in project.get_features()])
+    }
+
+
+def message_document(message, user_id, project_id):
+    return {
+        'kind': 'message',
+        'ref_id': message['id'] if isinstance(message, dict) else message.id,
+        'user_id': user_id,
+        'project_id': project_id,
+        'session_id': message['session_id'] if isinstance(message, dict) else message.session_id,
+        'title': '',
+        'body': message['content'] if isinstance(message, dict) else message.content
+    }
+
+
+def _highlighted(value):
+    escaped = html.escape(value or '')
+    return escaped.replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+class SQLiteIndex:
+    name = 'fts5'
+
+    def create(self, connection):
+        connection.exec_driver_sql(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+            "kind, owner, ref_id UNINDEXED, project_id UNINDEXED, session_id UNINDEXED, title, body, "
+            "tokenize='porter unicode61')"
+        )
+
+    @staticmethod
+    def _rowid(kind, ref_id):
+        return ref_id * len(SEARCH_KINDS) + SEARCH_KINDS.index(kind)
+
+    def upsert(self, connection, document):
+        rowid = self._rowid(document['kind'], document['ref_id'])
+        connection.execute(text('DELETE FROM search_index WHERE rowid = :rowid'), {'rowid': rowid})
+        connection.execute(
+            text('INSERT INTO search_index (rowid, kind, owner, ref_id, project_id, session_id, title, body) '
+                 'VALUES (:rowid, :kind, :owner, :ref_id, :project_id, :session_id, :title, :body)'),
+            {**document, 'rowid': rowid, 'owner': f"u{document['user_id']}"}
+        )
+
+    def delete(self, connection, kind, ref_id):
+        connection.execute(text('DELETE FROM search_index WHERE rowid = :rowid'), {'rowid': self._rowid(kind, ref_id)})
+
+    def delete_projects(self, connection, project_ids):
+        connection.execute(
+            text('DELETE FROM search_index WHERE project_id IN :ids').bindparams(bindparam('ids', expanding=True)),
+            {'ids': list(project_ids)}
+        )
+
+    def delete_sessions(self, connection, session_ids):
+        connection.execute(
+            text('DELETE FROM search_index WHERE session_id IN :ids').bindparams(bindparam('ids', expanding=True)),
+            {'ids': list(session_ids)}
+        )
+
+    def clear(self, connection):
+        connection.exec_driver_sql('DELETE FROM search_index')
+
+    def search(self, session, user_id, query, kinds, limit, offset):
+        terms = _TERM.findall(query)
+        if not terms:
+            return [], 0
+        # Quote every term so FTS5 operators in user input are plain words; prefix-match the last
+        match = ' '.join(f'"{term}"' for term in terms) + '*'
+        match = f'owner : "u{user_id}" AND kind : ({" OR ".join(kinds)}) AND ({match})'
+
+        # FTS5 auxiliary functions cannot share a query with window functions, so
+        # the total comes from a separate count unless this page already implies it
+        rows = session.execute(text(
+            "SELECT kind, ref_id, project_id, session_id, "
+            "highlight(search_index, 5, :start, :end) AS title, "
+            "snippet(search_index, 6, :start, :end, '...', 24) AS snippet, "
+            "bm25(search_index, 0, 0, 0, 0, 0, 10.0, 1.0) AS rank "
+            "FROM search_index WHERE search_index MATCH :match "
+            "ORDER BY rank LIMIT :limit OFFSET :offset"
+        ), {'match': match, 'start': _MARK_START, 'end': _MARK_END, 'limit': limit, 'offset': offset}).all()
+
+        if len(rows) < limit and (rows or not offset):
+            total = offset + len(rows)
+        else:
+            total = session.execute(text('SELECT count(*) FROM search_index WHERE search_index MATCH :match'),
+                                    {'match': match}).scalar()
+        # bm25 is lower-is-better; expose a higher-is-better score like Postgres
+        return [_result(row, -row.rank) for row in rows], total
+
+
+class PostgresIndex:
+    name = 'tsvector'
+
+    def create(self, connection):
+        connection.exec_driver_sql(
+            "CREATE TABLE IF NOT EXISTS search_documents ("
+            "kind VARCHAR(20) NOT NULL, ref_id INTEGER NOT NULL, user_id INTEGER NOT NULL, "
+            "project_id INTEGER, session_id INTEGER, "
+            "title TEXT NOT NULL DEFAULT '', body TEXT NOT NULL DEFAULT '', "
+            "document tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(body, '')), 'B')) STORED, "
+            "PRIMARY KEY (kind, ref_id))"
+        )
+        connection.exec_driver_sql(
+            'CREATE INDEX IF NOT EXISTS ix_search_documents_document ON search_documents USING GIN (document)'
+        )
+        connection.exec_driver_sql('CREATE INDEX IF NOT EXISTS ix_search_documents_user ON search_documents (user_id)')
+        connection.exec_driver_sql('CREATE INDEX IF NOT EXISTS ix_search_documents_project ON search_documents (project_id)')
+        connection.exec_driver_sql('CREATE INDEX IF NOT EXISTS ix_search_documents_session ON search_documents (session_id)')
+
+    def upsert(self, connection, document):
+        connection.execute(text(
+            'INSERT INTO search_documents (kind, ref_id, user_id, project_id, session_id, title, body) '
+            'VALUES (:kind, :ref_id, :user_id, :project_id, :session_id, :title, :body) '
+            'ON CONFLICT (kind, ref_id) DO UPDATE SET user_id = EXCLUDED.user_id, '
+            'project_id = EXCLUDED.project_id, session_id = EXCLUDED.session_id, '
+            'title = EXCLUDED.title, body = EXCLUDED.body'
+        ), document)
+
+    def delete(self, connection, kind, ref_id):
+        connection.execute(text('DELETE FROM search_documents WHERE kind = :kind AND ref_id = :ref_id'),
+                           {'kind': kind, 'ref_id': ref_id})
+
+    def delete_projects(self, connection, project_ids):
+        connection.execute(text('DELETE FROM search_documents WHERE project_id = ANY(:ids)'),
+                           {'ids': list(project_ids)})
+
+    def delete_sessions(self, connection, session_ids):
+        connection.execute(text('DELETE FROM search_documents WHERE session_id = ANY(:ids)'),
+                           {'ids': list(session_ids)})
+
+    def clear(self, connection):
+        connection.exec_driver_sql('TRUNCATE search_documents')
+
+    def search(self, session, user_id, query, kinds, limit, offset):
+        # Rank and page first, then build headlines for the page only
+        rows = session.execute(text(
+            "WITH matches AS ("
+            "  SELECT kind, ref_id, project_id, session_id, title, body, "
+            "         ts_rank_cd(document, query) AS rank, count(*) OVER () AS total, query "
+            "  FROM search_documents, websearch_to_tsquery('english', :query) AS query "
+            "  WHERE user_id = :user_id AND kind = ANY(:kinds) AND document @@ query "
+            "  ORDER BY rank DESC LIMIT :limit OFFSET :offset"
+            ") "
+            "SELECT kind, ref_id, project_id, session_id, rank, total, "
+            "       ts_headline('english', title, query, :title_options) AS title, "
+            "       ts_headline('english', body, query, :body_options) AS snippet "
+            "FROM matches ORDER BY rank DESC"
+        ), {
+            'query': query, 'user_id': user_id, 'kinds': list(kinds), 'limit': limit, 'offset': offset,
+            'title_options': f'StartSel={_MARK_START}, StopSel={_MARK_END}, HighlightAll=true',
+            'body_options': f'StartSel={_MARK_START}, StopSel={_MARK_END}, MaxWords=24, MinWords=8, MaxFragments=2'
+        }).all()
+
+        if rows:
+            total = rows[0].total
+        else:
+            total = session.execute(text(
+                "SELECT count(*) FROM search_documents WHERE user_id = :user_id AND kind = ANY(:kinds) "
+                "AND document @@ websearch_to_tsquery('english', :query)"
+            ), {'query': query, 'user_id': user_id, 'kinds': list(kinds)}).scalar() if offset else 0
+        return [_result(row, row.rank) for row in rows], total
+
+
+def _result(row, score):
+    return {
+        'type': row.kind,
+        'id': int(row.ref_id),
+        'project_id': int(row.project_id) if row.project_id is not None else None,
+        'session_id': int(row.session_id) if row.session_id is not None else None,
+        'title': _highlighted(row.title),
+        'snippet': _highlighted(row.snippet),
+        'score': round(float(score), 6)
+    }
+
+
+_INDEXES = {'sqlite': SQLiteIndex(), 'postgresql': PostgresIndex()}
+_ready_engines = weakref.WeakSet()
+
+
+def index_for(connection, create=True):
+    """The index for a connection's dialect, None if unsupported. Writers
+    create it on first use; readers pass create=False since they may be on a
+    read-only replica."""
+    index = _INDEXES.get(connection.dialect.name)
+    if index is not None and create and connection.engine not in _ready_engines:
+        index.create(connection)
+        _ready_engines.add(connection.engine)
+    return index
+
+
+def search_dialect():
+    """Name of the database dialect searches run on"""
+    return db.session.get_bind().dialect.name
+
+
+def search_supported(dialect):
+    return dialect in _INDEXES
+
+
+def search_documents(user_id, query, kinds=SEARCH_KINDS, limit=20, offset=0):
+    """Ranked matches for a user's query; returns (results, total). Callers
+    check search_supported() first."""
+    index = index_for(db.session.connection(), create=False)
+    return index.search(db.session, user_id, query, kinds, limit, offset)
+
+
+def rebuild_index():
+    """Re-index every project and message, archived ones included; returns the document count"""
+    connection = db.session.connection()
+    index = index_for(connection)
+    if index is None:
+        return 0
+    index.clear(connection)
+
+    count = 0
+    for project in Project.query.yield_per(200):
+        index.upsert(connection, project_document(project))
+        count += 1
+
+    owners = {row.id: (row.user_id, row.project_id)
+              for row in db.session.query(ChatSession.id, ChatSession.user_id, ChatSession.project_id)}
+    for message in ChatMessage.query.yield_per(500):
+        index.upsert(connection, message_document(message, *owners[message.session_id]))
+        count += 1
+    for archive in ChatMessageArchive.query.yield_per(50):
+        for message in archive.get_messages():
+            index.upsert(connection, message_document(message, *owners[archive.session_id]))
+            count += 1
+    return count
+
+
+# Keep the index in step with writes, inside the same transaction
+
+_PROJECT_INDEXED = ('name', 'description', 'features', 'user_id')
+
+
+@event.listens_for(db.Model.metadata, 'after_create')
+def _create_index(metadata, connection, **kwargs):
+    index_for(connection)
+
+
+@event.listens_for(Project, 'after_insert')
+def _project_inserted(mapper, connection, project):
+    index = index_for(connection)
+    if index is not None:
+        index.upsert(connection, project_document(project))
+
+
+@event.listens_for(Project, 'after_update')
+def _project_updated(mapper, connection, project):
+    state = inspect(project)
+    if not any(state.attrs[name].history.has_changes() for name in _PROJECT_INDEXED):
+        return
+    index = index_for(connection)
+    if index is not None:
+        index.upsert(connection, project_document(project))
+
+
+@event.listens_for(Project, 'after_delete')
+def _project_deleted(mapper, connection, project):
+    index = index_for(connection)
+    if index is not None:
+        index.delete_projects(connection, [project.id])
+
+
+@event.listens_for(ChatSession, 'after_delete')
+def _session_deleted(mapper, connection, session):
+    # Archived messages have no rows left to fire their own delete events
+    index = index_for(connection)
+    if index is not None:
+        index.delete_sessions(connection, [session.id])
+
+
+@event.listens_for(ChatMessage, 'after_insert')
+def _message_inserted(mapper, connection, message):
+    index = index_for(connection)
+    if index is None:
+        return
+    sessions = ChatSession.__table__
+    owner = connection.execute(
+        select(sessions.c.user_id, sessions.c.project_id).where(sessions.c.id == message.session_id)
+    ).first()
+    if owner is not None:
+        index.upsert(connection, message_document(message, owner.user_id, owner.project_id))
+
+
+@event.listens_for(ChatMessage, 'after_delete')
+def _message_deleted(mapper, connection, message):
+    index = index_for(connection)
+    if index is not None:
+        index.delete(connection, 'message', message.id)
+
+
+def reindex_projects(project_ids):
+    """Re-index projects changed with set-based updates, which skip mapper events"""
+    connection = db.session.connection()
+    index = index_for(connection)
+    if index is None or not project_ids:
+        return
+    projects = Project.query.options(load_only(Project.id, Project.user_id, Project.name, Project.description,
+                                               Project.features))\
+        .filter(Project.id.in_(list(project_ids))).populate_existing()
+    for project in projects:
+        index.upsert(connection, project_document(project))
+
+
+def remove_projects(project_ids):
+    """Drop the documents of projects deleted with set-based deletes, which skip mapper events"""
+    connection = db.session.connection()
+    index = index_for(connection)
+    if index is not None and project_ids:
+        index.delete_projects(connection, project_ids)
@@ -0,0 +1,226 @@
+"""Semantic answer cache for chat questions.
+
+Questions are embedded with a hashing vectorizer: stemmed, synonym-folded
+word unigrams and bigrams plus character trigrams, hashed into SEMANTIC_CACHE_DIMENSIONS
+signed buckets, sublinear tf weighted and L2 normalized. Embeddings live in
+one preallocated float32 matrix, so a lookup is a single matrix-vector
+product; the best match at or above SEMANTIC_CACHE_THRESHOLD cosine
+similarity is a hit.
+
+Entries are scoped and a lookup only matches entries of its own scope.
+Context-free questions (a session's opening question, quick help) that carry
+nothing personal go in the shared scope, so one user's answer serves another
+user's paraphrase; everything else stays in the asking user's scope (see
+scope_for). Questions or answers that look like they carry a secret or a
+personal detail (API keys, long tokens, email addresses, long numbers,
+inline passwords) are not stored at all.
+
+The cache is bounded at SEMANTIC_CACHE_SIZE entries per process. Entries
+expire after SEMANTIC_CACHE_TTL seconds, and when the matrix is full the
+least recently used entry is evicted. Hit rate, eviction and lookup time
+are reported by /api/metrics/semantic-cache.
+
+Imported on first use: numpy stays off the startup path.
+"""
+import os
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+DIMENSIONS = int(os.getenv('SEMANTIC_CACHE_DIMENSIONS', 1024))
+CAPACITY = int(os.getenv('SEMANTIC_CACHE_SIZE', 1024))
+THRESHOLD = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', 0.85))
+TTL = float(os.getenv('SEMANTIC_CACHE_TTL', 24 * 3600))
+
+# Character n-grams catch typos and bigrams word order; both count for less than whole words
+TRIGRAM_WEIGHT = 0.3
+BIGRAM_WEIGHT = 0.5
+# Two questions this similar are the same question; storing one replaces the other
+DUPLICATE_SIMILARITY = 0.98
+
+_WORD = re.compile(r'[a-z0-9]+')
+STOP_WORDS = frozenset(
+    'a an and are can could do does for how i in is it me my of on or please the to what where which '
+    'with would you your'.split()
+)
+# Platform vocabulary that users phrase in different ways
+SYNONYMS = {
+    'put': 'add', 'enter': 'add', 'set': 'add', 'insert': 'add', 'configure': 'add', 'setup': 'add',
+    'openai': 'api', 'cerebras': 'api', 'anthropic': 'api', 'token': 'key',
+    'create': 'build', 'make': 'build', 'generate': 'build',
+    'remove': 'delete', 'erase': 'delete',
+    'publish': 'deploy', 'host': 'deploy', 'launch': 'deploy',
+    'broken': 'error', 'bug': 'error', 'problem': 'error', 'issue': 'error', 'fail': 'error'
+}
+_SUFFIXES = ('ing', 'ed', 'es', 's')
+
+_SENSITIVE = re.compile(
+    r'\b(?:sk|pk|rk|csk)-[A-Za-z0-9_-]{8,}'     # provider API keys
+    r'|\b[A-Za-z0-9_-]{32,}\b'                   # long tokens and hashes
+    r'|[\w.+-]+@[\w-]+\.[\w.-]+'                # email addresses
+    r'|\b\d{6,}\b'                               # account, card and phone numbers
+    r'|\b(?:password|passwd|secret)\b\s*[:=]'    # inline credentials
+    r'|://[^/\s:@]+:[^/\s@]+@',                  # credentials in URLs
+    re.IGNORECASE
+)
+# Scope of entries stored without one
+SHARED_SCOPE = -1
+
+
+def normalize(word):
+    """Crude suffix stemming plus synonym folding"""
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            break
+    return SYNONYMS.get(word, word)
+
+
+def is_sensitive(text):
+    return bool(_SENSITIVE.search(text or ''))
+
+
+def scope_for(question, user_id, context_free=True):
+    """The shared scope for context-free, non-sensitive questions, else the user's own"""
+    return None if context_free and not is_sensitive(question) else user_id
+
+
+def _bucket(feature):
+    """Stable (index, sign) for a feature, the same in every process"""
+    value = zlib.crc32(feature.encode('utf-8'))
+    return value % DIMENSIONS, 1.0 if value & 0x80000000 else -1.0
+
+
+def features(text):
+    words = [normalize(word) for word in _WORD.findall(text.lower()) if word not in STOP_WORDS]
+    weighted = {}
+    for word in words:
+        weighted[word] = weighted.get(word, 0) + 1.0
+        padded = f' {word} '
+        for i in range(len(padded) - 2):
+            trigram = '#' + padded[i:i + 3]
+            weighted[trigram] = weighted.get(trigram, 0) + TRIGRAM_WEIGHT
+    for first, second in zip(words, words[1:]):
+        bigram = f'{first} {second}'
+        weighted[bigram] = weighted.get(bigram, 0) + BIGRAM_WEIGHT
+    return weighted
+
+
+def embed(text):
+    """Unit-length float32 embedding of a text; all zeros when it has no terms"""
+    vector = np.zeros(DIMENSIONS, dtype=np.float32)
+    for feature, count in features(text).items():
+        index, sign = _bucket(feature)
+        vector[index] += sign * (1.0 + np.log(count) if count > 1 else count)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SemanticCache:
+    def __init__(self, capacity=CAPACITY, threshold=THRESHOLD, ttl=TTL):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl = ttl
+        self._vectors = np.zeros((capacity, DIMENSIONS), dtype=np.float32)
+        self._live = np.zeros(capacity, dtype=bool)
+        self._last_used = np.zeros(capacity, dtype=np.float64)
+        self._stored_at = np.zeros(capacity, dtype=np.float64)
+        self._scopes = np.full(capacity, SHARED_SCOPE, dtype=np.int64)
+        self._entries = [None] * capacity
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(('hits', 'misses', 'stores', 'evictions', 'expirations', 'sensitive_skips'), 0)
+        self._lookup_seconds = 0.0
+
+    def _expire(self, now):
+        expired = self._live & (self._stored_at < now - self.ttl)
+        count = int(expired.sum())
+        if count:
+            self._live[expired] = False
+            for slot in np.flatnonzero(expired):
+                self._entries[slot] = None
+            self._counters['expirations'] += count
+
+    def _best_match(self, vector, scope):
+        """(slot, similarity) of the closest live entry in a scope, or (None, 0.0)"""
+        candidates = self._live & (self._scopes == scope)
+        if not candidates.any():
+            return None, 0.0
+        similarities = self._vectors @ vector
+        similarities[~candidates] = -1.0
+        slot = int(np.argmax(similarities))
+        return slot, float(similarities[slot])
+
+    def lookup(self, question, scope=None):
+        """Returns (answer, similarity) for a near-duplicate question asked in the
+        same scope, else (None, similarity)"""
+        started = time.perf_counter()
+        vector = embed(question)
+        with self._lock:
+            now = time.time()
+            self._expire(now)
+            slot, similarity = self._best_match(vector, _scope_key(scope)) if vector.any() else (None, 0.0)
+            if slot is not None and similarity >= self.threshold:
+                self._last_used[slot] = now
+                self._counters['hits'] += 1
+                answer = self._entries[slot]['answer']
+            else:
+                self._counters['misses'] += 1
+                answer = None
+            self._lookup_seconds += time.perf_counter() - started
+        return answer, similarity
+
+    def store(self, question, answer, scope=None):
+        if is_sensitive(question) or is_sensitive(answer):
+            with self._lock:
+                self._counters['sensitive_skips'] += 1
+            return
+        vector = embed(question)
+        if not vector.any():
+            return
+        scope = _scope_key(scope)
+        with self._lock:
+            now = time.time()
+            self._expire(now)
+            slot, similarity = self._best_match(vector, scope)
+            if slot is None or similarity < DUPLICATE_SIMILARITY:
+                free = np.flatnonzero(~self._live)
+                if len(free):
+                    slot = int(free[0])
+                else:
+                    slot = int(np.argmin(self._last_used))
+                    self._counters['evictions'] += 1
+            self._vectors[slot] = vector
+            self._live[slot] = True
+            self._stored_at[slot] = now
+            self._last_used[slot] = now
+            self._scopes[slot] = scope
+            self._entries[slot] = {'question': question, 'answer': answer}
+            self._counters['stores'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._live[:] = False
+            self._entries = [None] * self.capacity
+
+    def stats(self):
+        with self._lock:
+            lookups = self._counters['hits'] + self._counters['misses']
+            return {
+                **self._counters,
+                'size': int(self._live.sum()),
+                'capacity': self.capacity,
+                'threshold': self.threshold,
+                'hit_rate': round(self._counters['hits'] / lookups, 4) if lookups else 0.0,
+                'avg_lookup_ms': round(self._lookup_seconds * 1000 / lookups, 3) if lookups else 0.0,
+                'memory_bytes': int(self._vectors.nbytes)
+            }
+
+
+def _scope_key(scope):
+    return SHARED_SCOPE if scope is None else int(scope)
+
+
+answer_cache = SemanticCache()
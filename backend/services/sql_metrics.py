@@ -0,0 +1,178 @@
+"""Per-request SQL instrumentation.
+
+Cursor execution events on every engine feed the active collectors: one per
+request, plus any opened with query_budget(). Each collector counts
+statements, sums their time and groups them by fingerprint (the SQL with
+literals and IN lists collapsed), so a SELECT repeated once per row shows up
+as a single fingerprint with a high count: the N+1 pattern.
+
+With app.debug or DEBUG_SQL set, responses carry X-SQL-Query-Count,
+X-SQL-Time-Ms, X-SQL-Max-Repeats and a Server-Timing entry, and N+1
+suspects are logged. In every mode per-endpoint totals are kept for
+/api/metrics/sql.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+DEBUG_SQL = os.getenv('DEBUG_SQL', 'False').lower() in ('1', 'true', 'yes')
+# A SELECT fingerprint seen this many times in one request is reported as N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv('SQL_N_PLUS_ONE_THRESHOLD', 5))
+
+_local = threading.local()
+_totals = {}
+_totals_lock = threading.Lock()
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:[^()]*)\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(statement):
+    statement = _STRING_LITERAL.sub('?', statement)
+    statement = _IN_LIST.sub('IN (...)', statement)
+    statement = _NUMBER_LITERAL.sub('?', statement)
+    return _WHITESPACE.sub(' ', statement).strip()
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.fingerprints = Counter()
+
+    def record(self, statement, elapsed_ms):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.fingerprints[fingerprint(statement)] += 1
+
+    @property
+    def max_repeats(self):
+        return max(self.fingerprints.values(), default=0)
+
+    def repeated(self, threshold=N_PLUS_ONE_THRESHOLD):
+        """SELECT fingerprints run at least threshold times, most frequent first"""
+        return [(sql, count) for sql, count in self.fingerprints.most_common()
+                if count >= threshold and sql.upper().startswith('SELECT')]
+
+
+def _collectors():
+    if not hasattr(_local, 'collectors'):
+        _local.collectors = []
+    return _local.collectors
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info['query_start'].pop()) * 1000
+    for collector in _collectors():
+        collector.record(statement, elapsed_ms)
+
+
+@contextmanager
+def collect_queries():
+    """Collect the statements run by this thread inside the block"""
+    stats = QueryStats()
+    collectors = _collectors()
+    collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        collectors.remove(stats)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(max_queries, max_repeats=None):
+    """Fail when the block runs more than max_queries statements, or any
+    statement more than max_repeats times"""
+    with collect_queries() as stats:
+        yield stats
+
+    problems = []
+    if stats.count > max_queries:
+        problems.append(f'{stats.count} queries, budget is {max_queries}')
+    if max_repeats is not None and stats.max_repeats > max_repeats:
+        problems.append(f'a statement ran {stats.max_repeats} times, at most {max_repeats} allowed')
+    if problems:
+        details = '\n'.join(f'  {count}x {sql}' for sql, count in stats.fingerprints.most_common(5))
+        raise QueryBudgetExceeded(f"{'; '.join(problems)}\n{details}")
+
+
+def _begin_request():
+    stats = QueryStats()
+    _collectors().append(stats)
+    g.sql_stats = stats
+    g.sql_debug = current_app.debug or DEBUG_SQL
+
+
+def _finish_request(response):
+    stats = g.get('sql_stats')
+    if stats is None:
+        return response
+
+    suspects = stats.repeated()
+    endpoint = request.endpoint or 'unmatched'
+    with _totals_lock:
+        totals = _totals.setdefault(endpoint, {
+            'requests': 0, 'queries': 0, 'sql_ms': 0.0, 'max_queries': 0, 'n_plus_one': 0
+        })
+        totals['requests'] += 1
+        totals['queries'] += stats.count
+        totals['sql_ms'] += stats.total_ms
+        totals['max_queries'] = max(totals['max_queries'], stats.count)
+        totals['n_plus_one'] += 1 if suspects else 0
+
+    if g.get('sql_debug'):
+        response.headers['X-SQL-Query-Count'] = str(stats.count)
+        response.headers['X-SQL-Time-Ms'] = f'{stats.total_ms:.2f}'
+        response.headers['X-SQL-Max-Repeats'] = str(stats.max_repeats)
+        response.headers.add('Server-Timing', f'db;dur={stats.total_ms:.2f};desc="{stats.count} queries"')
+        for sql, count in suspects:
+            logger.warning(f"Possible N+1 in {endpoint}: {count}x {sql}")
+    return response
+
+
+def _end_request(exc=None):
+    stats = g.pop('sql_stats', None)
+    collectors = _collectors()
+    if stats in collectors:
+        collectors.remove(stats)
+
+
+def metrics():
+    with _totals_lock:
+        return {
+            endpoint: {
+                **totals,
+                'sql_ms': round(totals['sql_ms'], 2),
+                'avg_queries': round(totals['queries'] / totals['requests'], 2)
+            }
+            for endpoint, totals in _totals.items()
+        }
+
+
+def init_sql_metrics(app):
+    # Registered first so identity lookups are counted too
+    app.before_request_funcs.setdefault(None, []).insert(0, _begin_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_end_request)
@@ -1,13 +1,42 @@
 # backend/socket_events.py
-from . import socketio
+import logging
+from datetime import datetime
 from flask import request
+from flask_socketio import emit, join_room
+from factory import socketio
 
-@socketio.on("connect")
-def on_connect():
-    socketio.emit("server_message", {"event": "connected"}, to=request.sid)
+logger = logging.getLogger(__name__)
 
-@socketio.on("start_generation")
-def start_generation(data):
-    # TODO: hook your multi-agent pipeline and emit progress
-    for step in ["planning", "scaffolding", "coding", "deploying", "done"]:
-        socketio.emit("progress", {"step": step})
+@socketio.on('connect')
+def handle_connect():
+    logger.info(f'Client connected: {request.sid}')
+    emit('status', {
+        'message': 'Connected to AI App Builder Pro',
+        'timestamp': datetime.utcnow().isoformat()
+    })
+
+@socketio.on('disconnect')
+def handle_disconnect():
+    logger.info(f'Client disconnected: {request.sid}')
+
+@socketio.on('join_project')
+def handle_join_project(data):
+    project_id = data.get('project_id')
+    if project_id:
+        join_room(f'project_{project_id}')
+        emit('joined_project', {'project_id': project_id})
+
+@socketio.on('start_generation')
+def handle_start_generation(data):
+    project_id = data.get('project_id')
+    description = data.get('description', '')
+    
+    if not project_id or not description:
+        emit('generation_error', {'error': 'Project ID and description required'})
+        return
+    
+    # Emit to the generation service
+    emit('generation_started', {
+        'project_id': project_id,
+        'message': f'Generation started for project {project_id}'
+    })
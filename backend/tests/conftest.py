@@ -0,0 +1,53 @@
+"""Shared fixtures: a fresh app and SQLite database per test.
+
+Run from the backend directory:
+
+    python -m pytest
+"""
+import pytest
+
+from factory import create_app
+from models.database import db
+from services.sql_metrics import query_budget as _query_budget
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    from services import blob_store, identity
+
+    # Per-process caches would otherwise carry rows over from the previous test's database
+    identity._user_cache.clear()
+    identity._demo_user_id = None
+    monkeypatch.setenv('BLOB_STORE_PATH', str(tmp_path / 'blobs'))
+    monkeypatch.setattr(blob_store, '_blob_store', None)
+
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        'SECRET_KEY': 'test-secret-key-that-is-long-enough-for-hs256',
+        # Tests act as the demo user unless they send a token
+        'ALLOW_DEMO_USER': True
+    })
+    with app.app_context():
+        db.create_all()
+        identity.ensure_demo_user()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def query_budget():
+    """Assert the number of statements a block may run:
+
+        with query_budget(3, max_repeats=1):
+            client.get('/api/projects')
+    """
+    return _query_budget
@@ -0,0 +1,63 @@
+import pytest
+
+from services import ai_service
+from services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    # Half open: the reset timeout has passed, so the next call is the trial
+    breaker = CircuitBreaker('cerebras', failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == HALF_OPEN
+    monkeypatch.setitem(ai_service.PROVIDER_BREAKERS, 'cerebras', breaker)
+    return breaker
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = ai_service.AIService()
+    service.cerebras_api_key = 'test-key'
+    service.openai_api_key = None
+    return service
+
+
+def test_client_disconnect_ends_the_half_open_trial(breaker, service, monkeypatch):
+    def streaming(prompt):
+        yield from ['Hello', ' there', ' friend']
+
+    monkeypatch.setattr(service, '_stream_cerebras', streaming)
+
+    stream = service.stream_ai_service('prompt', 'chat_response')
+    assert next(stream) == 'Hello'
+    stream.close()
+
+    assert breaker.state == CLOSED and not breaker.trial_in_flight
+
+
+def test_interrupted_trial_is_released(breaker, service, monkeypatch):
+    def interrupted(prompt):
+        raise KeyboardInterrupt
+        yield
+
+    monkeypatch.setattr(service, '_stream_cerebras', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        list(service.stream_ai_service('prompt', 'chat_response'))
+
+    assert not breaker.trial_in_flight
+    assert breaker.allow()
+
+
+def test_failed_trial_reopens_and_falls_back(breaker, service, monkeypatch):
+    breaker.reset_timeout = 60
+
+    def failing(prompt):
+        raise ConnectionError('provider down')
+        yield
+
+    breaker.opened_at -= 60
+    monkeypatch.setattr(service, '_stream_cerebras', failing)
+    reply = ''.join(service.stream_ai_service('prompt', 'chat_response'))
+
+    assert reply.startswith(ai_service.MOCK_PREFIX)
+    assert breaker.state == OPEN and not breaker.trial_in_flight
@@ -0,0 +1,50 @@
+import json
+
+from models.artifacts import COMPRESSION_THRESHOLD, ZLIB_HEADER, decode_artifact, encode_artifact
+from models.database import db
+from models.project import Project
+
+LARGE_SPEC = {'requirements': [f'Requirement {i}: the app does thing {i}' for i in range(200)]}
+
+
+def test_small_artifacts_stay_plain_json():
+    stored, raw_size = encode_artifact({'pages': ['home']})
+    assert json.loads(stored) == {'pages': ['home']}
+    assert raw_size == len(stored) < COMPRESSION_THRESHOLD
+
+
+def test_large_artifacts_are_compressed():
+    stored, raw_size = encode_artifact(LARGE_SPEC)
+    assert stored.startswith(ZLIB_HEADER)
+    assert len(stored) < raw_size
+    assert decode_artifact(stored) == LARGE_SPEC
+
+
+def test_legacy_rows_are_read_as_is():
+    assert decode_artifact('{"pages": ["home"]}') == {'pages': ['home']}
+    assert decode_artifact(None) is None
+
+
+def test_projects_record_artifact_sizes(app):
+    with app.app_context():
+        project = Project(name='App', description='An app', user_id=1)
+        project.set_specifications(LARGE_SPEC)
+        project.set_design({'theme': 'dark'})
+        db.session.add(project)
+        db.session.commit()
+        db.session.expire_all()
+
+        project = db.session.get(Project, project.id)
+        assert project.get_specifications() == LARGE_SPEC
+        sizes = project.get_artifact_sizes()
+        assert sizes['specifications']['stored'] < sizes['specifications']['raw']
+        assert sizes['design']['stored'] == sizes['design']['raw']
+
+        project.set_design(None)
+        assert 'design' not in project.get_artifact_sizes()
+
+
+def test_corrupt_artifacts_read_as_missing(app):
+    with app.app_context():
+        project = Project(name='App', description='An app', user_id=1, specifications=ZLIB_HEADER + 'bm90IHpsaWI=')
+        assert project.get_specifications() is None
@@ -0,0 +1,115 @@
+import pytest
+from flask_jwt_extended import create_access_token
+
+from models.user import User
+
+
+def register(client, email='ada@example.com', password='correct horse', **extra):
+    return client.post('/api/auth/register', json={'email': email, 'password': password, **extra})
+
+
+def test_register_stores_a_hash_and_returns_a_token(app, client):
+    response = register(client, name='Ada')
+    assert response.status_code == 201
+    assert response.get_json()['access_token']
+
+    with app.app_context():
+        user = User.query.filter_by(email='ada@example.com').one()
+        assert user.password_hash and user.password_hash != 'correct horse'
+
+
+def test_register_rejects_duplicates_and_short_passwords(client):
+    assert register(client).status_code == 201
+    assert register(client, email='ADA@example.com').status_code == 409
+    assert register(client, email='bob@example.com', password='short').status_code == 400
+
+
+def test_token_requires_the_right_password(client):
+    register(client)
+    assert client.post('/api/auth/token', json={'email': 'ada@example.com'}).status_code == 400
+    assert client.post('/api/auth/token', json={'email': 'ada@example.com', 'password': 'wrong password'}).status_code == 401
+    response = client.post('/api/auth/token', json={'email': 'ada@example.com', 'password': 'correct horse'})
+    assert response.status_code == 200
+    assert response.get_json()['user']['email'] == 'ada@example.com'
+
+
+def test_token_does_not_create_users(app, client):
+    response = client.post('/api/auth/token', json={'email': 'nobody@example.com', 'password': 'anything at all'})
+    assert response.status_code == 401
+    with app.app_context():
+        assert User.query.filter_by(email='nobody@example.com').first() is None
+
+
+def test_demo_user_cannot_sign_in(client):
+    response = client.post('/api/auth/token', json={'email': 'demo@aiappbuilder.com', 'password': ''})
+    assert response.status_code == 400
+    response = client.post('/api/auth/token', json={'email': 'demo@aiappbuilder.com', 'password': 'guess1234'})
+    assert response.status_code == 401
+
+
+def test_token_authenticates_requests(app, client):
+    app.config['ALLOW_DEMO_USER'] = False
+    assert client.get('/api/projects').status_code == 401
+
+    token = register(client).get_json()['access_token']
+    response = client.get('/api/projects', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+
+
+def test_non_numeric_subject_is_an_invalid_token(app, client):
+    with app.app_context():
+        token = create_access_token(identity='not-a-number')
+    response = client.get('/api/projects', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 401
+    assert response.get_json()['success'] is False
+
+
+def test_demo_user_is_off_by_default():
+    from services import identity
+    assert identity.ALLOW_DEMO_USER is False
+
+
+def test_users_cannot_reach_each_others_records(app, client):
+    app.config['ALLOW_DEMO_USER'] = False
+    alice = {'Authorization': f"Bearer {register(client).get_json()['access_token']}"}
+    bob = {'Authorization': f"Bearer {register(client, email='bob@example.com').get_json()['access_token']}"}
+
+    project_id = client.post('/api/projects', json={'name': 'Plan', 'description': 'my secret plan'},
+                             headers=alice).get_json()['project']['id']
+    session_id = client.post('/api/chat/sessions', json={'title': 'Chat'}, headers=alice).get_json()['session']['id']
+    client.post(f'/api/chat/sessions/{session_id}/messages', json={'content': 'my secret plan'}, headers=alice)
+    key_id = client.post('/api/api-keys', json={'service': 'openai', 'key_value': 'sk-alice-1234567890'},
+                         headers=alice).get_json()['api_key']['id']
+
+    requests = [
+        ('get', f'/api/projects/{project_id}', None),
+        ('get', f'/api/projects/{project_id}/export.zip', None),
+        ('put', f'/api/projects/{project_id}', {'name': 'Renamed'}),
+        ('get', f'/api/chat/sessions/{session_id}/messages', None),
+        ('post', f'/api/chat/sessions/{session_id}/messages', {'content': 'hello'}),
+        ('post', f'/api/chat/sessions/{session_id}/messages/stream', {'content': 'hello'}),
+        ('post', '/api/generation/start', {'project_id': project_id, 'description': 'x'}),
+        ('get', f'/api/generation/status/{project_id}', None),
+        ('get', f'/api/generation/stream/{project_id}', None),
+        ('post', f'/api/generation/cancel/{project_id}', None),
+        ('delete', f'/api/chat/sessions/{session_id}', None),
+        ('delete', f'/api/api-keys/{key_id}', None),
+        ('delete', f'/api/projects/{project_id}', None),
+    ]
+    for method, path, body in requests:
+        response = getattr(client, method)(path, json=body, headers=bob)
+        assert response.status_code == 404, (method, path, response.status_code)
+
+    # Nothing of Alice's was changed, and she still reaches all of it
+    project = client.get(f'/api/projects/{project_id}', headers=alice).get_json()['project']
+    assert project['name'] == 'Plan'
+    messages = client.get(f'/api/chat/sessions/{session_id}/messages', headers=alice).get_json()['messages']
+    assert [message['content'] for message in messages][:1] == ['my secret plan']
+    assert client.delete(f'/api/api-keys/{key_id}', headers=alice).status_code == 200
+
+
+def test_jwt_secret_is_required_outside_tests(monkeypatch):
+    from factory import create_app
+    monkeypatch.delenv('JWT_SECRET_KEY', raising=False)
+    with pytest.raises(RuntimeError, match='JWT_SECRET_KEY'):
+        create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'SECRET_KEY': 'x' * 32})
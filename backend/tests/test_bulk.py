@@ -0,0 +1,67 @@
+import pytest
+
+from models.database import db
+from models.project import Project
+
+
+@pytest.fixture
+def project_ids(app):
+    with app.app_context():
+        projects = [Project(name=f'App {i}', description='An app', user_id=1) for i in range(3)]
+        db.session.add_all(projects)
+        db.session.commit()
+        return [project.id for project in projects]
+
+
+@pytest.mark.parametrize('path', ['/api/projects/bulk/fetch', '/api/projects/bulk/update', '/api/projects/bulk/delete'])
+@pytest.mark.parametrize('body', ['[1, 2]', '"ids"', '7', 'null'])
+def test_non_object_bodies_are_rejected(client, path, body):
+    response = client.post(path, data=body, content_type='application/json')
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+@pytest.mark.parametrize('updates', [
+    {'status': 'bogus'},
+    {'status': 5},
+    {'progress': '50'},
+    {'progress': True},
+    {'progress': 101},
+    {'framework': 'x' * 101},
+    {'deploy_url': ['https://example.com']},
+    {'tech_stack': {'react': True}},
+    {'name': 'Renamed'},
+])
+def test_bulk_update_validates_fields(client, project_ids, updates):
+    response = client.post('/api/projects/bulk/update', json={'ids': project_ids, 'updates': updates})
+    assert response.status_code == 400
+
+
+def test_bulk_update_applies_valid_fields(app, client, project_ids):
+    response = client.post('/api/projects/bulk/update', json={
+        'ids': project_ids + [999999],
+        'updates': {'status': 'completed', 'progress': 100, 'tech_stack': 'React, Flask'}
+    })
+    assert response.status_code == 200
+    results = {item['id']: item['result'] for item in response.get_json()['results']}
+    assert results == {**dict.fromkeys(project_ids, 'updated'), 999999: 'not_found'}
+
+    with app.app_context():
+        for project in Project.query.filter(Project.id.in_(project_ids)):
+            assert project.status == 'completed' and project.progress == 100
+            assert project.completed_at is not None
+            assert project.to_dict()['tech_stack'] == ['React', 'Flask']
+
+
+def test_single_update_validates_fields(client, project_ids):
+    assert client.put(f'/api/projects/{project_ids[0]}', json={'progress': 'half'}).status_code == 400
+    assert client.put(f'/api/projects/{project_ids[0]}', json={'name': None}).status_code == 400
+    assert client.put(f'/api/projects/{project_ids[0]}', json=[1]).status_code == 400
+    assert client.put(f'/api/projects/{project_ids[0]}', json={'progress': 40}).status_code == 200
+
+
+def test_bulk_delete_removes_only_found_projects(app, client, project_ids):
+    response = client.post('/api/projects/bulk/delete', json={'ids': project_ids[:2]})
+    assert response.status_code == 200
+    with app.app_context():
+        assert [project.id for project in Project.query.all()] == project_ids[2:]
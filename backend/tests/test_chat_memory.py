@@ -0,0 +1,97 @@
+from sqlalchemy import inspect
+
+from models.database import db
+from models.project import ChatMessage, ChatSession, Project
+from models.schema import upgrade_schema
+from services import chat_memory
+
+
+def add_messages(session_id, texts):
+    messages = [ChatMessage(type='user' if i % 2 == 0 else 'ai', content=text, session_id=session_id)
+                for i, text in enumerate(texts)]
+    db.session.add_all(messages)
+    db.session.commit()
+    return messages
+
+
+def summary_texts(summary):
+    return [line.split(': ', 1)[1] for line in summary.splitlines()]
+
+
+def test_older_unsummarized_messages_are_folded_in_order(app, monkeypatch):
+    monkeypatch.setattr(chat_memory, 'MAX_RECENT_MESSAGES', 5)
+    with app.app_context():
+        session = ChatSession(title='Chat', user_id=1)
+        db.session.add(session)
+        db.session.commit()
+        messages = add_messages(session.id, [f'message {i}.' for i in range(12)])
+
+        memory = chat_memory.session_memory(session)
+
+        assert summary_texts(memory['summary']) == [f'message {i}.' for i in range(7)]
+        assert [message['content'] for message in memory['recent']] == [f'message {i}.' for i in range(7, 12)]
+        assert session.summarized_through_id == messages[6].id
+
+        # Later turns continue the same summary without gaps
+        add_messages(session.id, [f'message {i}.' for i in range(12, 15)])
+        memory = chat_memory.session_memory(session)
+        assert summary_texts(memory['summary']) == [f'message {i}.' for i in range(10)]
+        assert [message['content'] for message in memory['recent']] == [f'message {i}.' for i in range(10, 15)]
+
+
+def test_recent_turns_fold_to_fit_the_budget(app):
+    with app.app_context():
+        session = ChatSession(title='Chat', user_id=1)
+        db.session.add(session)
+        db.session.commit()
+        add_messages(session.id, [f'Turn {i}. ' + 'detail ' * 200 for i in range(10)])
+
+        memory = chat_memory.session_memory(session, budget=2000)
+
+        assert len(memory['recent']) >= chat_memory.MIN_RECENT_MESSAGES
+        assert memory['recent'][-1]['content'].startswith('Turn 9.')
+        kept = sum(chat_memory.estimate_tokens(message['content']) for message in memory['recent'])
+        assert kept <= 2000 - chat_memory.SUMMARY_TOKEN_BUDGET
+        folded = summary_texts(memory['summary'])
+        assert folded == [f'Turn {i}.' for i in range(len(folded))]
+        assert len(folded) + len(memory['recent']) == 10
+
+
+def test_upgrade_adds_and_backfills_missing_columns(app):
+    with app.app_context():
+        project = Project(name='App', description='An app', user_id=1)
+        session = ChatSession(title='Chat', user_id=1)
+        db.session.add_all([project, session])
+        db.session.commit()
+        add_messages(session.id, ['first', 'second', 'x' * 300])
+        session_id = session.id
+        last_id = ChatMessage.query.order_by(ChatMessage.id.desc()).first().id
+
+        # A database from before these columns existed
+        dropped = {
+            'chat_sessions': ['message_count', 'last_message_id', 'last_message_preview', 'last_message_at',
+                              'archived_message_count', 'memory_summary', 'summarized_through_id'],
+            'projects': ['row_version', 'archived_at'],
+            'user': ['password_hash']
+        }
+        db.session.remove()
+        with db.engine.begin() as connection:
+            for table, columns in dropped.items():
+                for column in columns:
+                    connection.exec_driver_sql(f'ALTER TABLE "{table}" DROP COLUMN {column}')
+
+        added = upgrade_schema()
+
+        assert set(added) == {f'{table}.{column}' for table, columns in dropped.items() for column in columns}
+        assert upgrade_schema() == []
+        inspector = inspect(db.engine)
+        for table, columns in dropped.items():
+            assert set(columns) <= {column['name'] for column in inspector.get_columns(table)}
+
+        session = db.session.get(ChatSession, session_id)
+        assert session.message_count == 3 and session.archived_message_count == 0
+        assert session.last_message_id == last_id
+        assert session.last_message_preview == 'x' * 197 + '...'
+        assert session.last_message_at is not None
+        assert session.summarized_through_id is None
+        assert Project.query.one().row_version == 1
@@ -0,0 +1,44 @@
+from sqlalchemy import event
+
+from models.database import db
+from models.project import PREVIEW_LENGTH, ChatMessage, ChatSession
+
+
+def add_session(user_id, *contents):
+    session = ChatSession(title='Chat', user_id=user_id)
+    db.session.add(session)
+    db.session.commit()
+    for content in contents:
+        db.session.add(ChatMessage(session_id=session.id, type='user', content=content))
+    db.session.commit()
+    return session.id
+
+
+def test_messages_keep_the_session_summary_current(app, client):
+    with app.app_context():
+        add_session(1, 'first', 'x' * 500)
+
+    session = client.get('/api/chat/sessions').get_json()['sessions'][0]
+    assert session['message_count'] == 2
+    assert session['last_message']['content'] == 'x' * 500
+    assert len(session['last_message_preview']) == PREVIEW_LENGTH
+    assert session['last_message_preview'].endswith('...')
+
+
+def test_listing_reads_messages_once_regardless_of_volume(app, client):
+    with app.app_context():
+        for _ in range(3):
+            add_session(1, *(f'message {i}' for i in range(20)))
+
+        statements = []
+        listener = lambda connection, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            sessions = client.get('/api/chat/sessions').get_json()['sessions']
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+    assert [session['message_count'] for session in sessions] == [20, 20, 20]
+    assert [session['last_message']['content'] for session in sessions] == ['message 19'] * 3
+    # Only the selectin load of the last messages touches chat_messages
+    assert len([statement for statement in statements if 'FROM chat_messages' in statement]) == 1
@@ -0,0 +1,47 @@
+import gzip
+
+import pytest
+
+from services.http_compression import MIN_SIZE
+
+
+@pytest.fixture
+def project_id(client):
+    description = ' '.join(f'word{i}' for i in range(MIN_SIZE))
+    return client.post('/api/projects', json={'name': 'App', 'description': description}).get_json()['project']['id']
+
+
+def test_large_responses_are_gzipped(client, project_id):
+    identity = client.get(f'/api/projects/{project_id}')
+    response = client.get(f'/api/projects/{project_id}', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert len(response.data) < len(identity.data)
+    assert gzip.decompress(response.data) == identity.data
+
+
+def test_small_and_unnegotiated_responses_are_not_compressed(client, project_id):
+    response = client.get('/api/projects/stats', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+
+    response = client.get(f'/api/projects/{project_id}')
+    assert 'Content-Encoding' not in response.headers
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+
+def test_compressed_responses_carry_weak_etags(client, project_id):
+    response = client.get(f'/api/projects/{project_id}', headers={'Accept-Encoding': 'gzip'})
+    etag = response.headers['ETag']
+    assert etag.startswith('W/')
+
+    response = client.get(f'/api/projects/{project_id}', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_brotli_is_preferred_when_available(client, project_id):
+    brotli = pytest.importorskip('brotli')
+    response = client.get(f'/api/projects/{project_id}', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert brotli.decompress(response.data) == client.get(f'/api/projects/{project_id}').data
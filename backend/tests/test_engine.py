@@ -0,0 +1,29 @@
+from sqlalchemy import text
+
+from models import engine as engine_module
+from models.database import db
+from models.engine import engine_options
+
+
+def test_sqlite_connections_are_tuned(app):
+    with app.app_context():
+        with db.engine.connect() as connection:
+            pragma = lambda name: connection.execute(text(f'PRAGMA {name}')).scalar()
+            assert pragma('journal_mode') == 'wal'
+            assert pragma('synchronous') == 1  # NORMAL
+            assert pragma('busy_timeout') == engine_module.SQLITE_BUSY_TIMEOUT_MS
+            assert pragma('cache_size') == -engine_module.SQLITE_CACHE_SIZE_KB
+
+
+def test_sqlite_gets_a_lock_timeout_and_no_pool_sizes():
+    options = engine_options('sqlite:///app.db')
+    assert options == {'connect_args': {'timeout': engine_module.SQLITE_BUSY_TIMEOUT_MS / 1000}}
+
+
+def test_server_databases_get_pool_options(monkeypatch):
+    monkeypatch.setenv('DB_POOL_SIZE', '20')
+    monkeypatch.setenv('DB_POOL_PRE_PING', 'false')
+    options = engine_options('postgresql://app@db/app')
+    assert options['pool_size'] == 20
+    assert options['max_overflow'] == 10
+    assert options['pool_pre_ping'] is False
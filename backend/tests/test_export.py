@@ -0,0 +1,65 @@
+import io
+import zipfile
+
+import pytest
+
+from models.database import db
+from models.project import Project
+from services.export_service import _entry_path, export_filename
+
+
+@pytest.mark.parametrize('parts, expected', [
+    (['frontend_code', 'App.jsx'], 'frontend_code/App.jsx'),
+    (['frontend_code', 'Header'], 'frontend_code/Header.jsx'),
+    (['frontend_code', '..'], 'frontend_code/__.jsx'),
+    (['frontend_code', '.', 'x.js'], 'frontend_code/_/x.js'),
+    (['frontend_code', '', 'x.js'], 'frontend_code/_/x.js'),
+    (['frontend_code', '../../etc/passwd'], 'frontend_code/.._.._etc_passwd'),
+    (['backend_code', '.env'], 'backend_code/.env'),
+])
+def test_entry_paths_stay_inside_their_section(parts, expected):
+    assert _entry_path(parts, '.jsx') == expected
+
+
+def test_export_filename_is_a_slug():
+    assert export_filename('My Cool App!') == 'my-cool-app.zip'
+    assert export_filename('') == 'project.zip'
+
+
+def test_export_contains_no_traversal_entries(app, client):
+    with app.app_context():
+        project = Project(name='App', description='An app', user_id=1)
+        project.set_generated_code({'frontend_code': {'..': 'evil', '.': 'dot', 'App.jsx': 'ok'}, 'notes': [1, 2]})
+        db.session.add(project)
+        db.session.commit()
+        project_id = project.id
+
+    response = client.get(f'/api/projects/{project_id}/export.zip')
+    names = zipfile.ZipFile(io.BytesIO(response.get_data())).namelist()
+    assert 'frontend_code/App.jsx' in names and 'notes.json' in names and 'README.md' in names
+    for name in names:
+        assert '..' not in name.split('/') and '.' not in name.split('/') and '' not in name.split('/')
+
+
+def test_colliding_entry_names_get_a_suffix(app, client):
+    with app.app_context():
+        project = Project(name='App', description='An app', user_id=1)
+        project.set_generated_code({'frontend_code': {'a b.jsx': 'one', 'a/b.jsx': 'two', 'a_b.jsx': 'three'}})
+        db.session.add(project)
+        db.session.commit()
+        project_id = project.id
+
+    archive = zipfile.ZipFile(io.BytesIO(client.get(f'/api/projects/{project_id}/export.zip').get_data()))
+    names = archive.namelist()
+    assert len(names) == len(set(names))
+    assert sorted(archive.read(name) for name in names if name.startswith('frontend_code/')) == [b'one', b'three', b'two']
+    assert 'frontend_code/a_b_2.jsx' in names and 'frontend_code/a_b_3.jsx' in names
+
+
+def test_export_without_generated_code_is_a_conflict(app, client):
+    with app.app_context():
+        project = Project(name='App', description='An app', user_id=1)
+        db.session.add(project)
+        db.session.commit()
+        project_id = project.id
+    assert client.get(f'/api/projects/{project_id}/export.zip').status_code == 409
@@ -0,0 +1,75 @@
+import io
+import os
+import subprocess
+import sys
+import zipfile
+
+from models.database import db
+from models.project import Project
+from services import blob_store
+from services.blob_store import get_blob_store
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_models_do_not_import_the_blob_store():
+    probe = "import sys, models.project; print('services.blob_store' in sys.modules)"
+    output = subprocess.run([sys.executable, '-c', probe], cwd=BACKEND_DIR,
+                            capture_output=True, text=True, check=True).stdout
+    assert output.strip() == 'False'
+
+
+def test_large_files_round_trip_through_the_blob_store(app):
+    big = 'x' * 10000
+    with app.app_context():
+        project = Project(name='App', description='An app', user_id=1)
+        project.set_generated_code({'frontend_code': {'App.jsx': big, 'small.css': 'a{}'}})
+        db.session.add(project)
+        db.session.commit()
+
+        manifest = project.get_generated_code_manifest()
+        assert manifest['frontend_code']['App.jsx']['size'] == len(big)
+        assert manifest['frontend_code']['small.css'] == 'a{}'
+        assert project.get_generated_code()['frontend_code']['App.jsx'] == big
+
+
+def test_blob_store_streams_in_chunks(app):
+    store = get_blob_store()
+    digest = store.put(b'a' * 150000)
+    chunks = list(store.iter_chunks(digest, 64 * 1024))
+    assert [len(chunk) for chunk in chunks] == [65536, 65536, 18928]
+
+
+def test_blobs_over_the_threshold_are_memory_mapped(app, monkeypatch):
+    mapped = []
+    real_mmap = blob_store.mmap.mmap
+    monkeypatch.setattr(blob_store.mmap, 'mmap', lambda *args, **kwargs: mapped.append(args) or real_mmap(*args, **kwargs))
+    monkeypatch.setattr(blob_store, 'MMAP_THRESHOLD', 100000)
+
+    store = get_blob_store()
+    small = store.put(b'b' * 1000)
+    large = store.put('\u00e9'.encode() * 75000)
+
+    assert store.read_text(small) == 'b' * 1000
+    assert list(store.iter_chunks(small)) == [b'b' * 1000]
+    assert mapped == []
+
+    assert store.read_text(large) == '\u00e9' * 75000
+    assert b''.join(store.iter_chunks(large, 64 * 1024)) == '\u00e9'.encode() * 75000
+    assert [len(chunk) for chunk in store.iter_chunks(large, 64 * 1024)] == [65536, 65536, 18928]
+    assert len(mapped) == 3
+
+
+def test_export_streams_blob_backed_files(app, client):
+    big = 'y' * 200000
+    with app.app_context():
+        project = Project(name='Big App', description='An app', user_id=1)
+        project.set_generated_code({'frontend_code': {'App.jsx': big}})
+        db.session.add(project)
+        db.session.commit()
+        project_id = project.id
+
+    response = client.get(f'/api/projects/{project_id}/export.zip')
+    assert response.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(response.get_data()))
+    assert archive.read('frontend_code/App.jsx').decode() == big
@@ -0,0 +1,64 @@
+from sqlalchemy import event
+
+from models.database import db
+from models.project import Project
+from routes.generation import generation_status
+from services.progress_buffer import progress_buffer
+
+
+def add_project(app, **values):
+    with app.app_context():
+        project = Project(name='App', description='An app', user_id=1, **values)
+        db.session.add(project)
+        db.session.commit()
+        return project.id
+
+
+def test_project_detail_shows_buffered_progress(app, client):
+    project_id = add_project(app, status='generating', progress=10, current_agent='Requirements Analyst')
+    etag = client.get(f'/api/projects/{project_id}').headers['ETag']
+
+    try:
+        progress_buffer.record(project_id, 40, 'System Architect')
+
+        response = client.get(f'/api/projects/{project_id}', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        project = response.get_json()['project']
+        assert (project['progress'], project['current_agent']) == (40, 'System Architect')
+
+        project = client.get(f'/api/projects/{project_id}?fields=id,progress').get_json()['project']
+        assert project == {'id': project_id, 'progress': 40}
+    finally:
+        progress_buffer.discard(project_id)
+
+
+def test_finished_projects_ignore_buffered_progress(app, client):
+    project_id = add_project(app, status='completed', progress=100)
+
+    try:
+        progress_buffer.record(project_id, 40, 'System Architect')
+        assert client.get(f'/api/projects/{project_id}').get_json()['project']['progress'] == 100
+    finally:
+        progress_buffer.discard(project_id)
+
+
+def test_generation_status_reads_without_committing(app):
+    project_id = add_project(app, status='generating')
+    commits = []
+
+    with app.app_context():
+        listener = lambda connection: commits.append(connection)
+        event.listen(db.engine, 'commit', listener)
+        try:
+            assert generation_status(project_id) == 'generating'
+            assert commits == []
+
+            # A cancel committed elsewhere is seen by the next read
+            db.session.query(Project).filter_by(id=project_id).update({'status': 'cancelled'})
+            db.session.commit()
+            commits.clear()
+            assert generation_status(project_id) == 'cancelled'
+        finally:
+            event.remove(db.engine, 'commit', listener)
+
+    assert commits == []
@@ -0,0 +1,83 @@
+import threading
+import time
+
+from models.database import db
+from services import health
+from services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from services.generation_pool import GenerationPool
+
+
+def test_probes_answer_without_a_user(app, client):
+    app.config['ALLOW_DEMO_USER'] = False
+    assert client.get('/api/projects').status_code == 401
+
+    assert client.get('/api/health/live').get_json()['status'] == 'alive'
+    response = client.get('/api/health/ready')
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report['status'] == 'ready'
+    assert report['database']['connected'] is True
+    assert report['generation']['queued'] == 0
+
+
+def test_exhausted_pool_is_not_ready(app, client):
+    with app.app_context():
+        pool = health.pool_status()
+        assert pool['exhausted'] is False
+        connections = [db.engine.connect() for _ in range(pool['size'] + pool['max_overflow'])]
+        try:
+            response = client.get('/api/health/ready')
+        finally:
+            for connection in connections:
+                connection.close()
+
+    assert response.status_code == 503
+    report = response.get_json()
+    assert report['pool']['exhausted'] is True
+    assert report['database'] == {'connected': None, 'skipped': 'pool exhausted'}
+
+
+def test_database_failure_is_not_ready(client, monkeypatch):
+    monkeypatch.setattr(health, 'database_status', lambda: {'connected': False, 'error': 'connection refused'})
+    response = client.get('/api/health/ready')
+    assert response.status_code == 503
+    assert response.get_json()['status'] == 'unavailable'
+
+
+def test_circuit_opens_and_lets_one_trial_through():
+    breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.to_dict() == {'state': CLOSED, 'consecutive_failures': 0}
+
+
+def test_generation_pool_bounds_workers_and_survives_crashes(app):
+    pool = GenerationPool(app, max_workers=1)
+    release = threading.Event()
+    ran = []
+
+    def job(project_id):
+        release.wait(5)
+        if project_id == 1:
+            raise RuntimeError('generation crashed')
+        ran.append((project_id, db.engine is not None))
+
+    futures = [pool.submit(project_id, job) for project_id in (1, 2)]
+    time.sleep(0.05)
+    assert pool.stats() == {'queued': 1, 'running': 1, 'max_workers': 1}
+
+    release.set()
+    for future in futures:
+        future.result(5)
+    assert ran == [(2, True)]
+    assert pool.stats() == {'queued': 0, 'running': 0, 'max_workers': 1}
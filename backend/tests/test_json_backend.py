@@ -0,0 +1,33 @@
+from datetime import date, datetime
+
+import pytest
+
+from services.json_backend import dumps, dumps_bytes, loads
+
+
+def test_dates_serialize_as_iso_8601():
+    value = {'at': datetime(2026, 1, 2, 3, 4, 5, 600000), 'on': date(2026, 1, 2)}
+    assert loads(dumps(value)) == {'at': '2026-01-02T03:04:05.600000', 'on': '2026-01-02'}
+
+
+def test_output_is_compact_and_round_trips():
+    value = {'name': 'App', 'tags': ['a', 'b'], 'nested': {'n': 1.5, 'ok': True, 'none': None}}
+    assert dumps(value) == '{"name":"App","tags":["a","b"],"nested":{"n":1.5,"ok":true,"none":null}}'
+    assert dumps_bytes(value) == dumps(value).encode('utf-8')
+    assert loads(dumps_bytes(value)) == value
+
+
+def test_non_string_keys_become_strings():
+    assert loads(dumps({1: 'a'})) == {'1': 'a'}
+
+
+def test_unknown_types_are_rejected():
+    with pytest.raises(TypeError):
+        dumps({'value': object()})
+
+
+def test_api_responses_use_the_backend(client):
+    response = client.post('/api/projects', json={'name': 'App', 'description': 'An app'})
+    assert response.mimetype == 'application/json'
+    project = response.get_json()['project']
+    assert datetime.fromisoformat(project['created_at'])
@@ -0,0 +1,93 @@
+import pytest
+
+from services.knowledge_base import KnowledgeBase, stem, tokenize
+
+
+@pytest.fixture(scope='module')
+def kb():
+    kb = KnowledgeBase()
+    kb.load()
+    return kb
+
+
+@pytest.mark.parametrize('words, expected', [
+    ('deploy deploying deployed deployment deployments', 'deploy'),
+    ('build building builds', 'build'),
+    ('create creates created creating', 'creat'),
+    ('stop stopped stopping', 'stop'),
+    ('cancel cancelled cancelling', 'cancel'),
+    ('key keys', 'key'),
+])
+def test_inflections_share_a_stem(words, expected):
+    assert {stem(word) for word in words.split()} == {expected}
+
+
+def test_short_words_and_double_s_are_kept():
+    assert tokenize('API apis progress is status') == ['api', 'api', 'progress', 'is', 'statu']
+
+
+# Outcomes of the if/elif substring chains the knowledge base replaced
+@pytest.mark.parametrize('message, title', [
+    ('Building an API', 'App Building'),
+    ('rebuild my app', 'App Building'),
+    ('The builder tab is empty', 'App Building'),
+    ('Create a todo app', 'App Building'),
+    ('I created a blog', 'App Building'),
+    ('build failed with an error', 'App Building'),
+    ('My deployment failed', 'Deployment Help'),
+    ('Deploying to Render', 'Deployment Help'),
+    ('How do I fix this error problem', 'Help & Guidance'),
+    ('Help me create a store', 'Help & Guidance'),
+    ('Need help with auth', 'Help & Guidance'),
+    ('Getting an error on login', 'Troubleshooting'),
+    ('Problems with generation', 'Troubleshooting'),
+    ('API keys not saved', 'API Configuration'),
+    ('Configure the APIs', 'API Configuration'),
+    ('Weather dashboard with charts', 'Weather dashboard with charts'),
+    ('Build me a weather dashboard with charts', 'App Building'),
+    ('A weather dashboard with live charts', 'A weather dashboard with...'),
+])
+def test_session_titles_match_the_old_rules(kb, message, title):
+    assert kb.session_title(message) == title
+
+
+def test_titles_match_whole_words_only(kb):
+    # The old substring check read "shows" as "how"
+    assert kb.session_title('Deployed app shows errors') == 'Deployment Help'
+
+
+@pytest.mark.parametrize('question, entry_id', [
+    ('How to start?', 'getting-started'),
+    ('getting started guide', 'getting-started'),
+    ('Where do I put my API key?', 'api-keys'),
+    ('API keys', 'api-keys'),
+    ('api key error', 'api-keys'),
+    ('deploying', 'deployment'),
+    ('My deployment failed', 'deployment'),
+    ('How do I deploy?', 'deployment'),
+    ('deployment error', 'deployment'),
+    ('status of deployment', 'deployment'),
+    ('Deployed app is broken', 'deployment'),
+    ('What is the status?', 'progress'),
+    ('progress of my app', 'progress'),
+    ("what's my generation progress", 'progress'),
+    ('I got an error', 'troubleshooting'),
+    ('Errors everywhere', 'troubleshooting'),
+    ('Problems with export', 'troubleshooting'),
+])
+def test_quick_help_answers_match_the_old_rules(kb, question, entry_id):
+    assert kb.answer(question)['id'] == entry_id
+
+
+def test_unknown_questions_fall_back(kb):
+    assert kb.answer('What is the meaning of life') is None
+    assert 'What specific topic' in kb.fallback('quick_help')
+
+
+def test_first_match_sections_ignore_scores():
+    entries = [{'title': 'A', 'patterns': ['alpha']}, {'title': 'B', 'patterns': ['beta', 'gamma']}]
+    kb = KnowledgeBase()
+    kb.load({'scored': {'entries': entries}, 'ordered': {'match': 'first', 'entries': entries}})
+
+    assert kb.match('scored', 'alpha beta gamma')['title'] == 'B'
+    assert kb.match('ordered', 'alpha beta gamma')['title'] == 'A'
@@ -0,0 +1,55 @@
+import threading
+
+from sqlalchemy.dialects import postgresql
+
+from models.database import db
+from models.project import Project, ProjectStats, _locked_counters
+
+
+def create_project(user_id, **fields):
+    project = Project(name=fields.pop('name', 'App'), description='An app', user_id=user_id, **fields)
+    db.session.add(project)
+    db.session.commit()
+    return project
+
+
+def test_counters_follow_inserts_updates_and_deletes(app):
+    with app.app_context():
+        first = create_project(1, status='draft', framework='React')
+        create_project(1, status='completed', framework='Vue')
+        first.status = 'completed'
+        db.session.commit()
+        db.session.delete(first)
+        db.session.commit()
+
+        stats = db.session.get(ProjectStats, 1).to_dict()
+        assert stats['total_projects'] == 1
+        assert stats['by_status'] == {'completed': 1}
+        assert stats['by_framework'] == {'Vue': 1}
+
+
+def test_counter_read_locks_the_row():
+    sql = str(_locked_counters(1).compile(dialect=postgresql.dialect()))
+    assert 'FOR UPDATE' in sql
+
+
+def test_concurrent_writers_do_not_lose_updates(app):
+    with app.app_context():
+        create_project(1)
+
+    def worker():
+        with app.app_context():
+            for _ in range(10):
+                create_project(1)
+            db.session.remove()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with app.app_context():
+        stats = db.session.get(ProjectStats, 1)
+        assert stats.total_projects == Project.query.filter_by(user_id=1).count() == 41
+        assert stats.to_dict()['by_status'] == {'draft': 41}
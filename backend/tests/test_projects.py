@@ -0,0 +1,111 @@
+from sqlalchemy import event
+
+from models.database import db
+
+
+def create_project(client, **fields):
+    response = client.post('/api/projects', json={'name': 'App', 'description': 'An app', **fields})
+    return response.get_json()['project']['id']
+
+
+def test_unchanged_project_polls_get_304(client):
+    project_id = create_project(client)
+    response = client.get(f'/api/projects/{project_id}')
+    etag = response.headers['ETag']
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+
+    response = client.get(f'/api/projects/{project_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+
+def test_updates_change_the_etag(client):
+    project_id = create_project(client)
+    etag = client.get(f'/api/projects/{project_id}').headers['ETag']
+
+    client.put(f'/api/projects/{project_id}', json={'progress': 30})
+
+    response = client.get(f'/api/projects/{project_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['project']['progress'] == 30
+    assert response.headers['ETag'] != etag
+
+
+def test_304_skips_loading_the_row(app, client):
+    project_id = create_project(client)
+    client.put(f'/api/projects/{project_id}', json={'specifications': {'pages': ['home']}})
+    etag = client.get(f'/api/projects/{project_id}').headers['ETag']
+
+    with app.app_context():
+        statements = []
+        listener = lambda connection, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            assert client.get(f'/api/projects/{project_id}', headers={'If-None-Match': etag}).status_code == 304
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+    assert not [statement for statement in statements if 'projects.specifications' in statement]
+
+
+def test_generation_status_has_its_own_etag(client):
+    project_id = create_project(client)
+    project_etag = client.get(f'/api/projects/{project_id}').headers['ETag']
+    response = client.get(f'/api/generation/status/{project_id}')
+    etag = response.headers['ETag']
+    assert etag != project_etag
+
+    assert client.get(f'/api/generation/status/{project_id}', headers={'If-None-Match': etag}).status_code == 304
+
+    client.put(f'/api/projects/{project_id}', json={'current_agent': 'System Architect'})
+    response = client.get(f'/api/generation/status/{project_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['current_agent'] == 'System Architect'
+
+
+def test_fields_select_exact_keys(client):
+    project_id = create_project(client, features=['auth'])
+    response = client.get(f'/api/projects/{project_id}?fields=name,features')
+    assert response.get_json()['project'] == {'id': project_id, 'name': 'App', 'features': ['auth']}
+
+    projects = client.get('/api/projects?fields=status').get_json()['projects']
+    assert projects == [{'id': project_id, 'status': 'draft'}]
+
+
+def test_include_adds_artifacts_to_the_summary(client):
+    project_id = create_project(client)
+    client.put(f'/api/projects/{project_id}', json={'design': {'theme': 'dark'}})
+
+    project = client.get(f'/api/projects/{project_id}?include=design').get_json()['project']
+    assert project['design'] == {'theme': 'dark'}
+    assert 'name' in project and 'specifications' not in project
+
+
+def test_unknown_fields_are_rejected(client):
+    response = client.get('/api/projects?fields=name,secret')
+    assert response.status_code == 400
+    assert 'secret' in response.get_json()['error']
+    assert client.get('/api/projects?include=name').status_code == 400
+
+
+def test_unrequested_artifacts_are_not_selected(app, client):
+    project_id = create_project(client)
+    client.put(f'/api/projects/{project_id}', json={'specifications': {'pages': ['home']}})
+
+    with app.app_context():
+        statements = []
+        listener = lambda connection, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            client.get('/api/projects?fields=name')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+    assert not [statement for statement in statements if 'projects.specifications' in statement]
+
+
+def test_field_selections_have_distinct_etags(client):
+    project_id = create_project(client)
+    etag = client.get(f'/api/projects/{project_id}?fields=name').headers['ETag']
+    assert client.get(f'/api/projects/{project_id}', headers={'If-None-Match': etag}).status_code == 200
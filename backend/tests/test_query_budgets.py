@@ -0,0 +1,71 @@
+import pytest
+
+from models.database import db
+from models.project import ChatMessage, ChatSession, Project
+
+
+@pytest.fixture
+def seeded(app):
+    with app.app_context():
+        for i in range(20):
+            project = Project(name=f'App {i}', description='An app', user_id=1, tech_stack='["React"]')
+            db.session.add(project)
+            db.session.flush()
+            session = ChatSession(title=f'Chat {i}', project_id=project.id, user_id=1)
+            db.session.add(session)
+            db.session.flush()
+            db.session.add_all(ChatMessage(type=kind, content=f'{kind} message', session_id=session.id)
+                               for kind in ('user', 'ai', 'user'))
+        db.session.commit()
+
+
+@pytest.mark.parametrize('query', ['', '?include=specifications,generated_code', '?fields=id,name,status'])
+def test_project_list_runs_a_fixed_number_of_queries(client, seeded, query_budget, query):
+    client.get('/api/projects')  # warms the user cache
+
+    with query_budget(2, max_repeats=1):
+        response = client.get(f'/api/projects{query}')
+    assert response.status_code == 200
+    assert len(response.get_json()['projects']) == 20
+
+
+def test_chat_session_list_runs_a_fixed_number_of_queries(client, seeded, query_budget):
+    client.get('/api/chat/sessions')
+
+    with query_budget(3, max_repeats=1):
+        response = client.get('/api/chat/sessions')
+    sessions = response.get_json()['sessions']
+    assert len(sessions) == 20
+    assert all(session['message_count'] == 3 for session in sessions)
+
+
+def test_sql_metrics_require_a_user_unless_public(app, client):
+    app.config['ALLOW_DEMO_USER'] = False
+    assert client.get('/api/metrics/sql').status_code == 401
+
+    app.config['METRICS_PUBLIC'] = True
+    response = client.get('/api/metrics/sql')
+    assert response.status_code == 200 and response.get_json()['success']
+
+
+def test_archived_artifacts_do_not_load_per_project(app, client):
+    from services.sql_metrics import collect_queries
+
+    with app.app_context():
+        projects = [Project(name=f'App {i}', description='An app', user_id=1) for i in range(11)]
+        for project in projects:
+            project.set_specifications({'summary': f'spec {project.name}'})
+        db.session.add_all(projects)
+        db.session.flush()
+        for project in projects[:10]:
+            project.archive_artifacts()
+        db.session.commit()
+    client.get('/api/projects?fields=id')
+
+    for query in ('', '?include=specifications'):
+        with collect_queries() as stats:
+            response = client.get(f'/api/projects{query}')
+        listed = response.get_json()['projects']
+        assert sorted(project['specifications']['summary'] for project in listed) == \
+            sorted(f'spec App {i}' for i in range(11))
+        assert stats.count <= 2 and stats.max_repeats == 1, stats.fingerprints
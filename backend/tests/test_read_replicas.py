@@ -0,0 +1,75 @@
+import pytest
+
+from factory import create_app
+from models.database import db
+from services import read_replicas
+
+
+@pytest.fixture
+def replica_app(tmp_path, monkeypatch):
+    from services import blob_store, identity
+
+    identity._user_cache.clear()
+    identity._demo_user_id = None
+    monkeypatch.setenv('BLOB_STORE_PATH', str(tmp_path / 'blobs'))
+    monkeypatch.setattr(blob_store, '_blob_store', None)
+    monkeypatch.setattr(read_replicas, '_down_until', {})
+    # Binds register their metadata on the shared db object; keep replica_0 out of later tests
+    monkeypatch.setattr(db, 'metadatas', dict(db.metadatas))
+
+    # The "replica" is a separate, never-updated database, so a replica read shows stale data
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'primary.db'}",
+        'DATABASE_REPLICA_URLS': f"sqlite:///{tmp_path / 'replica.db'}",
+        'SECRET_KEY': 'test-secret-key-that-is-long-enough-for-hs256',
+        'ALLOW_DEMO_USER': True
+    })
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(db.engines['replica_0'])
+        identity.ensure_demo_user()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def project_names(response):
+    return [project['name'] for project in response.get_json()['projects']]
+
+
+def test_writes_hand_the_client_a_marker(replica_app):
+    client = replica_app.test_client()
+    response = client.post('/api/projects', json={'name': 'Fresh', 'description': 'Just written'})
+    assert response.status_code in (200, 201)
+    marker = response.headers[read_replicas.LAST_WRITE_HEADER]
+    assert client.get_cookie(read_replicas.LAST_WRITE_COOKIE).value == marker
+
+    # The cookie routes the next read to the primary, whichever process serves it
+    assert project_names(client.get('/api/projects')) == ['Fresh']
+
+    # So does the header, for clients that do not keep cookies
+    headerless = replica_app.test_client()
+    assert project_names(headerless.get('/api/projects')) == []
+    fresh = headerless.get('/api/projects', headers={read_replicas.LAST_WRITE_HEADER: marker})
+    assert project_names(fresh) == ['Fresh']
+
+
+def test_reads_do_not_set_a_marker(replica_app):
+    response = replica_app.test_client().get('/api/projects')
+    assert read_replicas.LAST_WRITE_HEADER not in response.headers
+
+
+def test_forged_and_expired_markers_are_ignored(replica_app, monkeypatch):
+    client = replica_app.test_client()
+    client.post('/api/projects', json={'name': 'Fresh', 'description': 'Just written'})
+    marker = client.get_cookie(read_replicas.LAST_WRITE_COOKIE).value
+
+    forged = replica_app.test_client()
+    forged.set_cookie(read_replicas.LAST_WRITE_COOKIE, marker[:-2] + 'xx')
+    assert project_names(forged.get('/api/projects')) == []
+
+    monkeypatch.setattr(read_replicas, 'REPLICA_STICKY_SECONDS', -1)
+    assert project_names(client.get('/api/projects')) == []
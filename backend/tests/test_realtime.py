@@ -0,0 +1,74 @@
+import uuid
+
+import pytest
+from flask import Flask
+from flask_socketio import SocketIO, join_room
+
+from services import realtime
+from services.realtime import LocalQueueManager, create_manager, project_room
+
+
+def make_worker(channel):
+    """One 'worker': a Flask app with its own Socket.IO server on the shared queue"""
+    app = Flask(__name__)
+    socketio = SocketIO(app, client_manager=create_manager('local://', channel=channel))
+
+    @socketio.on('join_project')
+    def join_project(data):
+        join_room(project_room(data['project_id']))
+
+    return app, socketio
+
+
+@pytest.fixture
+def channel():
+    channel = f'test-{uuid.uuid4().hex}'
+    yield channel
+    LocalQueueManager._peers.pop(channel, None)
+
+
+def received(client, event):
+    return [message['args'][0] for message in client.get_received() if message['name'] == event]
+
+
+def test_emits_reach_clients_of_other_workers(channel):
+    app_a, socketio_a = make_worker(channel)
+    app_b, socketio_b = make_worker(channel)
+    client_a = socketio_a.test_client(app_a)
+    client_b = socketio_b.test_client(app_b)
+    client_b.emit('join_project', {'project_id': 7})
+
+    socketio_a.emit('generation_progress', {'progress': 40}, to=project_room(7))
+
+    assert received(client_b, 'generation_progress') == [{'progress': 40}]
+    # Not in the room
+    assert received(client_a, 'generation_progress') == []
+
+
+def test_write_only_emitters_publish_without_serving(channel):
+    app, socketio = make_worker(channel)
+    client = socketio.test_client(app)
+    client.emit('join_project', {'project_id': 7})
+
+    emitter = create_manager('local://', channel=channel, write_only=True)
+    emitter.initialize()
+    emitter.emit('generation_progress', {'progress': 90}, namespace='/', room=project_room(7))
+
+    assert received(client, 'generation_progress') == [{'progress': 90}]
+    assert emitter not in LocalQueueManager._peers[channel]
+
+
+def test_no_queue_means_a_single_process_manager(monkeypatch):
+    monkeypatch.delenv('SOCKETIO_MESSAGE_QUEUE', raising=False)
+    assert realtime.socketio_options() == {'client_manager': None}
+    assert create_manager('') is None
+
+
+def test_emit_failures_do_not_propagate(app, monkeypatch):
+    from factory import socketio
+
+    def fail(*args, **kwargs):
+        raise ConnectionError('queue is down')
+
+    monkeypatch.setattr(socketio, 'emit', fail)
+    realtime.emit_to_project(7, 'generation_progress', {'progress': 10})
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+from models.database import db
+from models.project import ChatMessage, ChatSession, Project
+from services.archival import archive_chat_messages
+
+
+def search(client, query, kind='message'):
+    response = client.get('/api/search', query_string={'q': query, 'type': kind})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_projects_and_messages_are_searchable(app, client):
+    with app.app_context():
+        project = Project(name='Recipe planner', description='Plan weekly meals', user_id=1)
+        db.session.add(project)
+        db.session.flush()
+        session = ChatSession(title='Chat', project_id=project.id, user_id=1)
+        db.session.add(session)
+        db.session.flush()
+        db.session.add(ChatMessage(type='user', content='How do I add a grocery list?', session_id=session.id))
+        db.session.commit()
+
+    assert [result['type'] for result in search(client, 'recipe', 'project')['results']] == ['project']
+    assert search(client, 'grocery')['total'] == 1
+
+
+def test_deleting_a_session_drops_its_archived_messages_from_search(app, client):
+    with app.app_context():
+        session = ChatSession(title='Old chat', user_id=1)
+        db.session.add(session)
+        db.session.flush()
+        old = datetime.utcnow() - timedelta(days=365)
+        db.session.add_all(ChatMessage(type='user', content=f'zeppelin question {i}', session_id=session.id,
+                                       created_at=old) for i in range(3))
+        db.session.commit()
+        session_id = session.id
+
+        # The latest message stays live for the session preview; the rest are archived
+        archive_chat_messages(older_than_days=30)
+        assert ChatMessage.query.filter_by(session_id=session_id).count() == 1
+
+    assert search(client, 'zeppelin')['total'] == 3
+
+    assert client.delete(f'/api/chat/sessions/{session_id}').status_code == 200
+    assert search(client, 'zeppelin')['total'] == 0
+
+
+def test_unsupported_dialect_answers_501(client, monkeypatch):
+    from routes import search as search_route
+    monkeypatch.setattr(search_route, 'search_dialect', lambda: 'mysql')
+    response = client.get('/api/search', query_string={'q': 'anything'})
+    assert response.status_code == 501
+    assert 'mysql' in response.get_json()['error']
+
+
+def test_bulk_feature_updates_are_reindexed(app, client):
+    with app.app_context():
+        projects = [Project(name=f'App {i}', description='An app', user_id=1) for i in range(2)]
+        for project in projects:
+            project.set_features(['alpha'])
+        db.session.add_all(projects)
+        db.session.commit()
+        ids = [project.id for project in projects]
+
+    assert search(client, 'alpha', 'project')['total'] == 2
+
+    response = client.post('/api/projects/bulk/update', json={'ids': ids[:1], 'updates': {'features': ['omega']}})
+    assert response.status_code == 200
+
+    assert search(client, 'alpha', 'project')['total'] == 1
+    assert [result['id'] for result in search(client, 'omega', 'project')['results']] == ids[:1]
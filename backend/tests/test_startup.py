@@ -0,0 +1,17 @@
+from benchmarks.startup_budget import DEFAULT_BUDGET_MS, DEFERRED_MODULES, measure
+
+
+def test_app_factory_starts_within_budget():
+    result = measure()
+    assert result['total_ms'] <= DEFAULT_BUDGET_MS, result['factory']
+
+
+def test_provider_sdks_and_ai_service_load_lazily():
+    result = measure()
+    assert not result['eager_modules'], f"imported at startup: {result['eager_modules']} (deferred: {DEFERRED_MODULES})"
+    assert not result['ai_service_constructed']
+
+
+def test_factory_records_startup_phases(app):
+    timings = app.extensions['startup_timings']
+    assert set(timings['phases_ms']) >= {'config', 'extensions', 'models', 'blueprints', 'hooks'}